@@ -0,0 +1,246 @@
+# analyze_benchmark.py - Latência de /api/analyze-batch no servidor Node.js real
+#
+# Uso (a partir da raiz do projeto):
+#   python benchmarks/analyze_benchmark.py --numbers 100000 --requests 5
+#   python benchmarks/analyze_benchmark.py --env LOG_LEVEL=debug --env LOG_SAMPLE=phone=1
+#   python benchmarks/analyze_benchmark.py --base-url http://localhost:3000 --baseline resultado-anterior.json
+#
+# Sem --base-url, inicia `node server/server.js` numa porta livre, com a saída
+# gravada num arquivo (como o server_log.txt da aplicação empacotada), e mede
+# cada requisição com um lote de números variados. Também registra quantos
+# bytes de log o servidor gravou por requisição. --env repassa variáveis de
+# ambiente ao servidor, por exemplo para comparar níveis de log.
+# A análise não depende do WhatsApp: o servidor não precisa estar conectado.
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_SCRIPT = os.path.join(ROOT_DIR, "server", "server.js")
+DEFAULT_RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+# Métricas comparadas com --baseline: (chave, True se maior é melhor)
+COMPARED_METRICS = (
+    ("request_ms_median", False),
+    ("numbers_per_second", True),
+    ("log_bytes_per_request", False),
+)
+
+
+def generate_numbers(count, seed):
+    """
+    Gera números nos formatos que o servidor trata de forma diferente: curtos,
+    brasileiros com DDD, com código de país e longos não reconhecidos.
+
+    Returns:
+        list: Números como texto, alguns com pontuação
+    """
+    rng = random.Random(seed)
+    numbers = []
+    for _ in range(count):
+        kind = rng.randrange(4)
+        if kind == 0:
+            number = str(rng.randint(10_000_000, 999_999_999))
+        elif kind == 1:
+            number = f"({rng.randint(11, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+        elif kind == 2:
+            number = "+" + rng.choice(("1", "44", "351", "55", "61", "81")) + str(rng.randint(100_000_000, 9_999_999_999))
+        else:
+            number = str(rng.randint(10 ** 11, 10 ** 13))
+        numbers.append(number)
+    return numbers
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _post_json(url, payload, timeout):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def wait_for_server(base_url, process, timeout):
+    """Espera /api/status responder; retorna False se o processo terminar antes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/status", timeout=1):
+                return True
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.1)
+    return False
+
+
+def start_server(directory, args):
+    """
+    Inicia o servidor Node.js numa porta livre, com cwd e log no diretório indicado.
+
+    Returns:
+        tuple: (processo, URL base, caminho do arquivo de log)
+    """
+    port = _free_port()
+    env = dict(os.environ, PORT=str(port))
+    for entry in args.env:
+        key, _, value = entry.partition("=")
+        env[key] = value
+    log_path = os.path.join(directory, "server_log.txt")
+    with open(log_path, "wb") as log_file:
+        process = subprocess.Popen([args.node, SERVER_SCRIPT], cwd=directory, env=env,
+                                   stdout=log_file, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    if not wait_for_server(base_url, process, args.timeout):
+        process.kill()
+        process.wait()
+        with open(log_path, encoding="utf-8", errors="replace") as f:
+            output = f.read()
+        raise RuntimeError(f"O servidor não respondeu:\n{output[-2000:]}")
+    return process, base_url, log_path
+
+
+def _log_size(log_path):
+    return os.path.getsize(log_path) if log_path else 0
+
+
+def measure_requests(base_url, numbers, args, log_path):
+    """
+    Envia o lote --requests vezes (depois de --warmup rodadas não medidas).
+
+    Returns:
+        tuple: (durações em ms, bytes de log gravados durante as medições)
+    """
+    url = f"{base_url}/api/analyze-batch"
+    payload = {"numbers": numbers}
+    for _ in range(args.warmup):
+        _post_json(url, payload, args.timeout)
+
+    # Espera o log do aquecimento ser gravado antes de medir o tamanho
+    time.sleep(0.2)
+    log_before = _log_size(log_path)
+    durations = []
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        response = _post_json(url, payload, args.timeout)
+        durations.append((time.perf_counter() - started) * 1000)
+        if response["stats"]["total"] != len(numbers):
+            raise RuntimeError(f"Resposta incompleta: {response['stats']['total']} de {len(numbers)} números")
+    time.sleep(0.2)
+    return durations, _log_size(log_path) - log_before
+
+
+def run_benchmark(args):
+    """Executa as medições e retorna o dicionário de resultados."""
+    numbers = generate_numbers(args.numbers, args.seed)
+    process = None
+    with tempfile.TemporaryDirectory() as directory:
+        if args.base_url:
+            base_url, log_path = args.base_url.rstrip("/"), None
+        else:
+            process, base_url, log_path = start_server(directory, args)
+        try:
+            durations, log_bytes = measure_requests(base_url, numbers, args, log_path)
+        finally:
+            if process is not None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+            if log_path and args.server_log:
+                shutil.copyfile(log_path, args.server_log)
+
+    median = statistics.median(durations)
+    return {
+        "numbers": args.numbers,
+        "requests": args.requests,
+        "request_ms_first": round(durations[0], 1),
+        "request_ms_median": round(median, 1),
+        "request_ms_min": round(min(durations), 1),
+        "request_ms_max": round(max(durations), 1),
+        "request_ms_runs": [round(d, 1) for d in durations],
+        "numbers_per_second": round(args.numbers / (median / 1000), 1),
+        # None quando o servidor é externo (--base-url): o log não é acessível
+        "log_bytes_per_request": round(log_bytes / args.requests) if log_path else None,
+    }
+
+
+def compare(results, baseline_path):
+    """Imprime a variação das principais métricas em relação a um resultado anterior."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    print(f"Comparação com {baseline_path}:")
+    for key, higher_is_better in COMPARED_METRICS:
+        old, new = baseline.get(key), results.get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        worse = change < 0 if higher_is_better else change > 0
+        flag = "  <- piorou" if worse and abs(change) >= 5 else ""
+        print(f"  {key:<28} {old:>12} -> {new:>12} ({change:+.1f}%){flag}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Mede a latência de /api/analyze-batch no servidor Node.js."
+    )
+    parser.add_argument("--numbers", type=int, default=100_000, help="Números por requisição")
+    parser.add_argument("--requests", type=int, default=5, help="Requisições medidas")
+    parser.add_argument("--warmup", type=int, default=1, help="Requisições iniciais não medidas")
+    parser.add_argument("--seed", type=int, default=1, help="Semente dos números gerados")
+    parser.add_argument("--base-url", help="Servidor já em execução (padrão: inicia server/server.js)")
+    parser.add_argument("--node", default="node", help="Executável do Node.js")
+    parser.add_argument("--env", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="Variável de ambiente do servidor iniciado (ex: --env LOG_LEVEL=debug)")
+    parser.add_argument("--server-log", help="Copia o log do servidor iniciado para este arquivo")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Espera máxima por requisição (segundos)")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: benchmarks/results/analyze-<data>.json)")
+    parser.add_argument("--baseline", help="Resultado anterior para comparação")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_benchmark(args)
+    report = {
+        "benchmark": "analyze",
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "server_log")},
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, datetime.datetime.now().strftime("analyze-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    for key in ("numbers", "requests", "request_ms_first", "request_ms_median", "request_ms_min",
+                "request_ms_max", "numbers_per_second", "log_bytes_per_request"):
+        print(f"{key:<28} {results[key]}")
+    print(f"Resultado gravado em {output}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
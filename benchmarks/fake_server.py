@@ -0,0 +1,691 @@
+# fake_server.py - Servidor local que imita a API do server.js, sem WhatsApp
+#
+# Uso isolado (para testar a interface ou o modo headless sem celular):
+#   python benchmarks/fake_server.py --port 3000 --latency lognormal:0.3:0.5 --error-rate 0.02
+#
+# Implementa /api/status, /api/qrcode, /api/send-message, /api/send-file,
+# /api/media, /api/media/<id>, /api/send-media, /api/send-batch e
+# /api/analyze-batch, /api/events e a fila de envios (/api/jobs,
+# /api/jobs/status, /api/jobs/cancel), com latência sorteada, erros injetados e
+# limite de taxa.
+import argparse
+import collections
+import hashlib
+import itertools
+import json
+import math
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "client"))
+
+import phone_numbers  # noqa: E402
+
+# Intervalo entre comentários de keep-alive no fluxo de eventos (segundos)
+EVENTS_HEARTBEAT = 25.0
+
+QR_CODE_TEXT = "2@fake-qr-code," + "A" * 200
+
+# Erros devolvidos pela API real (a mensagem decide a classificação no cliente)
+TRANSIENT_DETAILS = "Evaluation failed: simulated failure"
+PERMANENT_DETAILS = "invalid wid (simulado)"
+
+
+def parse_latency(spec):
+    """
+    Converte a descrição de uma distribuição de latência numa função de sorteio.
+
+    Formatos aceitos (valores em segundos):
+        const:0.2 ou 0.2     sempre o mesmo valor
+        uniform:0.1:0.5      uniforme entre os limites
+        exp:0.3              exponencial com a média informada
+        lognormal:0.3:0.5    log-normal com mediana 0.3 e sigma 0.5
+
+    Returns:
+        callable: Função sem argumentos que retorna uma latência em segundos
+    """
+    kind, _, params = str(spec).partition(":")
+    if not params:
+        kind, params = "const", kind
+    values = [float(v) for v in params.split(":")]
+    if kind == "const":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "exp":
+        return lambda: random.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0
+    if kind == "lognormal":
+        mu = math.log(values[0]) if values[0] > 0 else 0.0
+        return lambda: random.lognormvariate(mu, values[1]) if values[0] > 0 else 0.0
+    raise ValueError(f"Distribuição de latência desconhecida: {spec}")
+
+
+class FakeServerConfig:
+    """Comportamento simulado do servidor."""
+
+    def __init__(self, latency="0", file_latency=None, error_rate=0.0, permanent_error_rate=0.0,
+                 rate_limit_per_minute=0, send_concurrency=2, ready=True):
+        """
+        Args:
+            latency (str): Distribuição da latência de client.sendMessage para textos
+            file_latency (str): Distribuição para arquivos e mídias (padrão: a mesma dos textos)
+            error_rate (float): Fração de envios que falham com erro transitório (500)
+            permanent_error_rate (float): Fração de envios que falham com número inválido
+            rate_limit_per_minute (float): Envios por minuto aceitos antes de responder 429 (0 desativa)
+            send_concurrency (int): Trabalhos da fila de envios executados ao mesmo tempo
+            ready (bool): Se a sessão do WhatsApp está pronta; caso contrário há QR code
+        """
+        self.latency = latency
+        self.file_latency = file_latency or latency
+        self.error_rate = error_rate
+        self.permanent_error_rate = permanent_error_rate
+        self.rate_limit_per_minute = rate_limit_per_minute
+        self.send_concurrency = send_concurrency
+        self.ready = ready
+
+
+class FakeWhatsAppServer:
+    """Servidor HTTP em segundo plano com contadores do que recebeu."""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        """
+        Args:
+            config (FakeServerConfig): Comportamento simulado
+            host (str): Endereço de escuta
+            port (int): Porta (0 escolhe uma porta livre)
+        """
+        self.config = config or FakeServerConfig()
+        self._text_latency = parse_latency(self.config.latency)
+        self._file_latency = parse_latency(self.config.file_latency)
+        self._lock = threading.Lock()
+        self._media = {}
+        self._subscribers = []
+        self._tokens = self._burst()
+        self._updated = time.monotonic()
+        self.jobs = _FakeJobQueue(self, self.config.send_concurrency)
+        self.reset_counters()
+        handler = type("FakeHandler", (_FakeHandler,), {"fake": self})
+        self.httpd = _QuietHTTPServer((host, port), handler)
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    @property
+    def base_url(self):
+        return f"http://{self.httpd.server_address[0]}:{self.port}/api"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.publish(None)  # Encerra os fluxos de eventos abertos
+        self.jobs.stop()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def subscribe(self):
+        events = queue.Queue()
+        with self._lock:
+            self._subscribers.append(events)
+        return events
+
+    def unsubscribe(self, events):
+        with self._lock:
+            self._subscribers.remove(events)
+
+    def publish(self, event, data=None):
+        """Envia um evento aos inscritos em /api/events (None encerra os fluxos)."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for events in subscribers:
+            events.put(None if event is None else (event, data or {}))
+
+    def set_ready(self, ready):
+        """Simula a leitura do QR code (True) ou a desconexão do celular (False)."""
+        self.config.ready = ready
+        if ready:
+            self.publish("authenticated")
+            self.publish("ready")
+        else:
+            self.publish("disconnected", {"reason": "simulado"})
+            self.publish("qr", {"qr": QR_CODE_TEXT})
+
+    def reset_counters(self):
+        with self._lock:
+            self.counters = {
+                "requests": {},
+                "messages": 0,
+                "files": 0,
+                "errors": 0,
+                "rate_limited": 0,
+                "bytes_received": 0,
+                "simulated_latency_seconds": 0.0,
+            }
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.counters[key] += amount
+
+    def count_request(self, endpoint, nbytes):
+        with self._lock:
+            requests = self.counters["requests"]
+            requests[endpoint] = requests.get(endpoint, 0) + 1
+            self.counters["bytes_received"] += nbytes
+
+    def _burst(self):
+        # Rajada permitida: o equivalente a um segundo de envios
+        return max(1.0, self.config.rate_limit_per_minute / 60.0)
+
+    def _take_token(self):
+        """Limite de taxa (token bucket); False se excedido."""
+        rate = self.config.rate_limit_per_minute
+        if not rate:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._burst(), self._tokens + (now - self._updated) * rate / 60.0)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def send(self, kind):
+        """
+        Simula client.sendMessage: espera a latência sorteada e decide o resultado.
+
+        Returns:
+            tuple: (status HTTP, erro ou None)
+        """
+        if not self.config.ready:
+            return 400, "Cliente WhatsApp não está pronto"
+        if not self._take_token():
+            self.count("rate_limited")
+            return 429, "Limite de envio excedido"
+
+        delay = max(0.0, (self._text_latency if kind == "text" else self._file_latency)())
+        time.sleep(delay)
+        self.count("simulated_latency_seconds", delay)
+
+        draw = random.random()
+        if draw < self.config.error_rate:
+            self.count("errors")
+            return 500, TRANSIENT_DETAILS
+        if draw < self.config.error_rate + self.config.permanent_error_rate:
+            self.count("errors")
+            return 500, PERMANENT_DETAILS
+        self.count("messages" if kind == "text" else "files")
+        return 200, None
+
+    def register_media(self, content):
+        media_id = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            self._media[media_id] = len(content)
+        return media_id
+
+    def has_media(self, media_id):
+        with self._lock:
+            return media_id in self._media
+
+
+class _FakeJobQueue:
+    """Fila de envios como a do server.js: limite de trabalhos simultâneos e, para
+    cada destinatário, execução na ordem de chegada."""
+
+    # Estados em que o trabalho não muda mais
+    FINAL_STATES = ("done", "failed", "canceled")
+
+    def __init__(self, fake, concurrency):
+        self.fake = fake
+        self.concurrency = max(1, int(concurrency))
+        self.jobs = {}
+        self._recipients = {}                 # número -> ids pendentes, em ordem
+        self._ready = collections.deque()     # números cujo próximo trabalho pode começar
+        self._cond = threading.Condition()
+        self._sequence = itertools.count(1)
+        self._threads = []
+        self._stopped = False
+
+    def _start(self):
+        # Chamado com o lock: os workers só existem se a fila for usada
+        if not self._threads:
+            self._threads = [threading.Thread(target=self._worker, name=f"fake-job-{i}", daemon=True)
+                             for i in range(self.concurrency)]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def submit(self, items):
+        """Enfileira os trabalhos e retorna seus identificadores, na mesma ordem."""
+        ids = []
+        with self._cond:
+            self._start()
+            for item in items:
+                job_id = f"fake-{next(self._sequence)}"
+                kinds = (["text"] if item.get("message") else []) + ["file"] * len(item.get("mediaIds") or [])
+                self.jobs[job_id] = {
+                    "id": job_id, "number": item["number"], "status": "queued", "kinds": kinds,
+                    "stepsCompleted": 0, "stepDurationsMs": [], "error": None,
+                    "created": time.monotonic(), "started": None, "finished": None,
+                }
+                queue_ = self._recipients.get(item["number"])
+                if queue_ is None:
+                    self._recipients[item["number"]] = collections.deque([job_id])
+                    self._ready.append(item["number"])
+                else:
+                    queue_.append(job_id)
+                ids.append(job_id)
+            self._cond.notify_all()
+        return ids
+
+    def cancel(self, ids):
+        canceled = 0
+        with self._cond:
+            for job_id in ids:
+                job = self.jobs.get(job_id)
+                if job is not None and job["status"] == "queued":
+                    job["status"] = "canceled"
+                    job["finished"] = time.monotonic()
+                    canceled += 1
+            self._cond.notify_all()
+        return canceled
+
+    def status(self, ids, wait):
+        """Estado dos trabalhos; espera até `wait` segundos se nenhum tiver terminado."""
+        deadline = time.monotonic() + wait
+        with self._cond:
+            while True:
+                finished = any(self.jobs.get(i, {"status": "done"})["status"] in self.FINAL_STATES for i in ids)
+                remaining = deadline - time.monotonic()
+                if finished or remaining <= 0 or not ids or self._stopped:
+                    break
+                self._cond.wait(remaining)
+            return [self._serialize(i) for i in ids]
+
+    def counts(self):
+        with self._cond:
+            queued = sum(1 for job in self.jobs.values() if job["status"] == "queued")
+            running = sum(1 for job in self.jobs.values() if job["status"] == "running")
+        return queued, running
+
+    def _serialize(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {"id": job_id, "status": "unknown", "error": "Trabalho não encontrado"}
+        now = time.monotonic()
+        return {
+            "id": job_id, "number": job["number"], "status": job["status"],
+            "stepsCompleted": job["stepsCompleted"], "stepCount": len(job["kinds"]),
+            "error": job["error"], "stepDurationsMs": list(job["stepDurationsMs"]),
+            "queuedMs": int(((job["started"] or job["finished"] or now) - job["created"]) * 1000),
+            "runMs": int(((job["finished"] or now) - job["started"]) * 1000) if job["started"] else 0,
+        }
+
+    def _next(self):
+        """Próximo trabalho a executar (com o lock), descartando os cancelados."""
+        while self._ready:
+            number = self._ready.popleft()
+            queue_ = self._recipients[number]
+            while queue_ and self.jobs[queue_[0]]["status"] == "canceled":
+                queue_.popleft()
+            if queue_:
+                return self.jobs[queue_[0]]
+            del self._recipients[number]
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._next()
+                while job is None:
+                    if self._stopped:
+                        return
+                    self._cond.wait()
+                    job = self._next()
+                job["status"] = "running"
+                job["started"] = time.monotonic()
+
+            for kind in job["kinds"]:
+                started = time.monotonic()
+                status, error = self.fake.send(kind)
+                job["stepDurationsMs"].append(int((time.monotonic() - started) * 1000))
+                if status != 200:
+                    job["error"] = error
+                    break
+                job["stepsCompleted"] += 1
+
+            with self._cond:
+                job["status"] = "done" if job["error"] is None else "failed"
+                job["finished"] = time.monotonic()
+                queue_ = self._recipients[job["number"]]
+                queue_.popleft()
+                if queue_:
+                    self._ready.append(job["number"])  # Próximo do destinatário vai para o fim
+                else:
+                    del self._recipients[job["number"]]
+                self._cond.notify_all()
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # O cliente fecha as conexões keep-alive ao terminar; não é um erro
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    # Keep-alive, como o Express
+    protocol_version = "HTTP/1.1"
+    # TCP_NODELAY, como o servidor HTTP do Node: sem isso, o corpo da resposta
+    # espera o ACK atrasado do cabeçalho (~40 ms por requisição)
+    disable_nagle_algorithm = True
+    fake = None
+
+    def log_message(self, format, *args):
+        pass  # Uma linha por requisição distorceria o benchmark
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        endpoint = self.path.split("?")[0][len("/api/"):].split("/")[0]
+        self.fake.count_request(endpoint, len(body))
+        return body
+
+    def _json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_result(self, status, error, failure_message):
+        if status == 200:
+            self._json(200, {"success": True, "messageId": f"fake_{random.getrandbits(64):016x}"})
+        elif status == 500:
+            self._json(500, {"error": failure_message, "details": error})
+        else:
+            self._json(status, {"error": error})
+
+    def _form(self, body):
+        """Lê um corpo multipart/form-data: (campos, arquivos como {nome: bytes})."""
+        header = f"Content-Type: {self.headers.get('Content-Type', '')}\r\n\r\n".encode("utf-8")
+        message = BytesParser(policy=policy.default).parsebytes(header + body)
+        fields, files = {}, {}
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if part.get_filename() is not None:
+                files[name] = part.get_payload(decode=True) or b""
+            else:
+                fields[name] = part.get_content().strip()
+        return fields, files
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        self._read_body()
+        if path == "/api/status":
+            self._json(200, {"ready": self.fake.config.ready, "qrCode": not self.fake.config.ready})
+        elif path == "/api/qrcode":
+            if self.fake.config.ready:
+                self._json(202, {"message": "QR Code não disponível. Reiniciando sessão. "
+                                            "Tente novamente em 5 segundos."})
+            else:
+                self._json(200, {"qrCodeText": QR_CODE_TEXT})
+        elif path == "/api/events":
+            self._events()
+        elif path.startswith("/api/media/"):
+            media_id = path[len("/api/media/"):]
+            if self.fake.has_media(media_id):
+                self._json(200, {"success": True, "mediaId": media_id})
+            else:
+                self._json(404, {"error": "Mídia não encontrada"})
+        else:
+            self._json(404, {"error": "Rota não encontrada"})
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        body = self._read_body()
+        handler = {
+            "/api/send-message": self._send_message,
+            "/api/send-file": self._send_file,
+            "/api/media": self._register_media,
+            "/api/send-media": self._send_media,
+            "/api/send-batch": self._send_batch,
+            "/api/analyze-batch": self._analyze_batch,
+            "/api/jobs": self._submit_jobs,
+            "/api/jobs/status": self._job_status,
+            "/api/jobs/cancel": self._cancel_jobs,
+        }.get(path)
+        if handler is None:
+            self._json(404, {"error": "Rota não encontrada"})
+            return
+        try:
+            handler(body)
+        except (ValueError, KeyError) as e:
+            self._json(400, {"error": f"Requisição inválida: {e}"})
+
+    def _send_message(self, body):
+        data = json.loads(body or b"{}")
+        if not data.get("number") or not data.get("message"):
+            self._json(400, {"error": "Número e mensagem são obrigatórios"})
+            return
+        status, error = self.fake.send("text")
+        self._send_result(status, error, "Erro ao enviar mensagem")
+
+    def _send_file(self, body):
+        fields, files = self._form(body)
+        if not fields.get("number") or "file" not in files:
+            self._json(400, {"error": "Número e arquivo são obrigatórios"})
+            return
+        status, error = self.fake.send("file")
+        self._send_result(status, error, "Erro ao enviar arquivo")
+
+    def _register_media(self, body):
+        _, files = self._form(body)
+        if "file" not in files:
+            self._json(400, {"error": "Arquivo é obrigatório"})
+            return
+        media_id = self.fake.register_media(files["file"])
+        self._json(200, {"success": True, "mediaId": media_id, "size": len(files["file"]), "cached": False})
+
+    def _send_media(self, body):
+        data = json.loads(body or b"{}")
+        if not data.get("number") or not data.get("mediaId"):
+            self._json(400, {"error": "Número e mídia são obrigatórios"})
+            return
+        if not self.fake.has_media(data["mediaId"]):
+            self._json(404, {"error": "Mídia não encontrada"})
+            return
+        status, error = self.fake.send("file")
+        self._send_result(status, error, "Erro ao enviar arquivo")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _events(self):
+        """Fluxo Server-Sent Events com o estado atual e os eventos publicados depois."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_event(event, data):
+            self._write_chunk(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+
+        events = self.fake.subscribe()
+        try:
+            self._write_chunk(b"retry: 3000\n\n")
+            ready = self.fake.config.ready
+            write_event("status", {"ready": ready, "qrCode": not ready})
+            if not ready:
+                write_event("qr", {"qr": QR_CODE_TEXT})
+            while True:
+                try:
+                    item = events.get(timeout=EVENTS_HEARTBEAT)
+                except queue.Empty:
+                    self._write_chunk(b": ping\n\n")
+                    continue
+                if item is None:
+                    self._write_chunk(b"")
+                    return
+                write_event(*item)
+        finally:
+            self.fake.unsubscribe(events)
+
+    def _send_batch(self, body):
+        data = json.loads(body or b"{}")
+        jobs = data.get("jobs")
+        if not isinstance(jobs, list) or not jobs:
+            self._json(400, {"error": "Lista de trabalhos é obrigatória"})
+            return
+        missing = sorted({m for job in jobs for m in job.get("mediaIds") or []
+                          if not self.fake.has_media(m)})
+        if missing:
+            self._json(404, {"error": "Mídia não encontrada", "mediaIds": missing})
+            return
+        interval = max(int(data.get("intervalMs") or 0), 0) / 1000.0
+        jitter_min, jitter_max = [v / 1000.0 for v in (data.get("jitterMs") or [0, 0])]
+
+        # Resultados em fluxo (NDJSON), um por linha, como o server.js
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, job in enumerate(jobs):
+            if i > 0 and (interval > 0 or jitter_max > 0):
+                time.sleep(interval + random.uniform(jitter_min, jitter_max))
+            line = {"index": i, "number": job.get("number"), "success": True, "stepsCompleted": 0}
+            steps = (["text"] if job.get("message") else []) + ["file"] * len(job.get("mediaIds") or [])
+            for kind in steps:
+                status, error = self.fake.send(kind)
+                if status != 200:
+                    line["success"] = False
+                    line["error"] = error
+                    break
+                line["stepsCompleted"] += 1
+            self._write_chunk((json.dumps(line) + "\n").encode("utf-8"))
+        self._write_chunk(b"")
+
+    def _submit_jobs(self, body):
+        items = json.loads(body or b"{}").get("jobs")
+        if not self.fake.config.ready:
+            self._json(400, {"error": "Cliente WhatsApp não está pronto"})
+            return
+        if not isinstance(items, list) or not items:
+            self._json(400, {"error": "Lista de trabalhos é obrigatória"})
+            return
+        for index, item in enumerate(items):
+            if not item.get("number") or (not item.get("message") and not item.get("mediaIds")):
+                self._json(400, {"error": "Número e mensagem são obrigatórios", "index": index})
+                return
+        missing = sorted({m for item in items for m in item.get("mediaIds") or []
+                          if not self.fake.has_media(m)})
+        if missing:
+            self._json(404, {"error": "Mídia não encontrada", "mediaIds": missing})
+            return
+        ids = self.fake.jobs.submit(items)
+        self._json(202, {"success": True, "jobs": [{"id": job_id, "status": "queued"} for job_id in ids]})
+
+    def _job_status(self, body):
+        data = json.loads(body or b"{}")
+        ids = [str(i) for i in data.get("ids") or []]
+        wait = min(max(int(data.get("waitMs") or 0), 0), 30000) / 1000.0
+        jobs = self.fake.jobs.status(ids, wait)
+        queued, running = self.fake.jobs.counts()
+        self._json(200, {"jobs": jobs, "queued": queued, "running": running})
+
+    def _cancel_jobs(self, body):
+        ids = [str(i) for i in json.loads(body or b"{}").get("ids") or []]
+        self._json(200, {"success": True, "canceled": self.fake.jobs.cancel(ids)})
+
+    def _analyze_batch(self, body):
+        numbers = json.loads(body or b"{}").get("numbers")
+        if not isinstance(numbers, list):
+            self._json(400, {"error": "Lista de números é obrigatória"})
+            return
+        results = []
+        by_country = {}
+        for number in numbers:
+            info = phone_numbers.analyze_number(str(number))
+            country = info["countryInfo"]["country"]
+            by_country[country] = by_country.get(country, 0) + 1
+            results.append(info)
+        self._json(200, {
+            "results": results,
+            "stats": {
+                "total": len(results),
+                "formatted": sum(1 for r in results if r["countryInfo"]["isFormatted"]),
+                "byCountry": by_country,
+            },
+        })
+
+
+def add_config_arguments(parser):
+    """Adiciona ao parser as opções de comportamento do servidor simulado."""
+    parser.add_argument("--latency", default="0",
+                        help="Latência dos textos: const:S, uniform:A:B, exp:MÉDIA ou lognormal:MEDIANA:SIGMA")
+    parser.add_argument("--file-latency", default=None,
+                        help="Latência de arquivos e mídias (padrão: a mesma dos textos)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fração de envios com erro transitório")
+    parser.add_argument("--permanent-error-rate", type=float, default=0.0,
+                        help="Fração de envios com número inválido")
+    parser.add_argument("--rate-limit", type=float, default=0,
+                        help="Envios por minuto antes de responder 429 (0 desativa)")
+    parser.add_argument("--send-concurrency", type=int, default=2,
+                        help="Trabalhos da fila de envios executados ao mesmo tempo (SEND_CONCURRENCY)")
+
+
+def config_from_args(args):
+    return FakeServerConfig(
+        latency=args.latency,
+        file_latency=args.file_latency,
+        error_rate=args.error_rate,
+        permanent_error_rate=args.permanent_error_rate,
+        rate_limit_per_minute=args.rate_limit,
+        send_concurrency=args.send_concurrency,
+        ready=not getattr(args, "not_ready", False),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API do WhatsApp Messenger.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--not-ready", action="store_true",
+                        help="Simula a sessão aguardando a leitura do QR code")
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = FakeWhatsAppServer(config_from_args(args), args.host, args.port)
+    print(f"Servidor simulado em {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.counters, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# send_benchmark.py - Benchmark do pipeline de envio contra o servidor simulado
+#
+# Uso (a partir da raiz do projeto):
+#   python benchmarks/send_benchmark.py --contacts 2000 --concurrency 4 --latency lognormal:0.05:0.5
+#   python benchmarks/send_benchmark.py --batch-size 50 --attach-kb 256 --baseline resultado-anterior.json
+#
+# Executa o SendEngine real (o mesmo da interface e do modo headless) contra o
+# fake_server.py e grava o resultado em JSON para comparar execuções.
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "client"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_server import FakeWhatsAppServer, add_config_arguments, config_from_args  # noqa: E402
+from send_engine import SendEngine  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Métricas comparadas com --baseline: (chave, True se maior é melhor)
+COMPARED_METRICS = (
+    ("recipients_per_second", True),
+    ("messages_per_second", True),
+    ("overhead_ms_per_recipient", False),
+    ("peak_memory_mb", False),
+    ("upload_bytes", False),
+)
+
+
+def _peak_rss_mb():
+    """Pico de memória residente do processo (inclui o servidor simulado), em MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _make_attachments(directory, sizes_kb):
+    paths = []
+    for i, size_kb in enumerate(sizes_kb):
+        path = os.path.join(directory, f"anexo_{i}.bin")
+        with open(path, "wb") as f:
+            f.write(os.urandom(int(size_kb * 1024)))
+        paths.append(path)
+    return paths
+
+
+def run_benchmark(args):
+    """Executa uma rodada e retorna o dicionário de resultados."""
+    server = FakeWhatsAppServer(config_from_args(args)).start()
+    contacts = [f"55119{i:08d}" for i in range(args.contacts)]
+    message = "x" * args.message_size
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = _make_attachments(directory, args.attach_kb)
+        engine = SendEngine(
+            server.base_url,
+            concurrency=args.concurrency,
+            rate_per_minute=args.rate,
+            max_attempts=args.retries,
+            retry_delay=args.retry_delay,
+            batch_size=args.batch_size,
+            submit_ahead=args.submit_ahead,
+            adaptive=args.adaptive,
+        )
+
+        if args.trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        summary = engine.run(contacts, message, files, total=len(contacts))
+        wall = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+        peak_memory = None
+        if args.trace_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+
+    server.stop()
+    counters = server.counters
+    sent = counters["messages"] + counters["files"]
+    recipients = summary["successful"] + summary["failed"]
+    # Tempo por destinatário não explicado pela latência simulada (exato com concurrency=1)
+    overhead = (wall * args.concurrency - counters["simulated_latency_seconds"]) / recipients if recipients else None
+
+    return {
+        "recipients": recipients,
+        "successful": summary["successful"],
+        "failed": summary["failed"],
+        "messages_sent": sent,
+        "wall_seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        "recipients_per_second": round(recipients / wall, 3) if wall else None,
+        "messages_per_second": round(sent / wall, 3) if wall else None,
+        "overhead_ms_per_recipient": round(overhead * 1000, 3) if overhead is not None else None,
+        "peak_memory_mb": round(peak_memory, 2) if peak_memory is not None else None,
+        "peak_rss_mb": round(_peak_rss_mb(), 2) if resource is not None else None,
+        "upload_bytes": summary["upload_bytes"],
+        "server_bytes_received": counters["bytes_received"],
+        "connections_opened": summary["connections_opened"],
+        "connections_reused": summary["connections_reused"],
+        "server": counters,
+        "latency": summary["stats"]["latency"],
+    }
+
+
+def compare(results, baseline_path):
+    """Imprime a variação das principais métricas em relação a um resultado anterior."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    print(f"Comparação com {baseline_path}:")
+    for key, higher_is_better in COMPARED_METRICS:
+        old, new = baseline.get(key), results.get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        worse = change < 0 if higher_is_better else change > 0
+        flag = "  <- piorou" if worse and abs(change) >= 5 else ""
+        print(f"  {key:<28} {old:>12} -> {new:>12} ({change:+.1f}%){flag}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Mede o pipeline de envio do cliente contra um servidor simulado local."
+    )
+    parser.add_argument("--contacts", type=int, default=500, help="Quantidade de destinatários")
+    parser.add_argument("--message-size", type=int, default=200, help="Tamanho da mensagem em caracteres")
+    parser.add_argument("--attach-kb", type=float, nargs="*", default=[],
+                        help="Tamanho de cada anexo em KB (ex: --attach-kb 100 2048)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Envios simultâneos")
+    parser.add_argument("--batch-size", type=int, default=1, help="Destinatários por requisição")
+    parser.add_argument("--submit-ahead", type=int, default=0,
+                        help="Contatos enfileirados antecipadamente na fila do servidor (/api/jobs)")
+    parser.add_argument("--rate", type=float, default=1e6,
+                        help="Limite do cliente em destinatários por minuto (padrão: sem limite)")
+    parser.add_argument("--adaptive", action="store_true", help="Ritmo adaptativo (AIMD)")
+    parser.add_argument("--retries", type=int, default=2, help="Tentativas por destinatário")
+    parser.add_argument("--retry-delay", type=float, default=0.1, help="Espera após a primeira falha")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Mede o pico de memória com tracemalloc (reduz a vazão)")
+    add_config_arguments(parser)
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: benchmarks/results/send-<data>.json)")
+    parser.add_argument("--baseline", help="Resultado anterior para comparação")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_benchmark(args)
+    report = {
+        "benchmark": "send",
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, datetime.datetime.now().strftime("send-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    for key in ("recipients", "successful", "failed", "wall_seconds", "recipients_per_second",
+                "messages_per_second", "overhead_ms_per_recipient", "peak_memory_mb", "peak_rss_mb",
+                "upload_bytes"):
+        print(f"{key:<28} {results[key]}")
+    print(f"Resultado gravado em {output}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
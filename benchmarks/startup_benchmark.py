@@ -0,0 +1,225 @@
+# startup_benchmark.py - Tempo de inicialização da interface gráfica
+#
+# Uso (a partir da raiz do projeto):
+#   python benchmarks/startup_benchmark.py --runs 5 --budget-ms 1500 --import-budget-ms 400
+#   python benchmarks/startup_benchmark.py --command "dist/WhatsApp Messenger Pro/WhatsApp Messenger Pro"
+#
+# Mede, em processos novos:
+#   - o tempo até a primeira janela: do início do processo até a interface
+#     imprimir o marcador de WPP_STARTUP_PROBE (requer um display);
+#   - o total de `python -X importtime -c "import whatsapp_messenger"` e os
+#     módulos mais caros, indicando se algum módulo pesado voltou a ser
+#     carregado na inicialização.
+# Com --budget-ms/--import-budget-ms, termina com código 1 se a mediana passar do limite.
+import argparse
+import datetime
+import json
+import os
+import platform
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIENT_DIR = os.path.join(ROOT_DIR, "client")
+GUI_SCRIPT = os.path.join(CLIENT_DIR, "whatsapp_messenger.py")
+DEFAULT_RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+# Mesmos valores de whatsapp_messenger.py (não importado aqui para não pesar na medição)
+STARTUP_PROBE_ENV = "WPP_STARTUP_PROBE"
+STARTUP_PROBE_MARKER = "WPP_STARTUP_READY"
+
+# Módulos que devem ser carregados só no primeiro uso (o Pillow fica de fora:
+# o próprio ttkbootstrap o importa)
+DEFERRED_MODULES = ("pandas", "numpy", "aiohttp", "qrcode")
+
+# Métricas comparadas com --baseline (todas: menor é melhor)
+COMPARED_METRICS = ("first_window_ms_median", "import_ms_median")
+
+
+def measure_first_window(command, timeout):
+    """
+    Inicia a aplicação e espera o marcador da primeira janela.
+
+    Returns:
+        float: Milissegundos desde o início do processo, ou None se o marcador não apareceu
+    """
+    env = dict(os.environ, **{STARTUP_PROBE_ENV: "1"})
+    # Diretório temporário: o log e demais arquivos da execução não sujam o projeto
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        process = subprocess.Popen(command, cwd=directory, env=env, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, text=True)
+        elapsed = None
+        try:
+            for line in process.stdout:
+                if line.strip() == STARTUP_PROBE_MARKER:
+                    elapsed = (time.perf_counter() - started) * 1000
+                    break
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            pass
+        finally:
+            if process.poll() is None:
+                process.kill()
+            _, stderr = process.communicate()
+    if elapsed is None and stderr.strip():
+        print(f"A aplicação não abriu a janela:\n{stderr.strip()[-2000:]}", file=sys.stderr)
+    return elapsed
+
+
+def parse_importtime(output):
+    """
+    Interpreta a saída de `python -X importtime`.
+
+    Returns:
+        list: (módulo, self em µs, acumulado em µs) na ordem em que aparecem
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Cabeçalho
+        modules.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return modules
+
+
+def measure_imports(module="whatsapp_messenger"):
+    """
+    Importa o módulo num processo novo com -X importtime.
+
+    Returns:
+        tuple: (total em ms, lista de parse_importtime)
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=CLIENT_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}:\n{result.stderr[-2000:]}")
+    modules = parse_importtime(result.stderr)
+    return sum(own for _, own, _ in modules) / 1000, modules
+
+
+def _summary(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None, None, None
+    return round(values[0], 1), round(statistics.median(values), 1), round(min(values), 1)
+
+
+def run_benchmark(args):
+    """Executa as rodadas e retorna o dicionário de resultados."""
+    results = {}
+
+    import_totals, modules = [], []
+    for _ in range(args.runs):
+        total, modules = measure_imports()
+        import_totals.append(total)
+    loaded = {name for name, _, _ in modules}
+    results["import_ms_first"], results["import_ms_median"], results["import_ms_min"] = _summary(import_totals)
+    results["import_ms_runs"] = [round(v, 1) for v in import_totals]
+    results["top_imports"] = [
+        {"module": name, "self_ms": round(own / 1000, 1), "cumulative_ms": round(cumulative / 1000, 1)}
+        for name, own, cumulative in sorted(modules, key=lambda m: m[2], reverse=True)[:args.top]
+    ]
+    results["deferred_modules_loaded"] = [m for m in DEFERRED_MODULES if m in loaded]
+
+    window_times = []
+    if not args.skip_window:
+        command = shlex.split(args.command) if args.command else [sys.executable, GUI_SCRIPT]
+        for _ in range(args.runs):
+            window_times.append(measure_first_window(command, args.timeout))
+    results["first_window_ms_first"], results["first_window_ms_median"], results["first_window_ms_min"] = \
+        _summary(window_times)
+    results["first_window_ms_runs"] = [round(v, 1) if v is not None else None for v in window_times]
+    return results
+
+
+def compare(results, baseline_path):
+    """Imprime a variação das principais métricas em relação a um resultado anterior."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    print(f"Comparação com {baseline_path}:")
+    for key in COMPARED_METRICS:
+        old, new = baseline.get(key), results.get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        flag = "  <- piorou" if change >= 5 else ""
+        print(f"  {key:<28} {old:>10} -> {new:>10} ({change:+.1f}%){flag}")
+
+
+def check_budget(results, args):
+    """Retorna a lista de limites estourados."""
+    exceeded = []
+    checks = (("first_window_ms_median", args.budget_ms), ("import_ms_median", args.import_budget_ms))
+    for key, budget in checks:
+        value = results.get(key)
+        if budget is not None and value is not None and value > budget:
+            exceeded.append(f"{key} = {value} ms (limite {budget} ms)")
+    if args.budget_ms is not None and not args.skip_window and results["first_window_ms_median"] is None:
+        exceeded.append("a primeira janela não foi medida")
+    return exceeded
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Mede o tempo até a primeira janela e o tempo de importação da interface."
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Processos iniciados por medição")
+    parser.add_argument("--command",
+                        help="Comando que abre a aplicação (ex: o executável empacotado); "
+                             "padrão: python client/whatsapp_messenger.py")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Espera máxima por execução (segundos)")
+    parser.add_argument("--skip-window", action="store_true",
+                        help="Mede só as importações (ex: em máquinas sem display)")
+    parser.add_argument("--top", type=int, default=10, help="Quantidade de módulos mais caros no relatório")
+    parser.add_argument("--budget-ms", type=float, help="Limite para a mediana do tempo até a primeira janela")
+    parser.add_argument("--import-budget-ms", type=float, help="Limite para a mediana do tempo de importação")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: benchmarks/results/startup-<data>.json)")
+    parser.add_argument("--baseline", help="Resultado anterior para comparação")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_benchmark(args)
+    report = {
+        "benchmark": "startup",
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, datetime.datetime.now().strftime("startup-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    for key in ("first_window_ms_first", "first_window_ms_median", "first_window_ms_min",
+                "import_ms_first", "import_ms_median", "import_ms_min"):
+        print(f"{key:<28} {results[key]}")
+    print("Importações mais caras (acumulado):")
+    for entry in results["top_imports"]:
+        print(f"  {entry['module']:<40} {entry['cumulative_ms']:>8} ms")
+    if results["deferred_modules_loaded"]:
+        print(f"Atenção: carregados na inicialização: {', '.join(results['deferred_modules_loaded'])}")
+    print(f"Resultado gravado em {output}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+    exceeded = check_budget(results, args)
+    for message in exceeded:
+        print(f"Limite estourado: {message}", file=sys.stderr)
+    return 1 if exceeded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
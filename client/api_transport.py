@@ -0,0 +1,152 @@
+# api_transport.py
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Arquivo em que o servidor grava a porta em uso
+PORT_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server", "server_port.txt")
+
+# Função para obter a porta do servidor
+def get_server_port(port_file=PORT_FILE):
+    """Obtém a porta do servidor a partir do arquivo server_port.txt ou usa a porta padrão."""
+    try:
+        if os.path.exists(port_file):
+            with open(port_file, 'r') as f:
+                return int(f.read().strip())
+    except Exception as e:
+        print(f"Erro ao ler porta do servidor: {e}")
+    
+    # Retorna a porta padrão se não conseguir ler o arquivo
+    return 3000
+
+# Portas alternativas para tentar se a principal falhar
+ALTERNATIVE_PORTS = [3000, 3001, 3002, 3003, 3004, 3005]
+
+# Tamanho padrão do pool de conexões keep-alive com o servidor
+DEFAULT_POOL_SIZE = 4
+
+# Tentativas automáticas para falhas de conexão (o pedido nem chegou ao servidor)
+DEFAULT_RETRIES = 2
+
+# Timeouts (conexão, leitura) em segundos para cada endpoint da API
+ENDPOINT_TIMEOUTS = {
+    "status": (2, 2),
+    "qrcode": (2, 10),
+    "request-new-qrcode": (2, 10),
+    "reset-session": (2, 10),
+    "analyze-batch": (2, 10),
+    "send-message": (2, 30),
+    "send-file": (2, 60),  # Timeout maior para upload de arquivos
+}
+
+# Timeout usado para endpoints sem configuração específica
+DEFAULT_TIMEOUT = (2, 10)
+
+
+class ApiTransport:
+    """Camada de transporte compartilhada para todas as chamadas à API do servidor.
+
+    Mantém uma única requests.Session com pool de conexões keep-alive, timeouts
+    por endpoint e adaptador de novas tentativas, evitando abrir uma conexão TCP
+    nova a cada mensagem enviada.
+    """
+
+    def __init__(self, base_url, pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES,
+                 backoff_factor=0.3, timeouts=None):
+        """
+        Args:
+            base_url (str): URL base da API (ex: http://localhost:3000/api)
+            pool_size (int): Número máximo de conexões mantidas abertas por host
+            retries (int): Tentativas para erros de conexão e respostas 502/503/504 em GET
+            backoff_factor (float): Fator de espera exponencial entre tentativas
+            timeouts (dict): Timeouts por endpoint que substituem os padrões
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeouts = dict(ENDPOINT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+        # Erros de conexão são sempre repetidos (o servidor não recebeu nada);
+        # erros de leitura nunca, para não duplicar mensagens já enviadas.
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            allowed_methods=frozenset({"GET"}),
+            status_forcelist=(502, 503, 504),
+            backoff_factor=backoff_factor,
+            raise_on_status=False,
+        )
+        self._adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                                    max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._request_count = 0
+
+    def url(self, endpoint, base_url=None):
+        """Monta a URL completa de um endpoint."""
+        return f"{(base_url or self.base_url).rstrip('/')}/{endpoint.lstrip('/')}"
+
+    def request(self, method, endpoint, base_url=None, timeout=None, **kwargs):
+        """Executa uma requisição reaproveitando as conexões do pool.
+
+        Args:
+            method (str): Método HTTP
+            endpoint (str): Endpoint relativo à URL base (ex: "send-message")
+            base_url (str): URL base alternativa (ex: para testar outra porta)
+            timeout: Timeout explícito; se omitido usa o configurado para o endpoint
+
+        Returns:
+            requests.Response: Resposta do servidor
+        """
+        if timeout is None:
+            timeout = self.timeouts.get(endpoint.strip("/"), DEFAULT_TIMEOUT)
+
+        with self._lock:
+            self._request_count += 1
+
+        return self.session.request(method, self.url(endpoint, base_url), timeout=timeout, **kwargs)
+
+    def get(self, endpoint, **kwargs):
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self.request("POST", endpoint, **kwargs)
+
+    def connection_stats(self):
+        """Retorna contadores de reutilização das conexões do pool.
+
+        Returns:
+            dict: requests (requisições feitas), connections_opened (conexões TCP
+            abertas) e connections_reused (requisições que reaproveitaram conexão)
+        """
+        opened = 0
+        pool_requests = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            pool_requests += pool.num_requests
+
+        with self._lock:
+            request_count = self._request_count
+
+        return {
+            "requests": request_count,
+            "connections_opened": opened,
+            "connections_reused": max(pool_requests - opened, 0),
+        }
+
+    def close(self):
+        """Fecha todas as conexões mantidas pelo pool."""
+        self.session.close()
@@ -0,0 +1,294 @@
+# campaign.py - Execução de campanhas sem interface gráfica
+#
+# Uso (a partir da raiz do projeto):
+#   python -m client.campaign run contatos.csv --message mensagem.txt --attach arquivo.pdf
+#
+# O progresso é impresso na saída padrão como JSON lines (um objeto JSON por linha),
+# permitindo rodar campanhas em servidores sem tela (cron, systemd).
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+
+# Permite executar tanto como `python -m client.campaign` quanto `python client/campaign.py`
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_transport import ApiTransport, get_server_port  # noqa: E402
+from send_engine import SendEngine  # noqa: E402
+import contact_loader  # noqa: E402
+import metrics  # noqa: E402
+import profiling  # noqa: E402
+from campaign_journal import CampaignJournal, DEFAULT_JOURNAL_DIR  # noqa: E402
+from suppression import SuppressionStore, DEFAULT_DB_PATH  # noqa: E402
+
+
+def emit(event, **fields):
+    """Imprime um evento de progresso como uma linha JSON."""
+    record = {"ts": round(time.time(), 3), "event": event}
+    record.update(fields)
+    with profiling.span("json"):
+        line = json.dumps(record, ensure_ascii=False)
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
+def read_message(args):
+    """Obtém o texto da mensagem a partir de --message (arquivo) ou --text."""
+    if args.message:
+        with open(args.message, encoding="utf-8") as f:
+            return f.read().strip()
+    return (args.text or "").strip()
+
+
+def dump_profile():
+    """Grava o relatório do modo de perfil (WPP_PROFILE), se ativo."""
+    try:
+        path = profiling.PROFILER.dump()
+    except OSError as e:
+        emit("log", level="WARNING", message=f"Não foi possível gravar o relatório de perfil: {e}")
+        return
+    if path:
+        emit("log", level="INFO", message=f"Relatório de perfil gravado em {path}")
+        for line in profiling.PROFILER.report().splitlines():
+            emit("log", level="INFO", message=line)
+
+
+def record_contacted(store, journal, successful):
+    """Registra na base de supressão os números que receberam a mensagem."""
+    if journal:
+        # O diário também cobre os envios feitos antes de uma retomada
+        numbers = [number for _, number, success in journal.iter_results() if success]
+    else:
+        numbers = successful
+    try:
+        store.record_contacted(numbers)
+    except Exception as e:
+        emit("log", level="WARNING", message=f"Erro ao atualizar a base de supressão: {e}")
+
+
+def opt_out(args):
+    """Marca (ou desmarca) números como descadastrados na base de supressão."""
+    numbers = list(args.numbers)
+    try:
+        if args.file:
+            numbers.extend(contact_loader.load_contacts(args.file, header=not args.no_header))
+        count = SuppressionStore(args.suppression_db).opt_out(numbers, opted_out=not args.undo)
+    except Exception as e:
+        emit("error", message=f"Erro ao atualizar a base de supressão: {e}")
+        return 2
+    emit("done", updated=count, opted_out=not args.undo)
+    return 0
+
+
+def run_campaign(args):
+    """Executa uma campanha completa e retorna o código de saída do processo."""
+    base_url = args.base_url or f"http://localhost:{args.port or get_server_port()}/api"
+
+    header = not args.no_header
+    try:
+        # Os contatos são lidos em blocos durante o envio; só a contagem é feita antes
+        total = contact_loader.count_rows(args.contacts, header=header)
+        contacts = contact_loader.iter_contacts(args.contacts, header=header,
+                                                phone_column=args.phone_column)
+        msg_text = read_message(args)
+    except Exception as e:
+        emit("error", message=f"Erro ao ler os arquivos de entrada: {e}")
+        return 2
+
+    for file_path in args.attach:
+        if not os.path.isfile(file_path):
+            emit("error", message=f"Arquivo de anexo não encontrado: {file_path}")
+            return 2
+
+    if not total:
+        emit("error", message="Nenhum contato carregado.")
+        return 2
+    if not msg_text and not args.attach:
+        emit("error", message="Informe uma mensagem ou pelo menos um arquivo.")
+        return 2
+
+    # Verifica se o servidor está pronto antes do envio
+    transport = ApiTransport(base_url)
+    try:
+        response = transport.get("status", timeout=5)
+        if response.status_code != 200 or not response.json().get("ready", False):
+            emit("error", message="Servidor não está pronto. Verifique a conexão e autenticação.")
+            return 2
+    except Exception as e:
+        emit("error", message=f"Erro de conexão com o servidor: {e}")
+        return 2
+    finally:
+        transport.close()
+
+    # Remove descadastrados, contatados recentemente e duplicados. Requer a lista inteira em
+    # memória (a remoção de duplicados e o diário dependem dela): só com --no-suppression os
+    # contatos são lidos em fluxo
+    store = None
+    filtered = None
+    if not args.no_suppression:
+        try:
+            store = SuppressionStore(args.suppression_db)
+            with profiling.span("supressão"):
+                filtered, stats = store.filter(
+                    contact_loader.load_contacts(args.contacts, header=header, phone_column=args.phone_column),
+                    args.skip_contacted_days
+                )
+        except Exception as e:
+            emit("error", message=f"Erro ao aplicar a base de supressão: {e}")
+            return 2
+        emit("log", level="INFO", message="Base de supressão aplicada", **stats)
+        if not filtered:
+            emit("error", message="Nenhum contato restante após a supressão.")
+            return 2
+        contacts = filtered
+        total = len(filtered)
+
+    # Diário da campanha: uma nova execução com os mesmos parâmetros continua de onde parou
+    journal = None
+    if not args.no_journal:
+        try:
+            journal = CampaignJournal.open(args.contacts, msg_text, args.attach, total,
+                                           contacts=filtered, base_dir=args.journal_dir)
+        except OSError as e:
+            emit("error", message=f"Não foi possível abrir o diário da campanha: {e}")
+            return 2
+        if args.restart:
+            journal.reset()
+
+    # Números para a base de supressão: com diário eles são lidos dele no final, e sem a base
+    # não são usados, então a lista só existe sem diário (evita crescer com a campanha)
+    successful = [] if store and not journal else None
+
+    def on_result(r):
+        if r.success and successful is not None:
+            successful.append(r.number)
+        emit("result", index=r.index, number=r.number, success=r.success,
+             error=r.error, attempts=r.attempts, elapsed=round(r.elapsed, 3))
+
+    def on_progress(done, total, eta):
+        stats = engine.stats
+        emit("progress", done=done, total=total,
+             eta_seconds=int(eta) if eta is not None else None,
+             throughput_per_minute=round(stats.throughput, 2) if stats.throughput else None,
+             error_rate_1m=stats.errors_1m.rate())
+
+    engine = SendEngine(
+        base_url,
+        concurrency=args.concurrency,
+        rate_per_minute=60.0 / max(args.interval, 1),
+        jitter=(1, 3) if args.random_interval else (0, 0),
+        max_attempts=args.retries,
+        batch_size=args.batch_size,
+        submit_ahead=args.submit_ahead,
+        journal=journal,
+        adaptive=args.adaptive,
+        on_log=lambda message, level: emit("log", level=level, message=message),
+        on_result=on_result,
+        on_progress=on_progress,
+        on_rate=lambda rate, reason: emit("rate", rate_per_minute=round(rate, 2), reason=reason),
+    )
+
+    # SIGINT/SIGTERM interrompem o envio de forma ordenada
+    def handle_signal(signum, frame):
+        emit("log", level="WARNING", message="Interrupção solicitada. Finalizando envios em andamento...")
+        engine.stop()
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    # Endpoint/arquivo de métricas, se configurados (WPP_METRICS_PORT, WPP_METRICS_TEXTFILE)
+    exporters = metrics.start_from_env()
+    emit("start", contacts=total, files=len(args.attach), base_url=base_url,
+         journal=journal.directory if journal else None)
+    try:
+        with profiling.span("envio"), profiling.PROFILER.cprofile():
+            summary = engine.run(contacts, msg_text, args.attach, total=total)
+    except Exception as e:
+        emit("error", message=f"Erro durante o envio: {e}")
+        return 1
+    finally:
+        if journal:
+            journal.close()
+        metrics.stop_exporters(exporters)
+        dump_profile()
+    if store:
+        record_contacted(store, journal, successful)
+    emit("done", **summary)
+
+    if summary["interrupted"]:
+        return 130
+    return 1 if summary["failed"] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m client.campaign",
+        description="Executa campanhas do WhatsApp Messenger sem interface gráfica."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Envia a mensagem para todos os contatos do arquivo")
+    run.add_argument("contacts", help="Arquivo CSV/XLSX com os números na primeira coluna")
+    message = run.add_mutually_exclusive_group()
+    message.add_argument("--message", help="Arquivo de texto com a mensagem")
+    message.add_argument("--text", help="Mensagem informada diretamente")
+    run.add_argument("--attach", action="append", default=[], metavar="ARQUIVO",
+                     help="Arquivo a anexar (pode ser repetido)")
+    run.add_argument("--no-header", action="store_true",
+                     help="A primeira linha do arquivo já é um contato")
+    run.add_argument("--phone-column", default=0,
+                     type=lambda v: int(v) if v.isdigit() else v,
+                     help="Posição (a partir de 0) ou nome da coluna de telefones (padrão: 0)")
+    run.add_argument("--interval", type=int, default=3,
+                     help="Intervalo entre mensagens em segundos (padrão: 3)")
+    run.add_argument("--random-interval", action="store_true",
+                     help="Adiciona variação aleatória de 1-3s ao intervalo")
+    run.add_argument("--adaptive", action="store_true",
+                     help="Ajusta o ritmo pela latência e erros do servidor; --interval passa a ser o limite")
+    run.add_argument("--concurrency", type=int, default=1,
+                     help="Envios simultâneos (padrão: 1)")
+    run.add_argument("--retries", type=int, default=2,
+                     help="Tentativas por mensagem (padrão: 2)")
+    run.add_argument("--batch-size", type=int, default=1,
+                     help="Contatos por requisição; acima de 1 usa o envio em lote (padrão: 1)")
+    run.add_argument("--submit-ahead", type=int, default=0,
+                     help="Contatos enfileirados no servidor sem esperar os envios anteriores; "
+                          "os resultados são conferidos em lote (padrão: 0, desativado)")
+    run.add_argument("--journal-dir", default=DEFAULT_JOURNAL_DIR,
+                     help=f"Diretório dos diários de campanha (padrão: {DEFAULT_JOURNAL_DIR})")
+    journal = run.add_mutually_exclusive_group()
+    journal.add_argument("--restart", action="store_true",
+                         help="Ignora o progresso registrado e envia novamente a todos")
+    journal.add_argument("--no-journal", action="store_true",
+                         help="Não registra o progresso (a campanha não poderá ser retomada)")
+    run.add_argument("--suppression-db", default=DEFAULT_DB_PATH,
+                     help=f"Base de números contatados e descadastrados (padrão: {DEFAULT_DB_PATH})")
+    run.add_argument("--skip-contacted-days", type=int, default=0, metavar="DIAS",
+                     help="Ignora quem recebeu mensagem nos últimos DIAS dias (padrão: 0, desativado)")
+    run.add_argument("--no-suppression", action="store_true",
+                     help="Não consulta nem atualiza a base de supressão (lê os contatos em fluxo)")
+    run.add_argument("--port", type=int, help="Porta do servidor (padrão: server/server_port.txt)")
+    run.add_argument("--base-url", help="URL base da API (substitui --port)")
+    run.set_defaults(func=run_campaign)
+
+    optout = subparsers.add_parser("optout", help="Marca números como descadastrados")
+    optout.add_argument("numbers", nargs="*", help="Números a descadastrar")
+    optout.add_argument("--file", help="Arquivo CSV/XLSX com os números na primeira coluna")
+    optout.add_argument("--no-header", action="store_true",
+                        help="A primeira linha do arquivo já é um número")
+    optout.add_argument("--undo", action="store_true", help="Remove o descadastro dos números")
+    optout.add_argument("--suppression-db", default=DEFAULT_DB_PATH,
+                        help=f"Base de supressão (padrão: {DEFAULT_DB_PATH})")
+    optout.set_defaults(func=opt_out)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# campaign_journal.py
+import hashlib
+import json
+import os
+import re
+import struct
+import time
+
+# Diretório padrão onde ficam os diários das campanhas
+DEFAULT_JOURNAL_DIR = "campaigns"
+
+JOURNAL_FILE = "journal.log"
+BITMAP_FILE = "done.bitmap"
+META_FILE = "meta.json"
+
+# Cabeçalho do bitmap: assinatura, total, posição do diário coberta, sucessos, falhas
+_HEADER = struct.Struct("<4sQQQQ")
+_MAGIC = b"WPJ1"
+
+_NON_DIGITS = re.compile(r"[^0-9]")
+
+
+def campaign_key(contacts_path, msg_text, files_list, contacts=None):
+    """
+    Gera o identificador de uma campanha a partir do arquivo de contatos, mensagem e anexos.
+
+    Args:
+        contacts (list): Lista final de contatos, quando ela difere do arquivo
+            (ex: após remover números suprimidos); os índices do diário se referem a ela
+    """
+    digest = hashlib.sha1()
+    stat = os.stat(contacts_path)
+    digest.update(f"{os.path.abspath(contacts_path)}|{stat.st_size}|{int(stat.st_mtime)}".encode("utf-8"))
+    digest.update(msg_text.encode("utf-8"))
+    for file_path in files_list:
+        digest.update(os.path.abspath(file_path).encode("utf-8"))
+    if contacts is not None:
+        digest.update("\n".join(map(str, contacts)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class CampaignJournal:
+    """Diário append-only do resultado de cada destinatário de uma campanha.
+
+    Cada resultado é gravado como uma linha "índice, número normalizado, status,
+    erro" e o disco é sincronizado (fsync) em lotes. Um bitmap com um bit por
+    contato é salvo periodicamente junto com a posição do diário que ele cobre;
+    ao retomar, basta carregar o bitmap e reler só o final do diário.
+    """
+
+    def __init__(self, directory, total, fsync_every=100, fsync_interval=1.0, checkpoint_interval=5.0):
+        """
+        Args:
+            directory (str): Diretório da campanha
+            total (int): Quantidade de contatos da campanha
+            fsync_every (int): Quantidade de registros que dispara um fsync
+            fsync_interval (float): Tempo máximo em segundos entre fsyncs
+            checkpoint_interval (float): Tempo em segundos entre gravações do bitmap
+        """
+        self.directory = directory
+        self.total = total
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.checkpoint_interval = checkpoint_interval
+
+        self.successful = 0
+        self.failed = 0
+        self._bitmap = bytearray((total + 7) // 8)
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._last_checkpoint = self._last_sync
+
+        os.makedirs(directory, exist_ok=True)
+        self._journal_path = os.path.join(directory, JOURNAL_FILE)
+        self._bitmap_path = os.path.join(directory, BITMAP_FILE)
+
+        offset = self._load_bitmap()
+        offset = self._replay(offset)
+        self._file = open(self._journal_path, "ab")
+        # Descarta uma linha incompleta deixada por uma queda no meio da escrita
+        self._file.truncate(offset)
+        self._file.seek(offset)
+
+        meta_path = os.path.join(directory, META_FILE)
+        if not os.path.exists(meta_path):
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"total": total, "created": time.time()}, f)
+
+    @classmethod
+    def open(cls, contacts_path, msg_text, files_list, total, contacts=None,
+             base_dir=DEFAULT_JOURNAL_DIR, **kwargs):
+        """Abre (ou cria) o diário da campanha identificada pelos parâmetros de envio."""
+        directory = os.path.join(base_dir, campaign_key(contacts_path, msg_text, files_list, contacts))
+        return cls(directory, total, **kwargs)
+
+    @property
+    def done_count(self):
+        return self.successful + self.failed
+
+    def is_done(self, index):
+        """Indica se o contato (índice a partir de 1) já tem resultado registrado."""
+        pos = index - 1
+        if pos < 0 or pos >= self.total:
+            return False
+        return bool(self._bitmap[pos >> 3] & (1 << (pos & 7)))
+
+    def record(self, index, number, success, error=""):
+        """Registra o resultado de um destinatário."""
+        error = (error or "").replace("\t", " ").replace("\n", " ")
+        number = _NON_DIGITS.sub("", str(number))
+        line = f"{index}\t{number}\t{'ok' if success else 'fail'}\t{error}\n"
+        self._file.write(line.encode("utf-8"))
+        self._mark(index, success)
+
+        self._pending += 1
+        now = time.monotonic()
+        if self._pending >= self.fsync_every or now - self._last_sync >= self.fsync_interval:
+            self.sync()
+        if now - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def iter_results(self):
+        """Gera (índice, número, sucesso) de cada resultado registrado, lendo o diário inteiro."""
+        if not self._file.closed:
+            self.sync()
+        with open(self._journal_path, "rb") as f:
+            for line in f:
+                parts = line.decode("utf-8", "replace").split("\t")
+                if len(parts) >= 3:
+                    yield int(parts[0]), parts[1], parts[2] == "ok"
+
+    def sync(self):
+        """Grava em disco os registros pendentes do diário."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def checkpoint(self):
+        """Salva o bitmap junto com a posição do diário que ele já cobre."""
+        self.sync()
+        header = _HEADER.pack(_MAGIC, self.total, self._file.tell(), self.successful, self.failed)
+        tmp_path = self._bitmap_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(self._bitmap)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._bitmap_path)
+        self._last_checkpoint = time.monotonic()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.checkpoint()
+        self._file.close()
+
+    def reset(self):
+        """Apaga o progresso registrado para recomeçar a campanha do início."""
+        self._file.truncate(0)
+        self._file.seek(0)
+        self._bitmap = bytearray(len(self._bitmap))
+        self.successful = 0
+        self.failed = 0
+        self.checkpoint()
+
+    def _mark(self, index, success):
+        pos = index - 1
+        if pos < 0 or pos >= self.total:
+            return
+        bit = 1 << (pos & 7)
+        if self._bitmap[pos >> 3] & bit:
+            return
+        self._bitmap[pos >> 3] |= bit
+        if success:
+            self.successful += 1
+        else:
+            self.failed += 1
+
+    def _load_bitmap(self):
+        """Carrega o último bitmap salvo. Retorna a posição do diário já coberta."""
+        try:
+            with open(self._bitmap_path, "rb") as f:
+                header = f.read(_HEADER.size)
+                magic, total, offset, successful, failed = _HEADER.unpack(header)
+                bitmap = f.read()
+        except (OSError, struct.error):
+            return 0
+        if magic != _MAGIC or total != self.total or len(bitmap) != len(self._bitmap):
+            return 0
+        self._bitmap = bytearray(bitmap)
+        self.successful = successful
+        self.failed = failed
+        return offset
+
+    def _replay(self, offset):
+        """Aplica ao bitmap as linhas gravadas depois do último checkpoint.
+
+        Returns:
+            int: Posição logo após a última linha completa do diário
+        """
+        if not os.path.exists(self._journal_path):
+            return 0
+        with open(self._journal_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Linha incompleta: será descartada
+                parts = line.decode("utf-8", "replace").split("\t")
+                try:
+                    self._mark(int(parts[0]), parts[2] == "ok")
+                except (IndexError, ValueError):
+                    break
+                offset += len(line)
+        return offset
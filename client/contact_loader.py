@@ -0,0 +1,143 @@
+# contact_loader.py
+import csv
+import os
+
+import pandas as pd
+
+# Quantidade de linhas lidas por vez; limita o pico de memória independente do tamanho do arquivo
+DEFAULT_CHUNK_SIZE = 50000
+
+# Nome da coluna de telefone nos blocos gerados
+NUMBER_COLUMN = "number"
+
+
+def _read_csv_header(file_path):
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+
+def _phone_position(header, phone_column):
+    """Converte o nome da coluna de telefones em posição."""
+    if isinstance(phone_column, int):
+        return phone_column
+    if phone_column not in header:
+        raise ValueError(f"Coluna não encontrada no arquivo: {phone_column}")
+    return header.index(phone_column)
+
+
+def iter_contact_chunks(file_path, phone_column=0, header=True,
+                        chunksize=DEFAULT_CHUNK_SIZE, on_progress=None):
+    """
+    Lê um arquivo de contatos em blocos, carregando apenas a coluna de telefones.
+
+    Args:
+        file_path (str): Arquivo CSV ou XLSX
+        phone_column (int|str): Posição ou nome da coluna com os telefones
+        header (bool): Se a primeira linha do arquivo é um cabeçalho
+        chunksize (int): Quantidade de linhas por bloco
+        on_progress (callable): Recebe a fração (0.0 a 1.0) do arquivo já lida
+
+    Yields:
+        pandas.DataFrame: Bloco com a coluna "number", como texto
+    """
+    if file_path.lower().endswith(".xlsx"):
+        yield from _iter_xlsx_chunks(file_path, phone_column, header, chunksize, on_progress)
+        return
+    if not file_path.lower().endswith(".csv"):
+        raise ValueError("Tipo de arquivo não suportado.")
+
+    header_row = _read_csv_header(file_path) if header else []
+    position = _phone_position(header_row, phone_column)
+
+    total_bytes = os.path.getsize(file_path) or 1
+    with open(file_path, "rb") as f:
+        reader = pd.read_csv(f, header=0 if header else None, usecols=[position], dtype=str,
+                             chunksize=chunksize, encoding="utf-8-sig")
+        for chunk in reader:
+            chunk.columns = [NUMBER_COLUMN]
+            chunk = _clean_chunk(chunk)
+            if on_progress:
+                on_progress(min(f.tell() / total_bytes, 1.0))
+            if len(chunk):
+                yield chunk
+
+    if on_progress:
+        on_progress(1.0)
+
+
+def _iter_xlsx_chunks(file_path, phone_column, header, chunksize, on_progress):
+    """Lê uma planilha XLSX em modo somente leitura, linha a linha."""
+    from openpyxl import load_workbook  # Dependência usada pelo pandas para arquivos Excel
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header_row = [str(v) if v is not None else "" for v in next(rows, ())] if header else []
+        position = _phone_position(header_row, phone_column)
+        total_rows = sheet.max_row or 1
+
+        buffer = []
+        read_rows = 1 if header else 0
+        for row in rows:
+            read_rows += 1
+            buffer.append(row[position] if position < len(row) else None)
+            if len(buffer) >= chunksize:
+                chunk = _clean_chunk(pd.DataFrame({NUMBER_COLUMN: buffer}, dtype=str))
+                buffer = []
+                if on_progress:
+                    on_progress(min(read_rows / total_rows, 1.0))
+                if len(chunk):
+                    yield chunk
+
+        if buffer:
+            chunk = _clean_chunk(pd.DataFrame({NUMBER_COLUMN: buffer}, dtype=str))
+            if len(chunk):
+                yield chunk
+    finally:
+        workbook.close()
+
+    if on_progress:
+        on_progress(1.0)
+
+
+def _clean_chunk(chunk):
+    """Remove linhas sem telefone e espaços nas bordas dos números."""
+    chunk = chunk.dropna(subset=[NUMBER_COLUMN])
+    chunk[NUMBER_COLUMN] = chunk[NUMBER_COLUMN].astype(str).str.strip()
+    return chunk[chunk[NUMBER_COLUMN] != ""]
+
+
+def iter_contacts(file_path, **kwargs):
+    """Gera os números de telefone um a um, lendo o arquivo em blocos."""
+    for chunk in iter_contact_chunks(file_path, **kwargs):
+        yield from chunk[NUMBER_COLUMN].tolist()
+
+
+def load_contacts(file_path, **kwargs):
+    """Carrega todos os números de telefone do arquivo em uma lista."""
+    contacts = []
+    for chunk in iter_contact_chunks(file_path, **kwargs):
+        contacts.extend(chunk[NUMBER_COLUMN].tolist())
+    return contacts
+
+
+def count_rows(file_path, header=True):
+    """Conta rapidamente as linhas de dados do arquivo sem interpretá-las."""
+    if file_path.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+        workbook = load_workbook(file_path, read_only=True)
+        try:
+            rows = workbook.worksheets[0].max_row or 0
+        finally:
+            workbook.close()
+    else:
+        rows = 0
+        last = b"\n"
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                rows += block.count(b"\n")
+                last = block[-1:]
+        if last != b"\n":
+            rows += 1  # Última linha sem quebra de linha no final
+    return max(rows - (1 if header else 0), 0)
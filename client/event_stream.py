@@ -0,0 +1,147 @@
+# event_stream.py
+import json
+import socket
+import threading
+
+import requests
+
+# Espera antes de reconectar: começa curta e dobra até o máximo (segundos)
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+
+# Timeout (conexão, leitura); o servidor envia um keep-alive a cada 25 s
+STREAM_TIMEOUT = (2.0, 60.0)
+
+
+class EventStream:
+    """Assinatura de /api/events (Server-Sent Events) numa thread em segundo plano.
+
+    Entrega cada evento do servidor (status, qr, ready, authenticated,
+    disconnected, change_state) a `on_event` assim que chega, e reconecta
+    sozinha se a conexão cair. Os callbacks são chamados na thread do fluxo.
+    """
+
+    def __init__(self, on_event, on_connection=None):
+        """
+        Args:
+            on_event (callable): Recebe (tipo, dados) a cada evento
+            on_connection (callable): Recebe True ao conectar e False ao perder a conexão
+        """
+        self.on_event = on_event
+        self.on_connection = on_connection
+        self.base_url = None
+        self.connected = False
+        self._session = requests.Session()
+        self._response = None
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="event-stream", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._changed.set()
+        self._close_response()
+
+    def set_base_url(self, base_url):
+        """Conecta (ou reconecta) ao servidor em `base_url`; sem efeito se já estiver nele."""
+        if base_url == self.base_url and self.connected:
+            return
+        self.base_url = base_url
+        self._changed.set()
+        # Interrompe a leitura em andamento para trocar de servidor
+        self._close_response()
+
+    def _close_response(self):
+        with self._lock:
+            response = self._response
+        if response is None:
+            return
+        # Fechar a resposta não interrompe uma leitura bloqueada em outra thread;
+        # encerrar o socket sim
+        sock = getattr(getattr(response.raw, "connection", None), "sock", None)
+        try:
+            if sock is not None:
+                sock.shutdown(socket.SHUT_RDWR)
+            response.close()
+        except Exception:
+            pass
+
+    def _set_connected(self, connected):
+        if connected != self.connected:
+            self.connected = connected
+            if self.on_connection:
+                self.on_connection(connected)
+
+    def _run(self):
+        delay = RECONNECT_DELAY
+        while not self._stop.is_set():
+            base_url = self.base_url
+            if not base_url:
+                self._changed.wait()
+                self._changed.clear()
+                continue
+            self._changed.clear()
+
+            try:
+                with self._session.get(f"{base_url}/events", stream=True, timeout=STREAM_TIMEOUT,
+                                       headers={"Accept": "text/event-stream"}) as response:
+                    if response.status_code == 404:
+                        # Servidor sem suporte a eventos: só tenta de novo ao trocar de servidor
+                        self._changed.wait()
+                        continue
+                    if response.status_code != 200:
+                        raise requests.RequestException(f"Código {response.status_code}")
+                    response.encoding = "utf-8"
+                    with self._lock:
+                        self._response = response
+                    self._set_connected(True)
+                    delay = RECONNECT_DELAY
+                    self._read(response)
+            except Exception:
+                # Conexão recusada, interrompida ou timeout de leitura
+                pass
+            finally:
+                with self._lock:
+                    self._response = None
+            self._set_connected(False)
+
+            if not self._changed.is_set():
+                # Sem troca de servidor pendente: espera antes de reconectar
+                self._changed.wait(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _read(self, response):
+        """Lê o fluxo no formato SSE, entregando cada evento completo."""
+        event, data = "message", []
+        for raw in response.iter_lines(decode_unicode=True):
+            if self._stop.is_set() or self._changed.is_set():
+                return
+            line = raw or ""
+            if not line:
+                # Linha vazia encerra o evento
+                if data:
+                    self._dispatch(event, "\n".join(data))
+                event, data = "message", []
+            elif line.startswith(":"):
+                continue  # Comentário (keep-alive)
+            else:
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "event":
+                    event = value
+                elif field == "data":
+                    data.append(value)
+
+    def _dispatch(self, event, data):
+        try:
+            payload = json.loads(data) if data else {}
+        except ValueError:
+            payload = {"raw": data}
+        try:
+            self.on_event(event, payload)
+        except Exception as e:
+            print(f"Erro ao tratar evento {event}: {e}")
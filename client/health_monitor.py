@@ -0,0 +1,201 @@
+# health_monitor.py
+import concurrent.futures
+import os
+import threading
+import time
+
+import requests
+
+from api_transport import ApiTransport, ALTERNATIVE_PORTS, PORT_FILE, get_server_port
+
+# Intervalo entre verificações com o servidor online (segundos)
+DEFAULT_INTERVAL = 30.0
+
+# Com o servidor fora do ar, a espera começa curta e dobra até o máximo
+DOWN_INTERVAL = 2.0
+MAX_DOWN_INTERVAL = 60.0
+
+# Frequência com que o arquivo server_port.txt é conferido (segundos)
+PORT_FILE_POLL = 1.0
+
+# Timeout (conexão, leitura) de cada sondagem
+PROBE_TIMEOUT = (1.0, 2.0)
+
+
+class HealthStatus:
+    """Resultado de uma verificação do servidor."""
+
+    def __init__(self, port=None, online=False, ready=False, reason=""):
+        self.port = port
+        self.online = online
+        self.ready = ready
+        self.reason = reason  # O que motivou a verificação (ex: "manual", "arquivo de porta")
+        self.checked_at = time.time()
+
+    def same_state(self, other):
+        return other is not None and (self.port, self.online, self.ready) == (other.port, other.online, other.ready)
+
+
+class HealthMonitor:
+    """Verifica a saúde do servidor numa thread em segundo plano.
+
+    A porta que respondeu por último é testada primeiro; se não responder, todas
+    as portas candidatas são sondadas ao mesmo tempo e vale a primeira resposta.
+    Enquanto o servidor estiver fora do ar o intervalo entre verificações cresce
+    exponencialmente, e uma alteração em server_port.txt dispara uma nova
+    verificação imediata. Os resultados são entregues a `on_status`, chamado na
+    thread do monitor.
+    """
+
+    def __init__(self, on_status, port=None, ports=ALTERNATIVE_PORTS, interval=DEFAULT_INTERVAL,
+                 port_file=PORT_FILE, host="localhost"):
+        """
+        Args:
+            on_status (callable): Recebe um HealthStatus a cada verificação
+            port (int): Porta a testar primeiro (padrão: a de server_port.txt)
+            ports (list): Portas candidatas
+            interval (float): Segundos entre verificações com o servidor online
+            port_file (str): Arquivo em que o servidor grava a porta em uso
+            host (str): Endereço do servidor
+        """
+        self.on_status = on_status
+        self.port = port or get_server_port(port_file)
+        self.ports = list(ports)
+        self.interval = interval
+        self.port_file = port_file
+        self.host = host
+        self.last_status = None
+        self.paused = False
+        self._failures = 0
+        self._reason = "inicial"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._port_file_mtime = self._port_file_stamp()
+        # Uma conexão por porta candidata, sem novas tentativas: a sondagem é a tentativa
+        self._transport = ApiTransport(self._url(self.port), pool_size=len(self.ports) + 1, retries=0)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(self.ports) + 1, thread_name_prefix="health-probe")
+        self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+
+    def _url(self, port):
+        return f"http://{self.host}:{port}/api"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._executor.shutdown(wait=False)
+        self._transport.close()
+
+    def check_now(self, reason="manual"):
+        """Solicita uma verificação imediata (não bloqueia)."""
+        self._reason = reason
+        self._wake.set()
+
+    def pause(self):
+        """Suspende as verificações periódicas (ex: enquanto o fluxo de eventos estiver conectado).
+
+        Verificações manuais e alterações no arquivo de porta continuam sendo atendidas.
+        """
+        self.paused = True
+
+    def resume(self, reason="retomada"):
+        """Retoma as verificações periódicas, começando por uma verificação imediata."""
+        self.paused = False
+        self.check_now(reason)
+
+    def set_port(self, port):
+        """Passa a testar `port` primeiro e verifica imediatamente."""
+        self.port = port
+        self.check_now("porta alterada")
+
+    def _port_file_stamp(self):
+        try:
+            return os.stat(self.port_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def _probe(self, port):
+        """Consulta /api/status numa porta. Retorna HealthStatus ou None se não houver resposta."""
+        try:
+            response = self._transport.get("status", base_url=self._url(port), timeout=PROBE_TIMEOUT)
+            if response.status_code != 200:
+                return None
+            return HealthStatus(port, online=True, ready=bool(response.json().get("ready", False)))
+        except (requests.RequestException, ValueError):
+            return None
+
+    def discover(self):
+        """
+        Encontra o servidor: primeiro na porta conhecida, depois em todas as outras em paralelo.
+
+        Returns:
+            HealthStatus: Estado encontrado (online=False se nenhuma porta respondeu)
+        """
+        status = self._probe(self.port)
+        if status is not None:
+            return status
+
+        others = [port for port in self.ports if port != self.port]
+        futures = [self._executor.submit(self._probe, port) for port in others]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                status = future.result()
+                if status is not None:
+                    return status
+        finally:
+            for future in futures:
+                future.cancel()
+        return HealthStatus(self.port, online=False)
+
+    def _next_wait(self):
+        if self.last_status is not None and self.last_status.online:
+            return self.interval
+        return min(DOWN_INTERVAL * 2 ** max(self._failures - 1, 0), MAX_DOWN_INTERVAL)
+
+    def _wait(self, seconds):
+        """Espera até o próximo ciclo, acordando antes se pedido ou se o arquivo de porta mudar."""
+        deadline = time.monotonic() + seconds
+        while not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._reason = "periódica"
+                return
+            if self._wake.wait(min(remaining, PORT_FILE_POLL)):
+                self._wake.clear()
+                return
+            stamp = self._port_file_stamp()
+            if stamp != self._port_file_mtime:
+                self._port_file_mtime = stamp
+                self.port = get_server_port(self.port_file)
+                self._failures = 0
+                self._reason = "arquivo de porta"
+                return
+
+    def _run(self):
+        while not self._stop.is_set():
+            reason = self._reason
+            if self.paused and reason == "periódica":
+                self._wait(self.interval)
+                continue
+            try:
+                status = self.discover()
+            except Exception as e:
+                # O executor é encerrado em stop(); qualquer outro erro não pode matar o monitor
+                if self._stop.is_set():
+                    return
+                print(f"Erro no monitor de conexão: {e}")
+                status = HealthStatus(self.port, online=False)
+            status.reason = reason
+
+            if status.online:
+                self.port = status.port
+                self._failures = 0
+            else:
+                self._failures += 1
+            self.last_status = status
+            if not self._stop.is_set():
+                self.on_status(status)
+            self._wait(self._next_wait())
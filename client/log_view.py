@@ -0,0 +1,72 @@
+# log_view.py
+import tkinter as tk
+
+# Quantidade máxima de linhas mantidas no mini log da interface
+DEFAULT_CAPACITY = 500
+
+# Cores de cada nível de log (uma tag por nível, configurada uma única vez)
+LEVEL_COLORS = {
+    "INFO": "#000000",    # Preto
+    "SUCCESS": "#28a745", # Verde
+    "WARNING": "#ffc107", # Amarelo
+    "ERROR": "#dc3545"    # Vermelho
+}
+
+
+class RingLogView:
+    """Mini log com capacidade fixa sobre um widget Text/ScrolledText.
+
+    As linhas mais antigas são descartadas ao atingir a capacidade, de modo que
+    o custo de cada inserção não cresce com a duração da campanha. O histórico
+    completo fica no arquivo de log.
+    """
+
+    def __init__(self, text_widget, capacity=DEFAULT_CAPACITY):
+        """
+        Args:
+            text_widget (tk.Text): Widget onde as linhas são exibidas
+            capacity (int): Quantidade máxima de linhas visíveis
+        """
+        self.widget = text_widget
+        self.capacity = capacity
+        self._widget_lines = 0
+
+        for level, color in LEVEL_COLORS.items():
+            self.widget.tag_config(level, foreground=color)
+
+    def append(self, line, level="INFO"):
+        """Adiciona uma mensagem ao final, removendo as linhas mais antigas se necessário."""
+        self.extend([(line, level)])
+
+    def extend(self, entries):
+        """
+        Adiciona várias mensagens com uma única inserção no widget.
+
+        Args:
+            entries (list): Pares (linha, nível), em ordem
+        """
+        # Só as últimas mensagens que cabem na capacidade chegam a ser inseridas
+        entries = entries[-self.capacity:]
+        chunks = []
+        for line, level in entries:
+            chunks.append(line + "\n")
+            chunks.append(level if level in LEVEL_COLORS else "INFO")
+            # Mensagens com quebras de linha ocupam mais de uma linha do widget
+            self._widget_lines += line.count("\n") + 1
+        if not chunks:
+            return
+
+        # Habilita a edição do widget de log
+        self.widget.configure(state="normal")
+        self.widget.insert(tk.END, *chunks)
+
+        # Remove do início as linhas que excedem a capacidade
+        excess = self._widget_lines - self.capacity
+        if excess > 0:
+            self.widget.delete("1.0", f"{excess + 1}.0")
+            self._widget_lines -= excess
+
+        # Rola para o final para mostrar a mensagem mais recente
+        self.widget.see(tk.END)
+        # Desabilita a edição para evitar alterações pelo usuário
+        self.widget.configure(state="disabled")
@@ -0,0 +1,122 @@
+# log_writer.py
+import atexit
+import datetime
+import os
+import queue
+import threading
+
+import profiling
+
+# Tamanho máximo do arquivo de log antes da rotação (log.txt -> log.txt.1 -> ...)
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+
+# Quantidade de arquivos antigos mantidos após a rotação
+DEFAULT_BACKUP_COUNT = 3
+
+_STOP = object()
+
+
+class BufferedLogWriter:
+    """Destino único para o arquivo de log, com escrita em segundo plano.
+
+    Os registros são enfileirados por quem chama `write` e gravados em lotes por
+    uma thread dedicada, por quantidade ou por tempo. Assim a escrita em disco
+    não entra na latência de cada mensagem enviada.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+                 flush_interval=1.0, batch_size=200):
+        """
+        Args:
+            path (str): Caminho do arquivo de log
+            max_bytes (int): Tamanho que dispara a rotação do arquivo (0 desativa)
+            backup_count (int): Quantidade de arquivos rotacionados mantidos
+            flush_interval (float): Tempo máximo em segundos que um registro espera no buffer
+            batch_size (int): Quantidade de registros que dispara uma gravação imediata
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._queue = queue.Queue()
+        self._file = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+        # Garante que nada fique no buffer se o programa terminar sem chamar close()
+        atexit.register(self.close)
+
+    def write(self, level, message):
+        """Enfileira um registro; retorna imediatamente."""
+        self._queue.put((datetime.datetime.now(), level, message))
+
+    def flush(self, timeout=5.0):
+        """Aguarda até que todos os registros enfileirados estejam gravados em disco."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        """Grava o que estiver pendente e encerra a thread de escrita."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5.0)
+
+    def _run(self):
+        buffer = []
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._write_batch(buffer)
+                continue
+
+            if item is _STOP:
+                self._write_batch(buffer)
+                if self._file:
+                    self._file.close()
+                return
+            if isinstance(item, threading.Event):
+                self._write_batch(buffer)
+                item.set()
+                continue
+
+            buffer.append(item)
+            if len(buffer) >= self.batch_size:
+                self._write_batch(buffer)
+
+    @profiling.profiled("arquivo de log")
+    def _write_batch(self, buffer):
+        if not buffer:
+            return
+        lines = "".join(f"{timestamp} - {level}: {message}\n" for timestamp, level, message in buffer)
+        buffer.clear()
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(lines)
+            self._file.flush()
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except Exception as e:
+            print(f"Erro ao gravar arquivo de log: {e}")
+
+    def _rotate(self):
+        """Renomeia log.txt para log.txt.1 (e assim por diante) e recomeça o arquivo."""
+        self._file.close()
+        self._file = None
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
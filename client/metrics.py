@@ -0,0 +1,297 @@
+# metrics.py
+#
+# Métricas no formato de texto do Prometheus/OpenMetrics. Desativadas por padrão;
+# habilite com variáveis de ambiente:
+#   WPP_METRICS_PORT=9464               expõe http://localhost:9464/metrics
+#   WPP_METRICS_TEXTFILE=/caminho.prom  grava o arquivo periodicamente (textfile collector)
+#   WPP_METRICS_INTERVAL=15             intervalo de gravação do arquivo em segundos
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites dos baldes de latência em segundos
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+DEFAULT_TEXTFILE_INTERVAL = 15.0
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base das métricas: uma série por combinação de valores de rótulos."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def labels(self, *values):
+        """Retorna a série correspondente aos valores de rótulos informados."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} espera os rótulos {self.labelnames}")
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = self._new_series()
+            return series
+
+    def _default(self):
+        # Métricas sem rótulos são usadas diretamente (metric.inc())
+        return self.labels()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._series.items())
+        for values, series in items:
+            lines.extend(series.samples(self.name, self.labelnames, values))
+        return lines
+
+
+class _Value:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_series(self):
+        return _Value()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def dec(self, amount=1):
+        self._default().inc(-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def _new_series(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+            self.sum += value
+            self.count += 1
+
+    def samples(self, name, labelnames, values):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _format_labels(labelnames, values, [("le", _format_value(bound))])
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _format_labels(labelnames, values)
+        lines.append(f"{name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Conjunto de métricas exportadas juntas."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Gera o texto no formato de exposição do Prometheus."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Métricas do cliente (nomes com prefixo wpp_client_)
+MESSAGES = REGISTRY.register(Counter(
+    "wpp_client_messages_total", "Mensagens de texto enviadas, por resultado", ["result"]))
+FILES = REGISTRY.register(Counter(
+    "wpp_client_files_total", "Arquivos enviados, por resultado", ["result"]))
+RECIPIENTS = REGISTRY.register(Counter(
+    "wpp_client_recipients_total", "Destinatários concluídos, por resultado", ["result"]))
+RETRIES = REGISTRY.register(Counter(
+    "wpp_client_retries_total", "Novas tentativas de envio, por categoria de falha", ["category"]))
+UPLOAD_BYTES = REGISTRY.register(Counter(
+    "wpp_client_upload_bytes_total", "Bytes de anexos aceitos pelo servidor"))
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "wpp_client_request_duration_seconds", "Duração das requisições à API, por endpoint", ["endpoint"]))
+PACING_RATE = REGISTRY.register(Gauge(
+    "wpp_client_pacing_rate_per_minute", "Ritmo de envio atual (destinatários por minuto)"))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "wpp_client_queue_depth", "Destinatários da campanha ainda não concluídos"))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "wpp_client_in_flight", "Destinatários com envio em andamento"))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Não polui a saída com uma linha por coleta
+
+
+def serve_http(port, host="127.0.0.1", registry=REGISTRY):
+    """Expõe as métricas em http://host:port/metrics numa thread em segundo plano."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def write_textfile(path, registry=REGISTRY):
+    """Grava as métricas de forma atômica (para o textfile collector do node_exporter)."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+class TextfileWriter:
+    """Grava o arquivo de métricas periodicamente numa thread em segundo plano."""
+
+    def __init__(self, path, interval=DEFAULT_TEXTFILE_INTERVAL, registry=REGISTRY):
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-textfile", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._write()
+
+    def _write(self):
+        try:
+            write_textfile(self.path, self.registry)
+        except OSError as e:
+            print(f"Erro ao gravar arquivo de métricas: {e}")
+
+    def close(self):
+        """Interrompe a gravação periódica, gravando os valores finais."""
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+        self._write()
+
+
+def start_from_env(environ=os.environ):
+    """
+    Ativa as saídas de métricas configuradas por variáveis de ambiente.
+
+    Returns:
+        list: Saídas iniciadas (servidor HTTP e/ou TextfileWriter); vazia se desativado
+    """
+    exporters = []
+    port = environ.get("WPP_METRICS_PORT")
+    if port:
+        try:
+            exporters.append(serve_http(int(port)))
+        except (OSError, ValueError) as e:
+            print(f"Não foi possível iniciar o endpoint de métricas na porta {port}: {e}")
+    path = environ.get("WPP_METRICS_TEXTFILE")
+    if path:
+        value = environ.get("WPP_METRICS_INTERVAL")
+        interval = DEFAULT_TEXTFILE_INTERVAL
+        if value:
+            try:
+                interval = float(value)
+                if not interval > 0:
+                    raise ValueError("o intervalo deve ser maior que zero")
+            except ValueError as e:
+                interval = DEFAULT_TEXTFILE_INTERVAL
+                print(f"WPP_METRICS_INTERVAL inválido ({value}): {e}. Usando {interval:g} segundos")
+        exporters.append(TextfileWriter(path, interval))
+    return exporters
+
+
+def stop_exporters(exporters):
+    """Encerra as saídas iniciadas por start_from_env."""
+    for exporter in exporters:
+        if isinstance(exporter, TextfileWriter):
+            exporter.close()
+        else:
+            exporter.shutdown()
@@ -0,0 +1,166 @@
+# pacing.py
+import asyncio
+import random
+import time
+
+
+class TokenBucket:
+    """Limitador de taxa (token bucket) para a política de mensagens por minuto.
+
+    Cada destinatário consome um token. O ritmo de envio passa a ser definido
+    pela política configurada e não pelo tempo de resposta do servidor.
+    """
+
+    def __init__(self, rate_per_minute, capacity=1, jitter=(0, 0)):
+        """
+        Args:
+            rate_per_minute (float): Quantidade de tokens liberados por minuto
+            capacity (int): Quantidade máxima de tokens acumulados (rajada permitida)
+            jitter (tuple): Atraso aleatório extra (mín, máx) em segundos após cada token
+        """
+        self.capacity = capacity
+        self.jitter = jitter
+        self._rate = rate_per_minute / 60.0
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = None
+
+    @property
+    def rate_per_minute(self):
+        return self._rate * 60.0
+
+    def set_rate(self, rate_per_minute):
+        """Altera a taxa de liberação de tokens sem perder os tokens acumulados."""
+        self._refill()
+        self._rate = rate_per_minute / 60.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def acquire(self, should_continue=None):
+        """Aguarda até que um token esteja disponível e o consome.
+
+        Args:
+            should_continue (callable): Função consultada durante a espera; se
+                retornar False a espera é abandonada
+
+        Returns:
+            bool: True se o token foi obtido, False se a espera foi abandonada
+        """
+        # O lock é criado aqui para pertencer ao event loop em execução
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            while True:
+                if should_continue is not None and not should_continue():
+                    return False
+
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    low, high = self.jitter
+                    if high > 0:
+                        # Tokens negativos atrasam o próximo envio pelo tempo sorteado
+                        self._tokens -= random.uniform(low, high) * self._rate
+                    return True
+
+                wait = (1 - self._tokens) / self._rate if self._rate > 0 else 0.5
+                # Espera em fatias curtas para reagir rapidamente a uma interrupção
+                await asyncio.sleep(min(wait, 0.5))
+
+
+class AimdController:
+    """Controle adaptativo do ritmo (aumento aditivo, redução multiplicativa).
+
+    Observa a latência e o resultado de cada chamada de envio. Enquanto o
+    servidor responde bem, a taxa do token bucket sobe um passo fixo a cada
+    `window` sucessos; em caso de erro ou latência em alta ela é multiplicada
+    por `decrease_factor`. A taxa nunca passa do teto definido pelo usuário.
+    """
+
+    def __init__(self, pacer, ceiling_per_minute, floor_per_minute=1.0, initial_per_minute=None,
+                 increase_per_minute=2.0, decrease_factor=0.5, latency_factor=2.0,
+                 window=10, on_change=None):
+        """
+        Args:
+            pacer (TokenBucket): Limitador cuja taxa é ajustada
+            ceiling_per_minute (float): Taxa máxima permitida (definida pelo usuário)
+            floor_per_minute (float): Taxa mínima
+            initial_per_minute (float): Taxa inicial (padrão: metade do teto)
+            increase_per_minute (float): Aumento aplicado a cada janela saudável
+            decrease_factor (float): Fator aplicado à taxa em caso de erro ou lentidão
+            latency_factor (float): Latência considerada alta, em múltiplos da latência de referência
+            window (int): Quantidade de observações por janela (aumento e carência após redução)
+            on_change (callable): Recebe (taxa_por_minuto, motivo) a cada ajuste
+        """
+        self.pacer = pacer
+        self.ceiling = ceiling_per_minute
+        self.floor = min(floor_per_minute, ceiling_per_minute)
+        self.increase = increase_per_minute
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.window = max(1, int(window))
+        self.on_change = on_change
+
+        self.latency = None       # Média móvel exponencial da latência
+        self.baseline = None      # Menor média observada (servidor saudável)
+        self.reason = "Início"
+        self._healthy = 0
+        self._cooldown = 0
+
+        initial = initial_per_minute if initial_per_minute is not None else ceiling_per_minute / 2
+        self._set(max(self.floor, min(initial, self.ceiling)), "Taxa inicial")
+
+    @property
+    def rate_per_minute(self):
+        return self.pacer.rate_per_minute
+
+    def observe(self, success, latency=None):
+        """
+        Registra o resultado de uma chamada de envio.
+
+        Args:
+            success (bool): Se a chamada teve sucesso (erros do próprio destinatário
+                não devem ser informados como falha)
+            latency (float): Tempo de resposta em segundos, se medido
+        """
+        if latency is not None:
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            # A referência acompanha a melhor média, mas esquece devagar valores antigos
+            if self.baseline is None or self.latency < self.baseline:
+                self.baseline = self.latency
+            else:
+                self.baseline *= 1.01
+
+        if self._cooldown:
+            # Resultados de envios iniciados antes da última redução não a repetem
+            self._cooldown -= 1
+            return
+
+        if not success:
+            self._decrease("Falha no envio")
+        elif self.latency is not None and self.latency > self.latency_factor * self.baseline:
+            self._decrease(f"Latência em alta ({self.latency:.1f}s, referência {self.baseline:.1f}s)")
+        else:
+            self._healthy += 1
+            if self._healthy >= self.window:
+                self._healthy = 0
+                if self.rate_per_minute < self.ceiling:
+                    self._set(min(self.rate_per_minute + self.increase, self.ceiling),
+                              f"Aumentando: {self.window} envios sem erro")
+                elif not self.reason.startswith("No limite"):
+                    self._set(self.ceiling, "No limite configurado")
+
+    def _decrease(self, reason):
+        self._healthy = 0
+        self._cooldown = self.window
+        self._set(max(self.rate_per_minute * self.decrease_factor, self.floor), f"Reduzindo: {reason}")
+
+    def _set(self, rate, reason):
+        self.pacer.set_rate(rate)
+        self.reason = reason
+        if self.on_change:
+            self.on_change(rate, reason)
@@ -0,0 +1,201 @@
+# phone_numbers.py
+#
+# Normalização local de números de telefone. Reproduz exatamente os resultados de
+# formatPhoneNumber e do payload countryInfo de server/server.js, sem precisar
+# enviar a lista de contatos para /api/analyze-batch.
+import re
+
+import numpy as np
+import pandas as pd
+
+# Lista de códigos de país comuns e seus tamanhos de número (mesma tabela do server.js)
+COUNTRY_CODES = {
+    '1': {'name': 'EUA/Canadá', 'lengths': [10]},
+    '44': {'name': 'Reino Unido', 'lengths': [10]},
+    '351': {'name': 'Portugal', 'lengths': [9]},
+    '55': {'name': 'Brasil', 'lengths': [10, 11]},
+    '61': {'name': 'Austrália', 'lengths': [9, 10]},
+    '81': {'name': 'Japão', 'lengths': [10, 11]},
+}
+
+UNKNOWN_COUNTRY = 'Desconhecido'
+
+# Só os dígitos ASCII, como o /\D/ do JavaScript (o \D do Python também aceita dígitos Unicode)
+_NON_DIGITS = re.compile(r'[^0-9]')
+
+
+def _build_prefix_table(country_codes):
+    """
+    Pré-calcula o código de país para todo prefixo de até N dígitos.
+
+    O `for...in` do JavaScript percorre chaves numéricas em ordem crescente e
+    fica com o primeiro código que for prefixo do número; a tabela guarda esse
+    mesmo resultado, então a busca vira uma única consulta de dicionário.
+    """
+    js_order = sorted(country_codes, key=int)
+    max_len = max(len(code) for code in country_codes)
+    table = {}
+    for length in range(1, max_len + 1):
+        for value in range(10 ** length):
+            prefix = str(value).zfill(length)
+            for code in js_order:
+                if prefix.startswith(code):
+                    table[prefix] = code
+                    break
+    return table, max_len
+
+
+_PREFIX_TABLE, _PREFIX_LEN = _build_prefix_table(COUNTRY_CODES)
+
+# Mesma tabela em forma de array: posição _PREFIX_OFFSETS[n] + valor dos n primeiros dígitos
+_PREFIX_OFFSETS = np.cumsum([0] + [10 ** n for n in range(_PREFIX_LEN + 1)])
+_PREFIX_HAS_CODE = np.array([
+    str(value).zfill(n) in _PREFIX_TABLE if n else False
+    for n in range(_PREFIX_LEN + 1) for value in range(10 ** n)
+])
+
+# Maior quantidade de dígitos que cabe em int64
+_MAX_KEY_DIGITS = 18
+_POW10 = 10 ** np.arange(_MAX_KEY_DIGITS + 1, dtype=np.int64)
+
+
+def find_country_code(cleaned):
+    """Retorna o código de país reconhecido no início do número (só dígitos) ou None."""
+    return _PREFIX_TABLE.get(cleaned[:_PREFIX_LEN])
+
+
+def _format_cleaned(cleaned, code):
+    # Se não tiver código de país, tenta identificar pelo tamanho ou assume Brasil
+    if code is not None:
+        return cleaned
+    if len(cleaned) <= 9:
+        return '5511' + cleaned  # Sem DDD: adiciona 55 + DDD padrão (11)
+    if len(cleaned) <= 11:
+        return '55' + cleaned  # Número brasileiro típico com DDD
+    return cleaned  # Número longo não reconhecido: mantém original
+
+
+def format_phone_number(number):
+    """Formata um número para o padrão internacional (equivalente ao formatPhoneNumber do servidor)."""
+    cleaned = _NON_DIGITS.sub('', str(number))
+    return _format_cleaned(cleaned, find_country_code(cleaned))
+
+
+def analyze_number(number):
+    """Retorna a análise de um número no mesmo formato de /api/analyze-number."""
+    cleaned = _NON_DIGITS.sub('', str(number))
+    code = find_country_code(cleaned)
+    return {
+        'original': number,
+        'cleaned': cleaned,
+        'countryInfo': {
+            'code': code,
+            'country': COUNTRY_CODES[code]['name'] if code else UNKNOWN_COUNTRY,
+            'isFormatted': code is not None,
+        },
+        'formattedNumber': _format_cleaned(cleaned, code),
+    }
+
+
+def analyze_batch(numbers):
+    """
+    Analisa uma lista de números de forma vetorizada.
+
+    Args:
+        numbers (list|pandas.Series|numpy.ndarray): Números de telefone como texto
+
+    Returns:
+        tuple: (DataFrame com as colunas original, cleaned, code, country,
+        isFormatted e formattedNumber; dicionário de estatísticas no mesmo
+        formato de /api/analyze-batch)
+    """
+    original = pd.Series(numbers, dtype=object).astype(str).reset_index(drop=True)
+    cleaned = original.str.replace(_NON_DIGITS, '', regex=True)
+
+    code = cleaned.str[:_PREFIX_LEN].map(_PREFIX_TABLE)
+    has_code = code.notna()
+    lengths = cleaned.str.len()
+
+    formatted = cleaned.copy()
+    short = ~has_code & (lengths <= 9)
+    medium = ~has_code & (lengths >= 10) & (lengths <= 11)
+    formatted[short] = '5511' + cleaned[short]
+    formatted[medium] = '55' + cleaned[medium]
+
+    names = {c: info['name'] for c, info in COUNTRY_CODES.items()}
+    country = code.map(names).fillna(UNKNOWN_COUNTRY)
+
+    results = pd.DataFrame({
+        'original': original,
+        'cleaned': cleaned,
+        'code': code.astype(object).where(has_code, None),  # None (null no JSON), não NaN
+        'country': country,
+        'isFormatted': has_code,
+        'formattedNumber': formatted,
+    })
+
+    stats = {
+        'total': len(results),
+        'formatted': int(has_code.sum()),
+        'byCountry': {k: int(v) for k, v in country.value_counts(sort=False).items()},
+    }
+    return results, stats
+
+
+def phone_keys(numbers, chunk_size=200000):
+    """
+    Converte números em inteiros no formato internacional, de forma vetorizada.
+
+    Equivale a `int(format_phone_number(n))`, mas opera sobre os códigos dos
+    caracteres em blocos de arrays numpy, sem laço Python por número.
+
+    Args:
+        numbers (list|pandas.Series|numpy.ndarray): Números de telefone
+        chunk_size (int): Quantidade de números processados por vez (limita a memória)
+
+    Returns:
+        numpy.ndarray: Chaves int64 na mesma ordem; -1 para números sem dígitos
+        ou com mais de 18 dígitos
+    """
+    numbers = np.asarray(numbers, dtype=object)
+    keys = np.empty(len(numbers), dtype=np.int64)
+    for start in range(0, len(numbers), chunk_size):
+        chunk = numbers[start:start + chunk_size].astype(str)
+        keys[start:start + len(chunk)] = _phone_keys_chunk(chunk)
+    return keys
+
+
+def _phone_keys_chunk(chunk):
+    # Cada texto vira uma linha com os códigos dos seus caracteres
+    codes = chunk.view(np.uint32).reshape(len(chunk), -1).astype(np.int32) - ord('0')
+    value = np.zeros(len(chunk), dtype=np.int64)
+    prefix = np.zeros(len(chunk), dtype=np.int64)
+    length = np.zeros(len(chunk), dtype=np.int64)
+
+    # Percorre as colunas (caracteres) acumulando os dígitos, como int() faria
+    for column in codes.T:
+        is_digit = (column >= 0) & (column <= 9)
+        length += is_digit
+        # Acima de 18 dígitos o valor estouraria; esses números são descartados no fim
+        take = is_digit & (length <= _MAX_KEY_DIGITS)
+        value[take] = value[take] * 10 + column[take]
+        take &= length <= _PREFIX_LEN
+        prefix[take] = prefix[take] * 10 + column[take]
+
+    # Código de país pelos primeiros dígitos (mesma regra de find_country_code)
+    prefix_len = np.minimum(length, _PREFIX_LEN)
+    has_code = _PREFIX_HAS_CODE[_PREFIX_OFFSETS[prefix_len] + prefix]
+
+    # Mesmas regras de _format_cleaned
+    short = ~has_code & (length <= 9)
+    medium = ~has_code & (length >= 10) & (length <= 11)
+    value[short] += 5511 * _POW10[length[short]]
+    value[medium] += 55 * _POW10[length[medium]]
+    value[(length == 0) | (length > _MAX_KEY_DIGITS)] = -1
+    return value
+
+
+def format_phone_numbers(numbers):
+    """Formata uma lista de números de forma vetorizada, retornando uma lista."""
+    results, _ = analyze_batch(numbers)
+    return results['formattedNumber'].tolist()
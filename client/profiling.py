@@ -0,0 +1,222 @@
+# profiling.py
+#
+# Modo de perfil para descobrir onde o tempo é gasto (interface, log, pandas,
+# espera pelo servidor). Desativado por padrão; habilite com a variável de
+# ambiente WPP_PROFILE (ou pela opção na interface):
+#   WPP_PROFILE=1                     apenas a duração de cada fase (spans)
+#   WPP_PROFILE=cprofile              também executa o cProfile nas fases marcadas
+#   WPP_PROFILE=tracemalloc           também registra as alocações de memória
+#   WPP_PROFILE=cprofile,tracemalloc  combinações separadas por vírgula
+# Os relatórios são gravados em WPP_PROFILE_DIR (padrão: profiles/).
+import contextlib
+import cProfile
+import datetime
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+DEFAULT_PROFILE_DIR = "profiles"
+
+# Quantidade de linhas dos relatórios do cProfile e do tracemalloc
+TOP_ENTRIES = 25
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _PhaseStats:
+    """Duração acumulada de uma fase."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+class Profiler:
+    """Agrega a duração das fases e, opcionalmente, cProfile e tracemalloc.
+
+    Com o modo desligado, `span` devolve um contexto vazio compartilhado e as
+    funções decoradas com `profiled` fazem apenas uma verificação de atributo.
+    """
+
+    def __init__(self, mode=""):
+        """
+        Args:
+            mode (str): Valor de WPP_PROFILE (vazio ou "0" desativa)
+        """
+        self.enabled = False
+        self.use_cprofile = False
+        self.use_tracemalloc = False
+        self._lock = threading.Lock()
+        self._phases = {}
+        self._profile = None
+        self._profile_lock = threading.Lock()
+        self._baseline = None
+        self.started = time.monotonic()
+        if mode and mode != "0":
+            self.enable(mode)
+
+    def enable(self, mode="1"):
+        """Liga o modo de perfil (mode: "1", "cprofile", "tracemalloc" ou combinações)."""
+        options = {option.strip().lower() for option in mode.split(",")}
+        self.use_cprofile = "cprofile" in options
+        self.use_tracemalloc = "tracemalloc" in options
+        if self.use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._baseline = tracemalloc.take_snapshot()
+        self.enabled = True
+
+    def disable(self):
+        """Desliga o modo de perfil, mantendo os dados coletados até o próximo `reset`."""
+        self.enabled = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def reset(self):
+        """Descarta os dados coletados (ex: no início de uma campanha)."""
+        with self._lock:
+            self._phases = {}
+        self._profile = None
+        self.started = time.monotonic()
+        if tracemalloc.is_tracing():
+            self._baseline = tracemalloc.take_snapshot()
+
+    def record(self, name, seconds):
+        """Soma uma duração medida externamente à fase `name`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            phase = self._phases.get(name)
+            if phase is None:
+                phase = self._phases[name] = _PhaseStats()
+            phase.add(seconds)
+
+    def span(self, name):
+        """Contexto que mede a duração do bloco como uma ocorrência da fase `name`."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name)
+
+    @contextlib.contextmanager
+    def _span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    @contextlib.contextmanager
+    def cprofile(self):
+        """Executa o cProfile durante o bloco, na thread atual (sem efeito se desligado).
+
+        Só uma thread é perfilada por vez; as demais apenas executam o bloco.
+        """
+        if not (self.enabled and self.use_cprofile) or not self._profile_lock.acquire(blocking=False):
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+            if self._profile is None:
+                self._profile = pstats.Stats(profile)
+            else:
+                self._profile.add(profile)
+        finally:
+            self._profile_lock.release()
+
+    def report(self):
+        """Retorna a tabela de fases ordenada pelo tempo total."""
+        with self._lock:
+            phases = sorted(self._phases.items(), key=lambda item: item[1].total, reverse=True)
+        elapsed = time.monotonic() - self.started
+        lines = [f"Perfil de {elapsed:.1f}s de execução",
+                 f"{'fase':<32} {'qtd':>8} {'total (s)':>10} {'médio (ms)':>11} {'máx (ms)':>10} {'%':>6}"]
+        for name, phase in phases:
+            share = 100.0 * phase.total / elapsed if elapsed else 0.0
+            lines.append(f"{name:<32} {phase.count:>8} {phase.total:>10.3f} "
+                         f"{1000.0 * phase.total / phase.count:>11.2f} {1000.0 * phase.max:>10.2f} {share:>6.1f}")
+        return "\n".join(lines)
+
+    def dump(self, directory=None):
+        """
+        Grava o relatório de fases e, se ativos, os do cProfile e do tracemalloc.
+
+        Args:
+            directory (str): Pasta de saída (padrão: WPP_PROFILE_DIR ou profiles/)
+
+        Returns:
+            str: Caminho do relatório de fases, ou None se o modo estiver desligado
+        """
+        if not self.enabled:
+            return None
+        directory = directory or os.environ.get("WPP_PROFILE_DIR", DEFAULT_PROFILE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        prefix = os.path.join(directory, datetime.datetime.now().strftime("perfil-%Y%m%d-%H%M%S"))
+
+        path = f"{prefix}.txt"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.report() + "\n")
+
+        if self._profile is not None:
+            # O arquivo .prof pode ser aberto com snakeviz ou `python -m pstats`
+            self._profile.dump_stats(f"{prefix}.prof")
+            output = io.StringIO()
+            stats = pstats.Stats(f"{prefix}.prof", stream=output)
+            stats.sort_stats("cumulative").print_stats(TOP_ENTRIES)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n" + output.getvalue())
+
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            lines = [f"\nMemória rastreada: atual {current / 1048576:.1f} MB, pico {peak / 1048576:.1f} MB",
+                     "Maiores aumentos desde o início:"]
+            if self._baseline is not None:
+                top = snapshot.compare_to(self._baseline, "lineno")
+            else:
+                top = snapshot.statistics("lineno")
+            lines.extend(str(stat) for stat in top[:TOP_ENTRIES])
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        return path
+
+
+PROFILER = Profiler(os.environ.get("WPP_PROFILE", ""))
+
+span = PROFILER.span
+record = PROFILER.record
+
+
+def profiled(name=None):
+    """Decorador que mede cada chamada da função como uma fase.
+
+    Args:
+        name (str): Nome da fase (padrão: nome qualificado da função)
+    """
+    def decorator(func):
+        phase = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with PROFILER._span(phase):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,64 +1,156 @@
 # qrcode_handler.py
-import io
-import qrcode
-from PIL import Image, ImageTk
-import tkinter as tk
+import collections
+import concurrent.futures
+import threading
 
-def generate_qr_image(data, box_size=10, border=4):
+import profiling
+
+# qrcode e Pillow são importados dentro das funções: só quando um QR code é
+# exibido, e a maior parte na thread de geração, não na da interface
+
+# Quantidade de imagens de QR code mantidas em cache
+CACHE_SIZE = 8
+
+# Intervalo (ms) entre as verificações do resultado da geração em segundo plano
+POLL_INTERVAL_MS = 20
+
+_cache = collections.OrderedDict()  # (texto, tamanho) -> PIL.Image
+_cache_lock = threading.Lock()
+
+# A geração da matriz roda fora da thread da interface
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="qrcode")
+
+
+def render_qr_image(data, size=(250, 250), border=4):
     """
-    Gera uma imagem de QR code a partir de uma string de dados.
-    
+    Gera a imagem do QR code já no tamanho final, sem reamostragem.
+
+    Cada módulo ocupa um número inteiro de pixels (o maior que cabe em `size`)
+    e a sobra é preenchida com branco ao redor, então a imagem sai nítida sem
+    o custo de um redimensionamento LANCZOS.
+
     Args:
         data (str): Texto/dados para codificar no QR code
-        box_size (int): Tamanho de cada "caixa" do QR code
-        border (int): Borda ao redor do QR code
-        
+        size (tuple): Tamanho final da imagem (width, height)
+        border (int): Borda ao redor do QR code, em módulos
+
     Returns:
-        PIL.Image: Imagem do QR code gerada
+        PIL.Image: Imagem em tons de cinza com exatamente `size` pixels
     """
-    # Cria o QR code
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=box_size,
-        border=border,
-    )
+    import qrcode
+    from PIL import Image
+
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L, border=border)
     qr.add_data(data)
     qr.make(fit=True)
-    
-    # Cria uma imagem a partir do QR code
-    img = qr.make_image(fill_color="black", back_color="white")
+    matrix = qr.get_matrix()  # Inclui a borda
+    modules = len(matrix)
+
+    # Um byte por módulo: 0 (preto) ou 255 (branco)
+    pixels = bytes(0 if cell else 255 for row in matrix for cell in row)
+    img = Image.frombytes("L", (modules, modules), pixels)
+
+    module_size = max(1, min(size) // modules)
+    side = modules * module_size
+    img = img.resize((side, side), Image.NEAREST)  # Ampliação inteira: cópia de pixels
+    if (side, side) == tuple(size):
+        return img
+    canvas = Image.new("L", size, 255)
+    canvas.paste(img, ((size[0] - side) // 2, (size[1] - side) // 2))
+    return canvas
+
+
+def get_qr_image(data, size=(250, 250)):
+    """Retorna a imagem do QR code, usando o cache LRU por (texto, tamanho)."""
+    key = (data, tuple(size))
+    with _cache_lock:
+        img = _cache.get(key)
+        if img is not None:
+            _cache.move_to_end(key)
+            return img
+
+    with profiling.span("qrcode: geração"):
+        img = render_qr_image(data, size)
+
+    with _cache_lock:
+        _cache[key] = img
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
     return img
 
+
+def _show(image_label, key, img):
+    from PIL import ImageTk
+
+    # A PhotoImage precisa ser criada na thread da interface
+    tk_img = ImageTk.PhotoImage(img)
+    image_label.config(image=tk_img)
+    image_label.image = tk_img  # Mantém referência para evitar coleta de lixo
+    image_label.qr_key = key
+
+
+def clear_qr_display(image_label):
+    """
+    Remove o QR code exibido no label.
+
+    Use esta função em vez de `config(image='')`: ela também esquece o texto
+    exibido, para que o mesmo QR code seja desenhado de novo quando voltar, e
+    descarta uma geração ainda em andamento.
+
+    Args:
+        image_label (tk.Label): Widget Label onde a imagem é exibida
+    """
+    image_label.config(image='')
+    image_label.image = None
+    image_label.qr_key = None
+    image_label.qr_pending = None
+
+
+@profiling.profiled()
 def update_qr_display(text_data, image_label, size=(250, 250)):
     """
     Atualiza um widget de label com a imagem do QR code gerada a partir do texto.
-    
+
+    Deve ser chamada na thread da interface. A matriz é gerada numa thread em
+    segundo plano e só a criação da PhotoImage acontece na thread da interface;
+    o mesmo texto não é desenhado de novo.
+
     Args:
         text_data (str): Texto do QR code
         image_label (tk.Label): Widget Label onde a imagem será exibida
-        size (tuple): Tamanho para redimensionar a imagem (width, height)
+        size (tuple): Tamanho da imagem (width, height)
     """
+    # Pedido mais recente deste label; resultados de pedidos anteriores são descartados
+    key = (text_data, tuple(size)) if text_data else None
+    image_label.qr_pending = key
+
     if not text_data:
         # Se não houver dados, limpa a imagem no label
-        image_label.config(image='')
-        image_label.image = None
+        clear_qr_display(image_label)
         return
-    
-    try:
-        # Gera a imagem do QR code a partir do texto
-        qr_img = generate_qr_image(text_data)
-        
-        # Redimensiona a imagem conforme necessário
-        qr_img = qr_img.resize(size, Image.LANCZOS)
-        
-        # Converte para formato compatível com tkinter
-        tk_img = ImageTk.PhotoImage(qr_img)
-        
-        # Atualiza o widget com a nova imagem
-        image_label.config(image=tk_img)
-        image_label.image = tk_img  # Mantém referência para evitar coleta de lixo
-    except Exception as e:
-        print(f"Erro ao gerar imagem do QR code: {e}")
-        image_label.config(image='')
-        image_label.image = None
\ No newline at end of file
+    if getattr(image_label, "qr_key", None) == key:
+        return  # Já exibido
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+    if cached is not None:
+        _show(image_label, key, cached)
+        return
+
+    future = _executor.submit(get_qr_image, text_data, size)
+
+    def check():
+        if not future.done():
+            image_label.after(POLL_INTERVAL_MS, check)
+            return
+        if getattr(image_label, "qr_pending", None) != key:
+            return  # Um QR code mais novo foi solicitado
+        try:
+            _show(image_label, key, future.result())
+        except Exception as e:
+            print(f"Erro ao gerar imagem do QR code: {e}")
+            clear_qr_display(image_label)
+
+    image_label.after(POLL_INTERVAL_MS, check)
@@ -0,0 +1,80 @@
+# retry_policy.py
+import random
+
+# Categorias de falha
+TRANSIENT = "transient"      # Instabilidade (timeout, conexão, erro interno): vale tentar de novo
+PERMANENT = "permanent"      # Problema do pedido ou do destinatário: repetir não adianta
+NOT_READY = "not_ready"      # Servidor sem sessão do WhatsApp pronta: esperar mais antes de repetir
+
+# Trechos (em minúsculas) das mensagens de erro do servidor e do whatsapp-web.js
+_NOT_READY_PATTERNS = (
+    "não está pronto",
+    "not ready",
+    "session closed",
+    "target closed",
+)
+_PERMANENT_PATTERNS = (
+    "obrigatório",
+    "não encontrad",
+    "inválid",
+    "invalid",
+    "not registered",
+    "não registrad",
+    "wid error",
+    "no lid",
+)
+
+
+def classify(status=None, error=""):
+    """
+    Classifica uma falha a partir do status HTTP e da mensagem de erro.
+
+    Args:
+        status (int): Status HTTP da resposta, ou None se a requisição não obteve resposta
+        error (str): Mensagem de erro (inclui os detalhes devolvidos pelo servidor)
+
+    Returns:
+        str: TRANSIENT, PERMANENT ou NOT_READY
+    """
+    message = (error or "").lower()
+    # O servidor responde 400 quando o WhatsApp não está pronto, então a mensagem vem primeiro
+    if any(pattern in message for pattern in _NOT_READY_PATTERNS):
+        return NOT_READY
+    if any(pattern in message for pattern in _PERMANENT_PATTERNS):
+        return PERMANENT
+    if status is None or status in (408, 429) or status >= 500:
+        return TRANSIENT
+    return PERMANENT
+
+
+class RetryPolicy:
+    """Decide se uma falha deve ser repetida e quanto esperar antes disso.
+
+    A espera cresce exponencialmente a cada tentativa, com metade do valor
+    sorteada para que envios simultâneos não voltem todos ao mesmo tempo.
+    """
+
+    def __init__(self, max_attempts=2, base_delay=2.0, max_delay=60.0, not_ready_delay=15.0):
+        """
+        Args:
+            max_attempts (int): Tentativas por destinatário (incluindo a primeira)
+            base_delay (float): Espera em segundos após a primeira falha
+            max_delay (float): Espera máxima em segundos
+            not_ready_delay (float): Espera mínima quando o servidor não está pronto
+        """
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.not_ready_delay = not_ready_delay
+
+    def should_retry(self, category, attempt):
+        """Indica se vale fazer mais uma tentativa após a falha da tentativa `attempt`."""
+        return category != PERMANENT and attempt < self.max_attempts
+
+    def delay(self, category, attempt):
+        """Tempo de espera em segundos antes da tentativa seguinte a `attempt`."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+        if category == NOT_READY:
+            delay = max(delay, self.not_ready_delay)
+        return delay
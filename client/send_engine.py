@@ -0,0 +1,870 @@
+# send_engine.py
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+import aiohttp
+
+import metrics
+import profiling
+from pacing import TokenBucket, AimdController
+from retry_policy import RetryPolicy, classify, PERMANENT, TRANSIENT
+from send_stats import SendStats, TEXT, FILE
+
+# Timeouts totais (em segundos) para cada tipo de envio
+TEXT_TIMEOUT = 30
+FILE_TIMEOUT = 60  # Timeout maior para upload de arquivos
+
+# Espera máxima do servidor por um resultado em cada consulta a /api/jobs/status (ms)
+JOB_STATUS_WAIT_MS = 2000
+
+# Trabalhos consultados por requisição de status
+JOB_STATUS_BATCH = 500
+
+
+class _BatchUnsupported(Exception):
+    """O servidor não possui o endpoint /api/send-batch."""
+
+
+class _JobsUnsupported(Exception):
+    """O servidor não possui a fila de envios (/api/jobs)."""
+
+
+class SendResult:
+    """Resultado do envio para um destinatário."""
+
+    def __init__(self, index, number, success, error="", attempts=0, elapsed=0.0):
+        self.index = index
+        self.number = number
+        self.success = success
+        self.error = error
+        self.attempts = attempts
+        self.elapsed = elapsed
+
+
+class _PendingJob:
+    """Contato enviado pela fila de trabalhos do servidor, entre uma tentativa e outra."""
+
+    def __init__(self, index, number):
+        self.index = index
+        self.number = number
+        self.attempt = 0
+        self.completed = 0  # Etapas concluídas nas tentativas anteriores
+        self.error = ""
+        self.started = time.monotonic()
+
+
+class SendEngine:
+    """Motor de envio assíncrono com janela limitada de requisições simultâneas.
+
+    Mantém até `concurrency` destinatários em andamento ao mesmo tempo, enquanto
+    um token bucket garante o limite de mensagens por minuto. O progresso é
+    informado por callbacks, chamados na thread que executa `run`.
+    """
+
+    def __init__(self, base_url, concurrency=1, rate_per_minute=20, jitter=(0, 0),
+                 max_attempts=2, retry_delay=2, batch_size=1, submit_ahead=0, journal=None,
+                 adaptive=False, on_log=None, on_result=None, on_progress=None, on_rate=None):
+        """
+        Args:
+            base_url (str): URL base da API (ex: http://localhost:3000/api)
+            concurrency (int): Número máximo de destinatários (ou lotes) processados ao mesmo tempo
+            rate_per_minute (float): Limite de destinatários iniciados por minuto (o teto,
+                se o ritmo for adaptativo)
+            jitter (tuple): Variação aleatória (mín, máx) em segundos entre envios
+            max_attempts (int): Tentativas por destinatário
+            retry_delay (float): Espera em segundos após a primeira falha; dobra a cada
+                nova tentativa (com variação aleatória)
+            batch_size (int): Destinatários por requisição; acima de 1 usa /api/send-batch,
+                e o servidor passa a aplicar o ritmo entre os destinatários do lote
+            submit_ahead (int): Contatos enfileirados no servidor (/api/jobs) sem esperar
+                os envios anteriores terminarem; os resultados são conferidos em lote.
+                0 desativa; quando ativo, tem precedência sobre batch_size
+            journal (CampaignJournal): Diário da campanha; contatos já concluídos são
+                pulados e cada novo resultado é registrado nele
+            adaptive (bool): Ajusta o ritmo pela latência e pelos erros do servidor (AIMD)
+            on_log (callable): Recebe (mensagem, nível)
+            on_result (callable): Recebe um SendResult por destinatário concluído
+            on_progress (callable): Recebe (concluídos, total, segundos_restantes_estimados);
+                total e estimativa são None quando o total ou a vazão ainda são desconhecidos
+            on_rate (callable): Recebe (taxa_por_minuto, motivo) a cada ajuste do ritmo adaptativo
+        """
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = max(1, int(concurrency))
+        self.pacer = TokenBucket(rate_per_minute, jitter=jitter)
+        self.on_rate = on_rate
+        self.controller = AimdController(self.pacer, rate_per_minute, on_change=self._rate_changed) if adaptive else None
+        self.retry_policy = RetryPolicy(max_attempts, base_delay=retry_delay)
+        self.batch_size = max(1, int(batch_size))
+        # Passa a False se o servidor não tiver /api/send-batch (vale para todos os workers)
+        self._batch_supported = True
+        self.submit_ahead = max(0, int(submit_ahead))
+        self.jitter = jitter
+        self.on_log = on_log
+        self.on_result = on_result
+        self.on_progress = on_progress
+        self.journal = journal
+        self.running = False
+        # Estatísticas do envio em andamento (substituídas a cada execução)
+        self.stats = SendStats()
+        # Identificadores das mídias registradas no servidor (caminho -> mediaId)
+        self.media_ids = {}
+        self._media_locks = {}
+        self.upload_bytes = 0
+
+    def _log(self, message, level="INFO"):
+        if self.on_log:
+            self.on_log(message, level)
+
+    def _rate_changed(self, rate, reason):
+        metrics.PACING_RATE.set(rate)
+        if self.on_rate:
+            self.on_rate(rate, reason)
+
+    def _upload(self, nbytes):
+        self.upload_bytes += nbytes
+        metrics.UPLOAD_BYTES.inc(nbytes)
+
+    def _endpoint(self, url):
+        # Primeiro segmento após a URL base (ex: send-message, media)
+        path = str(url)[len(self.base_url):].split("?")[0]
+        return path.strip("/").split("/")[0] or "/"
+
+    def _count_steps(self, steps, succeeded, failed):
+        """Conta nas métricas as etapas concluídas e, se houver, a etapa que falhou."""
+        for step in steps[:succeeded]:
+            (metrics.MESSAGES if step is None else metrics.FILES).labels("success").inc()
+        if failed and succeeded < len(steps):
+            (metrics.MESSAGES if steps[succeeded] is None else metrics.FILES).labels("failure").inc()
+
+    def _observe(self, status, error="", started=None):
+        """Informa ao controle adaptativo o resultado de uma chamada (status None = exceção)."""
+        if self.controller is None:
+            return
+        if status == 200:
+            self.controller.observe(True, time.monotonic() - started if started else None)
+        elif classify(status, error) != PERMANENT:
+            self.controller.observe(False)
+        # Erros permanentes são do pedido ou do destinatário e não indicam sobrecarga
+
+    async def _wait(self, seconds):
+        """Espera em fatias curtas, abandonando a espera se o envio for interrompido."""
+        deadline = time.monotonic() + seconds
+        while self.running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, 0.5))
+
+    def stop(self):
+        """Solicita a interrupção do envio (pode ser chamado de qualquer thread)."""
+        self.running = False
+
+    def run(self, contacts, msg_text, files_list, total=None):
+        """Executa o envio de forma bloqueante até concluir ou ser interrompido.
+
+        Args:
+            contacts (iterable): Números de telefone dos destinatários
+            msg_text (str): Mensagem de texto (pode ser vazia se houver arquivos)
+            files_list (list): Caminhos dos arquivos a anexar
+            total (int): Total de contatos, se `contacts` não tiver tamanho conhecido
+                (ex: gerador lendo o arquivo em blocos); pode ficar como None
+
+        Returns:
+            dict: Resumo com as chaves successful, failed, skipped, interrupted,
+            connections_opened, connections_reused, upload_bytes e stats
+            (SendStats.snapshot() ao final do envio)
+        """
+        if total is None and hasattr(contacts, "__len__"):
+            total = len(contacts)
+        self.running = True
+        return asyncio.run(self._run(contacts, msg_text, list(files_list), total))
+
+    async def _run(self, contacts, msg_text, files_list, total):
+        journal = self.journal
+        # Contatos concluídos em uma execução anterior da mesma campanha
+        skipped = journal.done_count if journal else 0
+        summary = {"successful": 0, "failed": 0, "skipped": skipped, "interrupted": False,
+                   "connections_opened": 0, "connections_reused": 0, "upload_bytes": 0}
+        contacts_iter = enumerate(contacts, start=1)
+        if skipped:
+            contacts_iter = ((idx, number) for idx, number in contacts_iter if not journal.is_done(idx))
+            self._log(f"Retomando campanha: {skipped} contatos já processados serão pulados")
+
+        # Contadores de conexões abertas e reutilizadas pelo pool keep-alive
+        async def on_connection_created(session, ctx, params):
+            summary["connections_opened"] += 1
+
+        async def on_connection_reused(session, ctx, params):
+            summary["connections_reused"] += 1
+
+        # Duração de cada requisição até a chegada da resposta, por endpoint
+        async def on_request_start(session, ctx, params):
+            ctx.started = time.monotonic()
+
+        async def on_request_end(session, ctx, params):
+            endpoint = self._endpoint(params.url)
+            elapsed = time.monotonic() - ctx.started
+            metrics.REQUEST_DURATION.labels(endpoint).observe(elapsed)
+            # No modo de perfil, separa o tempo de espera pelo servidor
+            profiling.record(f"servidor:{endpoint}", elapsed)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(on_connection_created)
+        trace_config.on_connection_reuseconn.append(on_connection_reused)
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+
+        # Com a fila de envios, uma conexão a mais fica com a consulta de resultados
+        connector = aiohttp.TCPConnector(limit=self.concurrency + (1 if self.submit_ahead else 0))
+        async with aiohttp.ClientSession(connector=connector, trace_configs=[trace_config]) as session:
+            # Cada anexo é enviado ao servidor uma única vez por campanha
+            self.upload_bytes = 0
+            for file_path in files_list:
+                await self.register_media(session, file_path)
+
+            # A vazão e a estimativa de tempo contam a partir do primeiro envio
+            stats = self.stats = SendStats(total)
+            stats.skipped = skipped
+            metrics.PACING_RATE.set(self.pacer.rate_per_minute)
+            metrics.QUEUE_DEPTH.set(total - skipped if total is not None else 0)
+
+            def record(result):
+                if result.success:
+                    summary["successful"] += 1
+                else:
+                    summary["failed"] += 1
+                stats.record_result(result.success)
+                metrics.RECIPIENTS.labels("success" if result.success else "failure").inc()
+                if total is not None:
+                    metrics.QUEUE_DEPTH.dec()
+
+                # Falhas causadas pela interrupção não são registradas: serão tentadas ao retomar
+                if journal and (result.success or self.running):
+                    journal.record(result.index, result.number, result.success, result.error)
+                if self.on_result:
+                    self.on_result(result)
+                if self.on_progress:
+                    self.on_progress(stats.done, total, stats.eta())
+
+            async def worker():
+                # Os workers compartilham o mesmo iterador; no event loop isso é seguro
+                for idx, number in contacts_iter:
+                    if not await self.pacer.acquire(lambda: self.running):
+                        return
+                    self._log(f"Processando contato {idx}/{total or '?'}: {number}")
+                    metrics.IN_FLIGHT.inc()
+                    try:
+                        result = await self._send_to_recipient(session, idx, number, msg_text, files_list)
+                    finally:
+                        metrics.IN_FLIGHT.dec()
+                    record(result)
+
+                    if not self.running:
+                        return
+
+            async def batch_worker():
+                while self.running:
+                    jobs = []
+                    for idx, number in contacts_iter:
+                        jobs.append((idx, number))
+                        if len(jobs) >= self.batch_size:
+                            break
+                    if not jobs:
+                        return
+                    self._log(f"Enviando lote de {len(jobs)} contatos ({jobs[0][0]}-{jobs[-1][0]} de {total or '?'})")
+                    metrics.IN_FLIGHT.inc(len(jobs))
+                    try:
+                        await self._send_batch(session, jobs, msg_text, files_list, record)
+                    finally:
+                        metrics.IN_FLIGHT.dec(len(jobs))
+
+            media_ready = all(self.media_ids.get(f) for f in files_list)
+            use_jobs = self.submit_ahead > 0 and media_ready
+            if self.submit_ahead > 0 and not use_jobs:
+                self._log("A fila de envios requer anexos registrados no servidor; usando envio direto", "WARNING")
+            use_batch = not use_jobs and self.batch_size > 1 and media_ready
+            if self.batch_size > 1 and not use_jobs and not use_batch:
+                self._log("Envio em lote requer anexos registrados no servidor; usando envio individual", "WARNING")
+            try:
+                if use_jobs:
+                    await self._run_jobs(session, contacts_iter, total, msg_text, files_list, record, worker)
+                else:
+                    await asyncio.gather(*((batch_worker() if use_batch else worker())
+                                           for _ in range(self.concurrency)))
+            finally:
+                if journal:
+                    journal.checkpoint()
+
+        summary["interrupted"] = not self.running
+        summary["upload_bytes"] = self.upload_bytes
+        summary["stats"] = self.stats.snapshot()
+        self.running = False
+        return summary
+
+    async def _send_to_recipient(self, session, idx, number, msg_text, files_list):
+        """Envia o texto e os anexos para um destinatário.
+
+        Cada item é uma etapa; numa nova tentativa só as etapas que ainda não
+        tiveram sucesso são enviadas. Falhas permanentes não são repetidas.
+        """
+        start_time = time.monotonic()
+        # Etapas na ordem de envio: o texto (None) e cada anexo
+        steps = ([None] if msg_text else []) + list(files_list)
+        completed = 0
+        attempt = 0
+        last_error = ""
+
+        while self.running:
+            attempt += 1
+            if attempt > 1:
+                self._log(f"Tentativa {attempt}/{self.retry_policy.max_attempts} para o número {number} "
+                          f"({len(steps) - completed} de {len(steps)} etapas pendentes)")
+
+            category = None
+            while completed < len(steps):
+                step = steps[completed]
+                step_started = time.monotonic()
+                if step is None:
+                    success, error, status = await self.send_text(session, number, msg_text)
+                    self.stats.record_step(TEXT, time.monotonic() - step_started)
+                    if not success:
+                        self._log(f"Falha ao enviar texto para {number}: {error}", "ERROR")
+                else:
+                    filename = os.path.basename(step)
+                    self._log(f"Enviando arquivo: {filename} para {number}")
+                    success, error, status = await self.send_file(session, number, step)
+                    self.stats.record_step(FILE, time.monotonic() - step_started)
+                    if not success:
+                        self._log(f"Falha ao enviar arquivo {filename}: {error}", "ERROR")
+                self._count_steps([step], int(success), not success)
+                if not success:
+                    last_error = error
+                    category = classify(status, error)
+                    break
+                completed += 1
+
+            if completed == len(steps):
+                self._log(f"Mensagem enviada com sucesso para {number}", "SUCCESS")
+                return SendResult(idx, number, True, "", attempt, time.monotonic() - start_time)
+
+            if not self.retry_policy.should_retry(category, attempt):
+                if category == PERMANENT:
+                    self._log(f"Erro permanente para {number}; não será repetido", "WARNING")
+                break
+            metrics.RETRIES.labels(category).inc()
+            delay = self.retry_policy.delay(category, attempt)
+            self._log(f"Aguardando {delay:.1f}s para nova tentativa...", "WARNING")
+            await self._wait(delay)
+
+        return SendResult(idx, number, False, last_error, attempt, time.monotonic() - start_time)
+
+    async def _send_batch(self, session, jobs, msg_text, files_list, record):
+        """Envia um lote via /api/send-batch, registrando cada resultado à medida que chega.
+
+        O servidor informa quantas etapas de cada trabalho foram concluídas; numa
+        nova tentativa cada contato recebe só as etapas restantes.
+        """
+        start_time = time.monotonic()
+        steps_list = ([None] if msg_text else []) + list(files_list)
+        pending = list(jobs)
+        completed = {}
+        last_errors = {}
+        attempt = 0
+
+        while pending and self.running:
+            attempt += 1
+            if attempt > 1:
+                self._log(f"Tentativa {attempt}/{self.retry_policy.max_attempts} "
+                          f"para {len(pending)} contatos do lote", "WARNING")
+
+            retry = []
+            categories = set()
+
+            def unanswered(error, status=None):
+                # Contatos do lote sem linha de resultado: nova tentativa ou falha definitiva
+                category = classify(status, error)
+                for item in pending:
+                    if item is None:
+                        continue
+                    last_errors[item[0]] = error
+                    if self.retry_policy.should_retry(category, attempt):
+                        retry.append(item)
+                        categories.add(category)
+                        metrics.RETRIES.labels(category).inc()
+                    else:
+                        record(SendResult(item[0], item[1], False, error, attempt, time.monotonic() - start_time))
+
+            try:
+                if not self._batch_supported:
+                    raise _BatchUnsupported()
+                async for position, success, error, steps in self._post_batch(
+                        session, pending, msg_text, files_list, completed):
+                    idx, number = pending[position]
+                    pending[position] = None
+                    self._observe(200 if success else 500, error)
+                    remaining = steps_list[completed.get(idx, 0):]
+                    self._count_steps(remaining, len(remaining) if success else steps, not success)
+                    if success:
+                        self._log(f"Mensagem enviada com sucesso para {number}", "SUCCESS")
+                        record(SendResult(idx, number, True, "", attempt, time.monotonic() - start_time))
+                        continue
+
+                    self._log(f"Falha ao enviar para {number}: {error}", "ERROR")
+                    completed[idx] = completed.get(idx, 0) + steps
+                    last_errors[idx] = error
+                    category = classify(500, error)
+                    if self.retry_policy.should_retry(category, attempt):
+                        retry.append((idx, number))
+                        categories.add(category)
+                        metrics.RETRIES.labels(category).inc()
+                    else:
+                        record(SendResult(idx, number, False, error, attempt, time.monotonic() - start_time))
+            except _BatchUnsupported:
+                # Servidor sem suporte a lotes: envia os contatos restantes individualmente.
+                # A flag faz os demais workers de lote pularem direto para cá
+                if self._batch_supported:
+                    self._batch_supported = False
+                    self._log("Servidor não suporta envio em lote; usando envio individual", "WARNING")
+                for item in pending + retry:
+                    if item is not None and self.running:
+                        idx, number = item
+                        if not await self.pacer.acquire(lambda: self.running):
+                            break
+                        record(await self._send_to_recipient(session, idx, number, msg_text, files_list))
+                pending = []
+                break
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+                self._observe(None, error)
+                self._log(f"Falha no envio do lote: {error}", "ERROR")
+                # Contatos sem resposta (conexão interrompida ou lote recusado)
+                unanswered(error)
+            else:
+                # O fluxo terminou sem erro, mas sem resposta para alguns contatos
+                # (ex: lote interrompido no servidor)
+                if any(item is not None for item in pending):
+                    if self.running:
+                        error = "O servidor encerrou o lote sem responder para o contato"
+                        self._log(error, "WARNING")
+                    else:
+                        error = "Envio interrompido"
+                    unanswered(error)
+
+            pending = retry
+            if pending and self.running:
+                # Espera o suficiente para a categoria mais lenta entre as falhas
+                delay = max(self.retry_policy.delay(category, attempt) for category in categories)
+                self._log(f"Aguardando {delay:.1f}s para nova tentativa...", "WARNING")
+                await self._wait(delay)
+
+        for idx, number in pending:
+            record(SendResult(idx, number, False, last_errors.get(idx, "Envio interrompido"),
+                              attempt, time.monotonic() - start_time))
+
+    async def _post_batch(self, session, jobs, msg_text, files_list, completed):
+        """Envia os trabalhos e gera (posição, sucesso, erro, etapas concluídas) a cada linha NDJSON.
+
+        Args:
+            completed (dict): Etapas já concluídas por índice do contato; essas são omitidas
+        """
+        media_ids = [self.media_ids[f] for f in files_list]
+        text_steps = 1 if msg_text else 0
+        body_jobs = []
+        for idx, number in jobs:
+            done = completed.get(idx, 0)
+            body_jobs.append({
+                "number": number,
+                "message": msg_text if done < text_steps else "",
+                "mediaIds": media_ids[max(done - text_steps, 0):],
+            })
+
+        interval_ms = int(60000 * self.concurrency / self.pacer.rate_per_minute) if self.pacer.rate_per_minute else 0
+        body = {
+            "jobs": body_jobs,
+            "intervalMs": interval_ms,
+            "jitterMs": [int(self.jitter[0] * 1000), int(self.jitter[1] * 1000)],
+        }
+        # O lote leva no mínimo o intervalo de ritmo por destinatário
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=FILE_TIMEOUT + interval_ms / 1000 + self.jitter[1])
+
+        async with session.post(f"{self.base_url}/send-batch", json=body, timeout=timeout) as response:
+            if response.status == 404:
+                data = await response.json(content_type=None) if response.content_type == "application/json" else {}
+                missing = set(data.get("mediaIds", []))
+                if not missing:
+                    raise _BatchUnsupported()
+                # Mídias removidas do cache do servidor: registra novamente antes de repetir
+                for file_path in files_list:
+                    if self.media_ids.get(file_path) in missing:
+                        await self.register_media(session, file_path, force=True)
+                raise RuntimeError("Mídia removida do cache do servidor")
+            if response.status != 200:
+                raise RuntimeError(await _error_from_response(response))
+
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                yield (data["index"], data.get("success", False), data.get("error", ""),
+                       data.get("stepsCompleted", 0))
+
+    async def _run_jobs(self, session, contacts_iter, total, msg_text, files_list, record, fallback):
+        """Envia pela fila de trabalhos do servidor (/api/jobs).
+
+        Cada contato é enfileirado assim que o ritmo permite, sem esperar os envios
+        anteriores terminarem, com no máximo `submit_ahead` contatos pendentes. Uma
+        tarefa separada confere os resultados em lote (/api/jobs/status); falhas
+        voltam para a fila só com as etapas restantes. Se o servidor não tiver a
+        fila, cada enfileirador passa a ser um worker de envio direto (`fallback`).
+        """
+        steps_list = ([None] if msg_text else []) + list(files_list)
+        outstanding = {}  # jobId -> _PendingJob
+        retries = set()   # Tarefas esperando para enfileirar novamente
+        slots = asyncio.Semaphore(self.submit_ahead)
+        changed = asyncio.Event()
+        submitting = True
+
+        def finish(pending, success, error=""):
+            slots.release()
+            changed.set()
+            record(SendResult(pending.index, pending.number, success, error, pending.attempt,
+                              time.monotonic() - pending.started))
+
+        def fail(pending, error, status=None, category=None):
+            """Agenda uma nova tentativa ou registra a falha definitiva."""
+            pending.error = error
+            category = category or classify(status, error)
+            if self.running and self.retry_policy.should_retry(category, pending.attempt):
+                metrics.RETRIES.labels(category).inc()
+                delay = self.retry_policy.delay(category, pending.attempt)
+                self._log(f"Nova tentativa para {pending.number} em {delay:.1f}s "
+                          f"({pending.attempt + 1}/{self.retry_policy.max_attempts})", "WARNING")
+                task = asyncio.ensure_future(resubmit(pending, delay))
+                retries.add(task)
+                task.add_done_callback(retries.discard)
+            else:
+                if category == PERMANENT:
+                    self._log(f"Erro permanente para {pending.number}; não será repetido", "WARNING")
+                finish(pending, False, error)
+
+        async def submit(pending):
+            """Enfileira as etapas restantes do contato; falhas seguem para fail()."""
+            pending.attempt += 1
+            remaining = steps_list[pending.completed:]
+            job = {
+                "number": pending.number,
+                "message": msg_text if remaining and remaining[0] is None else "",
+                "mediaIds": [self.media_ids[f] for f in remaining if f is not None],
+            }
+            try:
+                async with session.post(f"{self.base_url}/jobs", json={"jobs": [job]},
+                                        timeout=aiohttp.ClientTimeout(total=TEXT_TIMEOUT)) as response:
+                    if response.status == 202:
+                        job_id = (await response.json())["jobs"][0]["id"]
+                        outstanding[job_id] = pending
+                        metrics.IN_FLIGHT.inc()
+                        changed.set()
+                        return
+                    status = response.status
+                    if status == 404:
+                        data = await response.json(content_type=None) if response.content_type == "application/json" else {}
+                        missing = set(data.get("mediaIds", []))
+                        if not missing:
+                            raise _JobsUnsupported()
+                        # Mídias removidas do cache do servidor: registra novamente antes de repetir
+                        for file_path in files_list:
+                            if self.media_ids.get(file_path) in missing:
+                                await self.register_media(session, file_path, force=True)
+                        status, error = None, "Mídia removida do cache do servidor"
+                    else:
+                        error = await _error_from_response(response)
+            except _JobsUnsupported:
+                raise
+            except Exception as e:
+                status, error = None, str(e) or e.__class__.__name__
+            self._observe(status, error)
+            self._log(f"Falha ao enfileirar o envio para {pending.number}: {error}", "ERROR")
+            fail(pending, error, status)
+
+        async def resubmit(pending, delay):
+            await self._wait(delay)
+            if not self.running:
+                finish(pending, False, pending.error)
+                return
+            try:
+                await submit(pending)
+            except _JobsUnsupported:
+                finish(pending, False, "Servidor sem fila de envios")
+
+        async def submitter():
+            for idx, number in contacts_iter:
+                # Limita os contatos pendentes no servidor antes de consumir o ritmo
+                await slots.acquire()
+                if not await self.pacer.acquire(lambda: self.running):
+                    slots.release()
+                    return
+                self._log(f"Enfileirando contato {idx}/{total or '?'}: {number}")
+                try:
+                    await submit(_PendingJob(idx, number))
+                except _JobsUnsupported:
+                    if self.submit_ahead:
+                        self._log("Servidor não possui fila de envios; usando envio direto", "WARNING")
+                        self.submit_ahead = 0
+                    slots.release()
+                    record(await self._send_to_recipient(session, idx, number, msg_text, files_list))
+                    await fallback()
+                    return
+                if not self.running:
+                    return
+
+        def handle(job):
+            pending = outstanding.pop(job["id"])
+            metrics.IN_FLIGHT.dec()
+            remaining = steps_list[pending.completed:]
+            for step, duration_ms in zip(remaining, job.get("stepDurationsMs") or []):
+                self.stats.record_step(TEXT if step is None else FILE, duration_ms / 1000)
+
+            if job["status"] == "done":
+                self._count_steps(remaining, len(remaining), False)
+                self._observe(200, started=time.monotonic() - job.get("runMs", 0) / 1000)
+                self._log(f"Mensagem enviada com sucesso para {pending.number}", "SUCCESS")
+                finish(pending, True)
+                return False
+            if job["status"] == "canceled":
+                finish(pending, False, "Envio interrompido")
+                return False
+
+            error = job.get("error") or "Erro desconhecido"
+            steps_done = job.get("stepsCompleted", 0)
+            self._count_steps(remaining, steps_done, job["status"] == "failed")
+            pending.completed += steps_done
+            self._observe(500, error)
+            self._log(f"Falha ao enviar para {pending.number}: {error}", "ERROR")
+            # Trabalho desconhecido (ex: servidor reiniciado): o resultado é incerto, então não é
+            # repetido, para não enviar em dobro; mídia fora do cache é registrada de novo
+            media_missing = "mídia não encontrada" in error.lower()
+            fail(pending, error, 500 if job["status"] == "failed" else None,
+                 TRANSIENT if media_missing else None)
+            return media_missing
+
+        async def reconcile():
+            canceled = False
+            deadline = None
+            while True:
+                if not outstanding:
+                    if not submitting and not retries:
+                        return
+                    changed.clear()
+                    try:
+                        await asyncio.wait_for(changed.wait(), 0.5)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                if not self.running and not canceled:
+                    # Interrompido: retira do servidor o que ainda não começou e espera o resto
+                    canceled = True
+                    deadline = time.monotonic() + FILE_TIMEOUT
+                    await self._cancel_jobs(session, list(outstanding))
+                if deadline is not None and time.monotonic() > deadline:
+                    for job_id in list(outstanding):
+                        handle({"id": job_id, "status": "canceled"})
+                    continue
+
+                try:
+                    jobs = await self._job_status(session, list(outstanding)[:JOB_STATUS_BATCH],
+                                                  JOB_STATUS_WAIT_MS)
+                except Exception as e:
+                    self._log(f"Falha ao consultar a fila de envios: {str(e) or e.__class__.__name__}", "WARNING")
+                    await asyncio.sleep(1)
+                    continue
+
+                media_missing = False
+                for job in jobs:
+                    if job.get("status") in ("done", "failed", "canceled", "unknown") and job["id"] in outstanding:
+                        media_missing = handle(job) or media_missing
+                if media_missing:
+                    for file_path in files_list:
+                        await self.register_media(session, file_path, force=True)
+
+        reconciler = asyncio.ensure_future(reconcile())
+        try:
+            await asyncio.gather(*(submitter() for _ in range(self.concurrency)))
+        finally:
+            submitting = False
+            changed.set()
+        await reconciler
+
+    async def _job_status(self, session, job_ids, wait_ms=0):
+        """Consulta o estado de vários trabalhos de uma vez (espera até `wait_ms` por um resultado)."""
+        timeout = aiohttp.ClientTimeout(total=TEXT_TIMEOUT + wait_ms / 1000)
+        async with session.post(f"{self.base_url}/jobs/status", json={"ids": job_ids, "waitMs": wait_ms},
+                                timeout=timeout) as response:
+            if response.status != 200:
+                raise RuntimeError(await _error_from_response(response))
+            return (await response.json())["jobs"]
+
+    async def _cancel_jobs(self, session, job_ids):
+        """Cancela no servidor os trabalhos que ainda não começaram."""
+        try:
+            async with session.post(f"{self.base_url}/jobs/cancel", json={"ids": job_ids},
+                                    timeout=aiohttp.ClientTimeout(total=TEXT_TIMEOUT)) as response:
+                if response.status == 200:
+                    canceled = (await response.json()).get("canceled", 0)
+                    self._log(f"{canceled} envios ainda na fila do servidor foram cancelados", "WARNING")
+        except Exception as e:
+            self._log(f"Não foi possível cancelar os envios na fila do servidor: {e}", "WARNING")
+
+    async def send_text(self, session, number, message):
+        """Envia uma mensagem de texto para um número. Retorna (sucesso, erro, status HTTP)."""
+        started = time.monotonic()
+        try:
+            async with session.post(
+                f"{self.base_url}/send-message",
+                json={"number": number, "message": message},
+                timeout=aiohttp.ClientTimeout(total=TEXT_TIMEOUT)
+            ) as response:
+                if response.status == 200:
+                    self._observe(response.status, started=started)
+                    return True, "", response.status
+                error = await _error_from_response(response)
+                self._observe(response.status, error)
+                return False, error, response.status
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            self._observe(None, error)
+            return False, error, None
+
+    async def register_media(self, session, file_path, force=False):
+        """
+        Registra um anexo no servidor e guarda o identificador da mídia.
+
+        O identificador é o hash SHA-256 do conteúdo; se o servidor já tiver a
+        mídia em cache o arquivo nem é reenviado.
+
+        Returns:
+            str: Identificador da mídia, ou None se o servidor não aceitar o registro
+        """
+        lock = self._media_locks.setdefault(file_path, asyncio.Lock())
+        async with lock:
+            if not force and self.media_ids.get(file_path):
+                return self.media_ids[file_path]
+
+            filename = os.path.basename(file_path)
+            media_id = None
+            try:
+                loop = asyncio.get_running_loop()
+                digest = await loop.run_in_executor(None, _file_sha256, file_path)
+
+                async with session.get(f"{self.base_url}/media/{digest}",
+                                       timeout=aiohttp.ClientTimeout(total=TEXT_TIMEOUT)) as response:
+                    if response.status == 200:
+                        media_id = digest
+
+                if media_id is None:
+                    with open(file_path, "rb") as file:
+                        form = aiohttp.FormData()
+                        form.add_field("file", file, filename=filename)
+                        async with session.post(f"{self.base_url}/media", data=form,
+                                                timeout=aiohttp.ClientTimeout(total=FILE_TIMEOUT)) as response:
+                            if response.status == 200:
+                                media_id = (await response.json())["mediaId"]
+                                self._upload(os.path.getsize(file_path))
+            except Exception as e:
+                self._log(f"Não foi possível registrar o arquivo {filename}: {e}", "WARNING")
+
+            if media_id:
+                self._log(f"Arquivo {filename} registrado no servidor para reutilização")
+            else:
+                self._log(f"Arquivo {filename} será enviado a cada destinatário", "WARNING")
+            self.media_ids[file_path] = media_id
+            return media_id
+
+    async def send_file(self, session, number, file_path):
+        """Envia um arquivo para um número, usando a mídia registrada quando disponível.
+
+        Returns:
+            tuple: (sucesso, erro, status HTTP ou None se não houve resposta)
+        """
+        media_id = self.media_ids.get(file_path)
+        if not media_id:
+            return await self.upload_file(session, number, file_path)
+
+        success, error, status = await self.send_media(session, number, media_id)
+        if status == 404:
+            # A mídia saiu do cache do servidor: registra novamente e tenta de novo
+            media_id = await self.register_media(session, file_path, force=True)
+            if not media_id:
+                return await self.upload_file(session, number, file_path)
+            success, error, status = await self.send_media(session, number, media_id)
+        return success, error, status
+
+    async def send_media(self, session, number, media_id):
+        """Envia uma mídia previamente registrada. Retorna (sucesso, erro, status HTTP)."""
+        try:
+            async with session.post(
+                f"{self.base_url}/send-media",
+                json={"number": number, "mediaId": media_id},
+                timeout=aiohttp.ClientTimeout(total=FILE_TIMEOUT)
+            ) as response:
+                # Só o resultado conta: a latência de anexos não é comparável à de textos
+                if response.status == 200:
+                    self._observe(response.status)
+                    return True, "", response.status
+                error = await _error_from_response(response)
+                self._observe(response.status, error)
+                return False, error, response.status
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            self._observe(None, error)
+            return False, error, None
+
+    async def upload_file(self, session, number, file_path):
+        """Envia um arquivo para um número com upload completo. Retorna (sucesso, erro, status HTTP)."""
+        try:
+            with open(file_path, "rb") as file:
+                form = aiohttp.FormData()
+                form.add_field("number", number)
+                form.add_field("file", file, filename=os.path.basename(file_path))
+
+                async with session.post(
+                    f"{self.base_url}/send-file",
+                    data=form,
+                    timeout=aiohttp.ClientTimeout(total=FILE_TIMEOUT)
+                ) as response:
+                    if response.status == 200:
+                        self._upload(os.path.getsize(file_path))
+                        self._observe(response.status)
+                        return True, "", response.status
+                    error = await _error_from_response(response)
+                    self._observe(response.status, error)
+                    return False, error, response.status
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            self._observe(None, error)
+            return False, error, None
+
+
+def _file_sha256(file_path):
+    """Calcula o hash SHA-256 do conteúdo de um arquivo."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def _error_from_response(response):
+    """Extrai a mensagem de erro (e os detalhes, se houver) do corpo JSON de uma resposta de falha."""
+    try:
+        data = await response.json(content_type=None)
+        error = data.get("error", "Erro desconhecido")
+        # Os detalhes trazem o erro do WhatsApp, usado para classificar a falha
+        if data.get("details"):
+            error = f"{error}: {data['details']}"
+        return error
+    except Exception:
+        return f"Erro HTTP {response.status}"
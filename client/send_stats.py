@@ -0,0 +1,182 @@
+# send_stats.py
+import math
+import time
+
+# Tipos de etapa com latência medida separadamente
+TEXT = "text"
+FILE = "file"
+
+
+class LatencyHistogram:
+    """Histograma de latências com baldes em escala logarítmica (estilo HDR).
+
+    Cada balde cobre um intervalo `precision` (5%) maior que o anterior, então
+    os percentis têm erro relativo limitado e a memória é fixa, qualquer que
+    seja a quantidade de amostras.
+    """
+
+    def __init__(self, min_value=0.001, max_value=600.0, precision=0.05):
+        """
+        Args:
+            min_value (float): Menor latência distinguível em segundos
+            max_value (float): Maior latência registrada (valores acima caem no último balde)
+            precision (float): Erro relativo máximo dos percentis
+        """
+        self.min_value = min_value
+        self._log_base = math.log1p(precision)
+        self._counts = [0] * (self._bucket(max_value) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _bucket(self, value):
+        if value <= self.min_value:
+            return 0
+        return int(math.log(value / self.min_value) / self._log_base) + 1
+
+    def record(self, value):
+        self._counts[min(self._bucket(value), len(self._counts) - 1)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p):
+        """Retorna o percentil `p` (0-100) em segundos, ou None sem amostras."""
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * p / 100.0)
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= max(rank, 1):
+                # Meio (geométrico) do balde, sem passar do maior valor visto
+                if not bucket:
+                    return min(self.min_value, self.max)
+                return min(self.min_value * math.exp((bucket - 0.5) * self._log_base), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class ErrorWindow:
+    """Taxa de erros nos últimos `seconds` segundos, com um balde por segundo."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self._totals = [0] * seconds
+        self._errors = [0] * seconds
+        self._stamps = [-1] * seconds
+
+    def record(self, success, now=None):
+        second = int(time.monotonic() if now is None else now)
+        slot = second % self.seconds
+        if self._stamps[slot] != second:
+            self._stamps[slot] = second
+            self._totals[slot] = 0
+            self._errors[slot] = 0
+        self._totals[slot] += 1
+        if not success:
+            self._errors[slot] += 1
+
+    def rate(self, now=None):
+        """Fração de falhas na janela, ou None se não houve resultados."""
+        oldest = int(time.monotonic() if now is None else now) - self.seconds
+        totals = errors = 0
+        for slot in range(self.seconds):
+            if self._stamps[slot] > oldest:
+                totals += self._totals[slot]
+                errors += self._errors[slot]
+        return errors / totals if totals else None
+
+
+class SendStats:
+    """Estatísticas de uma campanha em memória constante.
+
+    Guarda contadores, a vazão como média móvel exponencial (EWMA) do intervalo
+    entre conclusões, histogramas de latência separados para textos e arquivos e
+    a taxa de erros em janelas de 1 e 5 minutos.
+    """
+
+    def __init__(self, total=None, alpha=0.1):
+        """
+        Args:
+            total (int): Total de contatos da campanha, se conhecido
+            alpha (float): Peso de cada nova amostra na média de vazão
+        """
+        self.total = total
+        self.alpha = alpha
+        self.successful = 0
+        self.failed = 0
+        self.skipped = 0
+        self.latency = {TEXT: LatencyHistogram(), FILE: LatencyHistogram()}
+        self.errors_1m = ErrorWindow(60)
+        self.errors_5m = ErrorWindow(300)
+        self.started = time.monotonic()
+        self._last_done = None
+        self._interval = None  # Média móvel do intervalo entre conclusões (segundos)
+
+    @property
+    def done(self):
+        return self.successful + self.failed + self.skipped
+
+    def record_step(self, kind, seconds):
+        """Registra a latência de uma chamada de envio (TEXT ou FILE)."""
+        self.latency[kind].record(seconds)
+
+    def record_result(self, success):
+        """Registra a conclusão de um destinatário."""
+        now = time.monotonic()
+        if success:
+            self.successful += 1
+        else:
+            self.failed += 1
+        self.errors_1m.record(success, now)
+        self.errors_5m.record(success, now)
+
+        # A primeira conclusão é medida a partir do início do envio
+        elapsed = now - (self._last_done if self._last_done is not None else self.started)
+        self._last_done = now
+        if self._interval is None:
+            self._interval = elapsed
+        else:
+            self._interval += self.alpha * (elapsed - self._interval)
+
+    @property
+    def throughput(self):
+        """Destinatários concluídos por minuto (EWMA), ou None antes da primeira conclusão."""
+        if not self._interval:
+            return None
+        return 60.0 / self._interval
+
+    def eta(self):
+        """Segundos restantes estimados, ou None se o total ou a vazão forem desconhecidos."""
+        if self.total is None or not self._interval:
+            return None
+        return max(self.total - self.done, 0) * self._interval
+
+    def snapshot(self):
+        """Retorna um dicionário com os valores atuais (para a interface, logs e JSON)."""
+        processed = self.successful + self.failed
+        latency = {}
+        for kind, histogram in self.latency.items():
+            latency[kind] = {
+                "count": histogram.count,
+                "p50": histogram.percentile(50),
+                "p95": histogram.percentile(95),
+                "p99": histogram.percentile(99),
+            }
+        return {
+            "total": self.total,
+            "done": self.done,
+            "successful": self.successful,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "success_rate": self.successful / processed if processed else None,
+            "throughput_per_minute": self.throughput,
+            "eta_seconds": self.eta(),
+            "error_rate_1m": self.errors_1m.rate(),
+            "error_rate_5m": self.errors_5m.rate(),
+            "latency": latency,
+        }
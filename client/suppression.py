@@ -0,0 +1,153 @@
+# suppression.py
+#
+# Base persistente dos números já contatados e descadastrados, compartilhada
+# entre campanhas. Os números são guardados como inteiros no formato
+# internacional (ex: 5511999999999), chave primária da tabela SQLite.
+import contextlib
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from phone_numbers import phone_keys
+
+# Arquivo padrão da base de supressão
+DEFAULT_DB_PATH = "suppression.db"
+
+# Quantidade de registros gravados por transação
+_WRITE_BATCH = 50000
+
+
+def _contains(sorted_keys, keys):
+    """Indica, para cada chave, se ela está no array ordenado (busca binária vetorizada)."""
+    if not len(sorted_keys):
+        return np.zeros(len(keys), dtype=bool)
+    positions = np.searchsorted(sorted_keys, keys)
+    positions[positions == len(sorted_keys)] = 0
+    return sorted_keys[positions] == keys
+
+
+class SuppressionStore:
+    """Base SQLite com a data do último contato e o descadastro de cada número.
+
+    Cada operação abre a própria conexão, então a mesma instância pode ser usada
+    pela thread da interface e pela thread de envio.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        """
+        Args:
+            path (str): Caminho do arquivo SQLite
+        """
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS contacts ("
+                " number INTEGER PRIMARY KEY,"
+                " last_contacted REAL,"
+                " opted_out INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_contacts_last_contacted ON contacts (last_contacted)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _upsert(self, sql, rows):
+        with self._connect() as conn:
+            for start in range(0, len(rows), _WRITE_BATCH):
+                conn.executemany(sql, rows[start:start + _WRITE_BATCH])
+
+    def record_contacted(self, numbers, when=None):
+        """
+        Registra que os números receberam mensagem.
+
+        Args:
+            numbers (iterable): Números de telefone
+            when (float): Data do contato (timestamp); padrão: agora
+
+        Returns:
+            int: Quantidade de números válidos registrados
+        """
+        numbers = list(numbers)
+        if not numbers:
+            return 0
+        keys = np.unique(phone_keys(numbers))
+        keys = keys[keys >= 0]
+        when = time.time() if when is None else when
+        self._upsert(
+            "INSERT INTO contacts (number, last_contacted) VALUES (?, ?) "
+            "ON CONFLICT(number) DO UPDATE SET last_contacted = excluded.last_contacted",
+            [(int(key), when) for key in keys]
+        )
+        return len(keys)
+
+    def opt_out(self, numbers, opted_out=True):
+        """
+        Marca (ou desmarca) números como descadastrados.
+
+        Returns:
+            int: Quantidade de números válidos atualizados
+        """
+        numbers = list(numbers)
+        if not numbers:
+            return 0
+        keys = np.unique(phone_keys(numbers))
+        keys = keys[keys >= 0]
+        flag = 1 if opted_out else 0
+        self._upsert(
+            "INSERT INTO contacts (number, opted_out) VALUES (?, ?) "
+            "ON CONFLICT(number) DO UPDATE SET opted_out = excluded.opted_out",
+            [(int(key), flag) for key in keys]
+        )
+        return len(keys)
+
+    def _select_keys(self, sql, params=()):
+        with self._connect() as conn:
+            keys = np.fromiter((row[0] for row in conn.execute(sql, params)), dtype=np.int64)
+        keys.sort()
+        return keys
+
+    def filter(self, contacts, skip_contacted_days=0):
+        """
+        Remove da lista os números descadastrados, os contatados recentemente e os
+        duplicados, mantendo a ordem original.
+
+        Args:
+            contacts (list): Números de telefone como texto
+            skip_contacted_days (int): Remove quem recebeu mensagem nos últimos N dias (0 desativa)
+
+        Returns:
+            tuple: (lista filtrada, dicionário com as chaves total, kept, opted_out,
+            recent e duplicates)
+        """
+        keys = phone_keys(contacts)
+        valid = keys >= 0
+
+        opted_out = _contains(self._select_keys("SELECT number FROM contacts WHERE opted_out = 1"), keys) & valid
+        recent = np.zeros(len(keys), dtype=bool)
+        if skip_contacted_days > 0:
+            since = time.time() - skip_contacted_days * 86400
+            recent_keys = self._select_keys("SELECT number FROM contacts WHERE last_contacted >= ?", (since,))
+            recent = _contains(recent_keys, keys) & valid & ~opted_out
+
+        # Números sem dígitos válidos não são deduplicados: o envio reportará o erro
+        duplicates = pd.Series(keys).duplicated().to_numpy() & valid & ~opted_out & ~recent
+        keep = ~(opted_out | recent | duplicates)
+
+        kept = np.asarray(contacts, dtype=object)[keep].tolist()
+        stats = {
+            "total": len(keys),
+            "kept": len(kept),
+            "opted_out": int(opted_out.sum()),
+            "recent": int(recent.sum()),
+            "duplicates": int(duplicates.sum()),
+        }
+        return kept, stats
@@ -0,0 +1,101 @@
+# ui_bus.py
+import collections
+import threading
+
+import profiling
+
+# Quantidade de vezes por segundo que a interface é atualizada
+DEFAULT_FPS = 20
+
+
+class UiEventBus:
+    """Fila de atualizações da interface publicadas por threads de trabalho.
+
+    O Tk não é seguro para uso fora da thread principal. As threads publicam
+    eventos aqui e a thread principal os aplica com `master.after` em uma taxa
+    fixa. Eventos publicados com `key` são mesclados: só o último valor de cada
+    chave é desenhado, e eventos publicados com `publish_batch` (ex: linhas de
+    log) chegam juntos numa única chamada por ciclo, então o custo da interface
+    não cresce com a taxa de envio.
+    """
+
+    def __init__(self, master, fps=DEFAULT_FPS):
+        """
+        Args:
+            master: Janela principal do Tk
+            fps (int): Quantidade de atualizações da interface por segundo
+        """
+        self.master = master
+        self.interval_ms = max(1, int(1000 / fps))
+        self._lock = threading.Lock()
+        self._events = collections.deque()
+        self._latest = {}
+        self._scheduled = None
+
+    def publish(self, handler, *args, key=None):
+        """
+        Agenda `handler(*args)` para a thread principal.
+
+        Args:
+            handler (callable): Função que atualiza a interface
+            key (str): Se informado, substitui um evento pendente com a mesma chave
+        """
+        with self._lock:
+            if key is None:
+                self._events.append((handler, args, False))
+            else:
+                self._latest[key] = (handler, args)
+
+    def publish_batch(self, handler, item):
+        """
+        Agenda `handler(itens)` para a thread principal, agrupando os itens.
+
+        Itens seguidos publicados para o mesmo handler chegam numa única chamada,
+        em ordem, sem sair da ordem dos demais eventos.
+
+        Args:
+            handler (callable): Função que recebe a lista de itens
+            item: Item acrescentado à lista
+        """
+        with self._lock:
+            self._events.append((handler, item, True))
+
+    def start(self):
+        """Inicia o ciclo de atualização da interface."""
+        if self._scheduled is None:
+            self._scheduled = self.master.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        if self._scheduled is not None:
+            self.master.after_cancel(self._scheduled)
+            self._scheduled = None
+
+    def _drain(self):
+        with self._lock:
+            events, self._events = self._events, collections.deque()
+            latest, self._latest = self._latest, {}
+
+        # Eventos em ordem primeiro (ex: logs), depois o último valor de cada chave
+        batch_handler, batch = None, []
+        for handler, args, batched in events:
+            if batch and (not batched or handler != batch_handler):
+                self._apply(batch_handler, (batch,))
+                batch = []
+            if batched:
+                batch_handler = handler
+                batch.append(args)
+            else:
+                self._apply(handler, args)
+        if batch:
+            self._apply(batch_handler, (batch,))
+        for handler, args in latest.values():
+            self._apply(handler, args)
+
+        self._scheduled = self.master.after(self.interval_ms, self._drain)
+
+    def _apply(self, handler, args):
+        try:
+            with profiling.span("interface"):
+                handler(*args)
+        except Exception as e:
+            print(f"Erro ao atualizar a interface: {e}")
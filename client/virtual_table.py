@@ -0,0 +1,132 @@
+# virtual_table.py
+import numpy as np
+import ttkbootstrap as ttk
+
+# Linhas extras criadas além das visíveis
+DEFAULT_BUFFER_ROWS = 5
+
+# Altura aproximada (em pixels) de uma linha e do cabeçalho do Treeview
+DEFAULT_ROW_HEIGHT = 20
+HEADING_HEIGHT = 25
+
+
+class VirtualTable:
+    """Tabela virtualizada sobre um ttk.Treeview.
+
+    Só existem itens no Treeview para as linhas visíveis mais uma pequena
+    margem; ao rolar, os mesmos itens recebem os valores da nova janela de
+    dados. Abrir uma tabela com centenas de milhares de linhas custa o mesmo
+    que abrir uma com dezenas.
+    """
+
+    def __init__(self, parent, columns, data, buffer_rows=DEFAULT_BUFFER_ROWS, **tree_options):
+        """
+        Args:
+            parent: Widget pai
+            columns (list): Pares (título exibido, coluna do DataFrame)
+            data (pandas.DataFrame): Dados da tabela
+            buffer_rows (int): Linhas extras criadas além das visíveis
+            tree_options: Opções repassadas ao ttk.Treeview (ex: bootstyle)
+        """
+        self.frame = ttk.Frame(parent)
+        self.buffer_rows = buffer_rows
+        self.headings = [heading for heading, _ in columns]
+        self._column_data = [data[name].to_numpy(dtype=object) for _, name in columns]
+        self._view = np.arange(len(data))
+        self._offset = 0
+        self._visible = 1
+        self._items = []
+
+        self.tree = ttk.Treeview(self.frame, columns=self.headings, show="headings", **tree_options)
+        for heading in self.headings:
+            self.tree.heading(heading, text=heading)
+            self.tree.column(heading, width=100)
+
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        style_height = ttk.Style().lookup("Treeview", "rowheight")
+        self.row_height = int(style_height) if style_height else DEFAULT_ROW_HEIGHT
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_to(self._offset - 3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_to(self._offset + 3))
+
+        self._ensure_items(self._visible + self.buffer_rows)
+        self._refresh()
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    @property
+    def row_count(self):
+        """Quantidade de linhas exibidas com o filtro atual."""
+        return len(self._view)
+
+    def set_view(self, positions):
+        """
+        Define quais linhas dos dados são exibidas (ex: resultado de um filtro).
+
+        Args:
+            positions (numpy.ndarray): Posições das linhas nos dados, ou None para todas
+        """
+        if positions is None:
+            positions = np.arange(len(self._column_data[0]) if self._column_data else 0)
+        self._view = positions
+        self._offset = 0
+        self._refresh()
+
+    def _ensure_items(self, count):
+        while len(self._items) < count:
+            self._items.append(self.tree.insert("", "end", values=("",) * len(self.headings)))
+        while len(self._items) > count:
+            self.tree.delete(self._items.pop())
+
+    def _row_values(self, position):
+        values = []
+        for column in self._column_data:
+            value = column[position]
+            values.append("" if value is None or value != value else value)  # None ou NaN
+        return values
+
+    def _refresh(self):
+        total = len(self._view)
+        for i, item in enumerate(self._items):
+            pos = self._offset + i
+            values = self._row_values(self._view[pos]) if pos < total else ("",) * len(self.headings)
+            self.tree.item(item, values=values)
+        self.tree.yview_moveto(0)
+
+        if total:
+            self.scrollbar.set(self._offset / total, min(self._offset + self._visible, total) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _scroll_to(self, offset):
+        max_offset = max(len(self._view) - self._visible, 0)
+        offset = min(max(int(offset), 0), max_offset)
+        if offset != self._offset:
+            self._offset = offset
+            self._refresh()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(float(amount) * len(self._view))
+        elif action == "scroll":
+            step = self._visible if unit == "pages" else 1
+            self._scroll_to(self._offset + int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        # O delta varia entre plataformas; só o sentido importa
+        return self._scroll_to(self._offset + (-3 if event.delta > 0 else 3))
+
+    def _on_resize(self, event):
+        visible = max(1, (event.height - HEADING_HEIGHT) // self.row_height)
+        if visible != self._visible:
+            self._visible = visible
+            self._ensure_items(visible + self.buffer_rows)
+            self._scroll_to(self._offset)
+            self._refresh()
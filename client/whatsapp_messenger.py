@@ -5,21 +5,38 @@ import tkinter.messagebox as messagebox
 import tkinter.scrolledtext as scrolledtext
 # Em vez de: from tkinter import filedialog, messagebox, scrolledtext
 
-import pandas as pd
-import time
 import datetime
 import threading
 import os
 import requests
 import json
-import random
 import csv
 import qrcode_handler  # Nosso novo módulo para lidar com QR codes
+from api_transport import ApiTransport, get_server_port, ALTERNATIVE_PORTS
+from health_monitor import HealthMonitor, HealthStatus
+from event_stream import EventStream
+from log_writer import BufferedLogWriter
+from ui_bus import UiEventBus
+from log_view import RingLogView
+from campaign_journal import CampaignJournal
+import metrics
+import profiling
 
 # Importar ttkbootstrap para estilo moderno (necessário instalar: pip install ttkbootstrap)
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 
+# Para a janela abrir rápido, os módulos que carregam pandas/numpy (contact_loader,
+# phone_numbers, suppression, virtual_table) e aiohttp (send_engine) são importados
+# só no primeiro uso, dentro dos métodos; o qrcode_handler faz o mesmo com Pillow/qrcode.
+
+def format_latency(latency):
+    """Formata os percentis de latência (em segundos) de um tipo de envio."""
+    if not latency["count"]:
+        return "-"
+    return " / ".join(f"{latency[p]:.2f}s" for p in ("p50", "p95", "p99"))
+
+
 def is_running_as_imported_module():
     """Verifica se o script está sendo executado como um módulo importado."""
     return __name__ != "__main__"
@@ -27,23 +44,10 @@ def is_running_as_imported_module():
 # Nome do arquivo de log
 LOG_FILE = "log.txt"
 
-# Função para obter a porta do servidor (nova função)
-def get_server_port():
-    """Obtém a porta do servidor a partir do arquivo server_port.txt ou usa a porta padrão."""
-    port_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server", "server_port.txt")
-    
-    try:
-        if os.path.exists(port_file):
-            with open(port_file, 'r') as f:
-                return int(f.read().strip())
-    except Exception as e:
-        print(f"Erro ao ler porta do servidor: {e}")
-    
-    # Retorna a porta padrão se não conseguir ler o arquivo
-    return 3000
-
-# Portas alternativas para tentar se a principal falhar
-ALTERNATIVE_PORTS = [3000, 3001, 3002, 3003, 3004, 3005]
+# Com esta variável definida, a aplicação imprime STARTUP_PROBE_MARKER assim que a
+# primeira janela é desenhada e fecha em seguida (mede o tempo de inicialização)
+STARTUP_PROBE_ENV = "WPP_STARTUP_PROBE"
+STARTUP_PROBE_MARKER = "WPP_STARTUP_READY"
 
 # URL base da API (ajuste conforme necessário)
 server_port = get_server_port()
@@ -54,6 +58,17 @@ class WhatsAppMessengerGUI:
         self.master = master
         master.title("WhatsApp Messenger Pro")
         master.geometry("800x800")
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Destino único do arquivo de log, gravado em segundo plano
+        self.log_writer = BufferedLogWriter(LOG_FILE)
+        
+        # Atualizações da interface vindas de threads de trabalho
+        self.ui_bus = UiEventBus(master)
+        self.ui_bus.start()
+        
+        # Endpoint/arquivo de métricas, se configurados (WPP_METRICS_PORT, WPP_METRICS_TEXTFILE)
+        self.metrics_exporters = metrics.start_from_env()
         
         # Configurar o estilo geral
         self.style = ttk.Style()
@@ -178,6 +193,9 @@ class WhatsAppMessengerGUI:
                                                wrap="word")
         self.mini_log.pack(fill=tk.X, expand=True, pady=5)
         
+        # Buffer circular de linhas com as tags de nível configuradas uma única vez
+        self.log_view = RingLogView(self.mini_log)
+        
         # Separador
         ttk.Separator(scrollable_frame, orient="horizontal").pack(fill=tk.X, padx=20, pady=10)
         
@@ -268,11 +286,57 @@ class WhatsAppMessengerGUI:
         ttk.Spinbox(settings_grid, from_=1, to=5, textvariable=self.retry_var, 
                    width=5).grid(row=1, column=1, padx=5, pady=8)
         
+        # Envios simultâneos (janela de requisições em andamento)
+        ttk.Label(settings_grid, text="Envios simultâneos:", 
+                 font=("Helvetica", 10)).grid(row=2, column=0, sticky="w", padx=5, pady=8)
+        self.concurrency_var = tk.IntVar(value=1)
+        ttk.Spinbox(settings_grid, from_=1, to=10, textvariable=self.concurrency_var, 
+                   width=5).grid(row=2, column=1, padx=5, pady=8)
+        
+        # Contatos por requisição (envio em lote com resultados em fluxo)
+        ttk.Label(settings_grid, text="Contatos por requisição (lote):", 
+                 font=("Helvetica", 10)).grid(row=3, column=0, sticky="w", padx=5, pady=8)
+        self.batch_size_var = tk.IntVar(value=1)
+        ttk.Spinbox(settings_grid, from_=1, to=100, textvariable=self.batch_size_var, 
+                   width=5).grid(row=3, column=1, padx=5, pady=8)
+        
+        # Contatos enfileirados no servidor antes de o envio anterior terminar (0 desativa)
+        ttk.Label(settings_grid, text="Envios antecipados na fila do servidor:", 
+                 font=("Helvetica", 10)).grid(row=4, column=0, sticky="w", padx=5, pady=8)
+        self.submit_ahead_var = tk.IntVar(value=0)
+        ttk.Spinbox(settings_grid, from_=0, to=200, textvariable=self.submit_ahead_var, 
+                   width=5).grid(row=4, column=1, padx=5, pady=8)
+        
+        # Ignorar números que já receberam mensagem recentemente (0 desativa)
+        ttk.Label(settings_grid, text="Ignorar contatados nos últimos (dias):", 
+                 font=("Helvetica", 10)).grid(row=5, column=0, sticky="w", padx=5, pady=8)
+        self.skip_days_var = tk.IntVar(value=0)
+        ttk.Spinbox(settings_grid, from_=0, to=365, textvariable=self.skip_days_var, 
+                   width=5).grid(row=5, column=1, padx=5, pady=8)
+        
         # Opção de variação de tempo
         self.random_interval_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(settings_grid, text="Adicionar variação aleatória ao intervalo (1-3s)", 
                        variable=self.random_interval_var, 
-                       bootstyle="round-toggle").grid(row=2, column=0, columnspan=2, 
+                       bootstyle="round-toggle").grid(row=6, column=0, columnspan=2, 
+                                                    sticky="w", padx=5, pady=8)
+        
+        # Ritmo adaptativo: o intervalo configurado passa a ser o limite de velocidade
+        self.adaptive_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(settings_grid, text="Ritmo adaptativo (acelera até o intervalo configurado)", 
+                       variable=self.adaptive_var, 
+                       bootstyle="round-toggle").grid(row=7, column=0, columnspan=2, 
+                                                    sticky="w", padx=5, pady=8)
+        
+        # Números que pediram para não receber mensagens
+        ttk.Button(settings_grid, text="Importar descadastros", command=self.import_opt_outs, 
+                  bootstyle=SECONDARY).grid(row=8, column=0, columnspan=2, sticky="w", padx=5, pady=8)
+        
+        # Modo de perfil (também ativado pela variável de ambiente WPP_PROFILE)
+        self.profile_var = tk.BooleanVar(value=profiling.PROFILER.enabled)
+        ttk.Checkbutton(settings_grid, text="Modo de perfil (relatório de desempenho ao final do envio)", 
+                       variable=self.profile_var, command=self.toggle_profiling, 
+                       bootstyle="round-toggle").grid(row=9, column=0, columnspan=2, 
                                                     sticky="w", padx=5, pady=8)
 
         # Cartão para controles de envio
@@ -302,6 +366,11 @@ class WhatsAppMessengerGUI:
         self.estimated_var = tk.StringVar(value="00:00:00")
         ttk.Label(progress_info, text="Tempo Estimado:").pack(side=tk.RIGHT, padx=(0,5))
         ttk.Label(progress_info, textvariable=self.estimated_var).pack(side=tk.RIGHT)
+        
+        # Ritmo atual e o motivo do último ajuste
+        self.rate_var = tk.StringVar(value="")
+        ttk.Label(progress_frame, textvariable=self.rate_var, 
+                 font=("Helvetica", 9)).pack(anchor=tk.W, pady=(5,0))
 
         # Status detalhado
         status_detail = ttk.Frame(controls_card)
@@ -322,7 +391,7 @@ class WhatsAppMessengerGUI:
         # Frame para estatísticas (inicialmente oculto)
         self.stats_frame = ttk.LabelFrame(scrollable_frame, text="Estatísticas de Envio", 
                                         padding=15, bootstyle="info")
-        # Inicialmente oculto, só será exibido após a conclusão do envio
+        # Inicialmente oculto, só será exibido quando o envio começar
         
         # Grid para exibir estatísticas
         stats_grid = ttk.Frame(self.stats_frame)
@@ -356,6 +425,31 @@ class WhatsAppMessengerGUI:
         ttk.Label(stats_grid, textvariable=self.success_rate_var, 
                  font=("Helvetica", 10, "bold")).grid(row=3, column=1, sticky="w", padx=5, pady=5)
         
+        # Vazão recente (média móvel) e latências por tipo de envio
+        ttk.Label(stats_grid, text="Vazão atual:", 
+                 font=("Helvetica", 10)).grid(row=4, column=0, sticky="w", padx=5, pady=5)
+        self.throughput_var = tk.StringVar(value="-")
+        ttk.Label(stats_grid, textvariable=self.throughput_var, 
+                 font=("Helvetica", 10, "bold")).grid(row=4, column=1, sticky="w", padx=5, pady=5)
+        
+        ttk.Label(stats_grid, text="Latência texto (p50/p95/p99):", 
+                 font=("Helvetica", 10)).grid(row=5, column=0, sticky="w", padx=5, pady=5)
+        self.text_latency_var = tk.StringVar(value="-")
+        ttk.Label(stats_grid, textvariable=self.text_latency_var, 
+                 font=("Helvetica", 10, "bold")).grid(row=5, column=1, sticky="w", padx=5, pady=5)
+        
+        ttk.Label(stats_grid, text="Latência arquivos (p50/p95/p99):", 
+                 font=("Helvetica", 10)).grid(row=6, column=0, sticky="w", padx=5, pady=5)
+        self.file_latency_var = tk.StringVar(value="-")
+        ttk.Label(stats_grid, textvariable=self.file_latency_var, 
+                 font=("Helvetica", 10, "bold")).grid(row=6, column=1, sticky="w", padx=5, pady=5)
+        
+        ttk.Label(stats_grid, text="Erros (1 min / 5 min):", 
+                 font=("Helvetica", 10)).grid(row=7, column=0, sticky="w", padx=5, pady=5)
+        self.error_rate_var = tk.StringVar(value="-")
+        ttk.Label(stats_grid, textvariable=self.error_rate_var, 
+                 font=("Helvetica", 10, "bold")).grid(row=7, column=1, sticky="w", padx=5, pady=5)
+        
         # Botões para exportar falhas e ver detalhes
         stats_buttons = ttk.Frame(self.stats_frame)
         stats_buttons.pack(fill=tk.X, pady=10)
@@ -378,18 +472,48 @@ class WhatsAppMessengerGUI:
         
         # Inicializar variáveis
         self.contacts = []
+        self.contacts_file = None
         self.successful_numbers = []
         self.failed_numbers = []
         self.error_messages = {}
         self.running = False
+        self._preparing_send = False
+        self.engine = None
+        # Base de números já contatados e descadastrados, compartilhada entre campanhas
+        # (aberta no primeiro uso; ver a propriedade suppression)
+        self._suppression = None
         self.current_port = get_server_port()
         
+        # Transporte HTTP compartilhado (conexões keep-alive reutilizadas)
+        self.transport = ApiTransport(API_BASE_URL)
+        
         # Adiciona o primeiro log
         self.add_log("Sistema iniciado. Aguardando ações do usuário.")
         self.add_log(f"Usando porta do servidor: {self.current_port}")
         
-        # Verificação automática da conexão
-        self.check_connection_periodic()
+        # Verificação automática da conexão, em segundo plano
+        self.health_status = None
+        self.health_monitor = HealthMonitor(
+            lambda status: self.ui_bus.publish(self.on_health_status, status, key="health"),
+            port=self.current_port
+        )
+        self.health_monitor.start()
+        
+        # Eventos do servidor (QR code, autenticação, desconexão) em tempo real;
+        # enquanto o fluxo estiver conectado, as verificações periódicas ficam suspensas
+        self.event_stream = EventStream(
+            lambda event, data: self.ui_bus.publish(self.on_server_event, event, data),
+            lambda connected: self.ui_bus.publish(self.on_event_stream_connection, connected, key="event_stream")
+        )
+        self.event_stream.start()
+
+        if os.environ.get(STARTUP_PROBE_ENV):
+            master.after_idle(self.startup_probe)
+
+    def startup_probe(self):
+        """Avisa que a primeira janela foi desenhada e fecha (usado por benchmarks/startup_benchmark.py)."""
+        print(STARTUP_PROBE_MARKER, flush=True)
+        self.on_close()
 
     def on_window_resize(self, event=None):
         """Ajusta componentes quando a janela é redimensionada"""
@@ -407,48 +531,24 @@ class WhatsAppMessengerGUI:
 
     def add_log(self, message, level="INFO"):
         """Adiciona uma mensagem ao mini log na interface"""
-        # Define cores com base no nível de log
-        color_map = {
-            "INFO": "#000000",    # Preto
-            "SUCCESS": "#28a745", # Verde
-            "WARNING": "#ffc107", # Amarelo
-            "ERROR": "#dc3545"    # Vermelho
-        }
-        color = color_map.get(level, "#000000")
-        
         # Formata a mensagem com timestamp
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] [{level}] {message}\n"
-        
-        # Habilita a edição do widget de log
-        self.mini_log.configure(state="normal")
-        
-        # Insere a mensagem com a cor apropriada
-        self.mini_log.insert(tk.END, formatted_message)
-        # Tentativa de configurar cor - pode não funcionar em todas as versões
-        try:
-            tag_name = f"tag_{timestamp.replace(':', '')}"
-            self.mini_log.tag_add(tag_name, "end-1l", "end")
-            self.mini_log.tag_config(tag_name, foreground=color)
-        except Exception:
-            # Se não conseguir configurar a cor, apenas insere o texto
-            pass
-        
-        # Rola para o final para mostrar a mensagem mais recente
-        self.mini_log.see(tk.END)
+        self.log_view.append(f"[{timestamp}] [{level}] {message}", level)
         
-        # Desabilita a edição para evitar alterações pelo usuário
-        self.mini_log.configure(state="disabled")
-        
-        # Também registra a mensagem no log do sistema se for algo importante
-        if level in ["ERROR", "WARNING"]:
+        # O mini log guarda só as linhas recentes; o histórico completo vai para o arquivo
+        self.log_to_file(message, level)
+
+    def add_logs(self, entries):
+        """Adiciona ao mini log as mensagens (mensagem, nível) acumuladas pelas threads de trabalho."""
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        # Uma única inserção no widget por ciclo de atualização da interface
+        self.log_view.extend([(f"[{timestamp}] [{level}] {message}", level) for message, level in entries])
+        for message, level in entries:
             self.log_to_file(message, level)
 
     def log_to_file(self, message, level):
         """Registra uma mensagem no arquivo de log"""
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"{timestamp} - {level}: {message}\n")
+        self.log_writer.write(level, message)
 
     # Novo método para mudar a porta do servidor
     def change_server_port(self):
@@ -465,11 +565,13 @@ class WhatsAppMessengerGUI:
             global API_BASE_URL
             self.current_port = port
             API_BASE_URL = f"http://localhost:{port}/api"
+            self.transport.base_url = API_BASE_URL
             self.port_label.config(text=f"Porta: {port}")
             self.add_log(f"Porta alterada para: {port}")
             port_dialog.destroy()
             # Testa a conexão com a nova porta
-            self.check_connection()
+            self.add_log("Verificando conexão com o servidor...")
+            self.health_monitor.set_port(port)
         
         ttk.Label(port_dialog, text="Selecione a porta do servidor:", 
                  font=("Helvetica", 11, "bold")).pack(pady=10)
@@ -489,78 +591,81 @@ class WhatsAppMessengerGUI:
                   command=port_dialog.destroy, 
                   bootstyle=SECONDARY).pack(pady=10)
 
-    # Modificação no método check_connection_periodic para usar o novo sistema
-    def check_connection_periodic(self):
-        """Verifica periodicamente a conexão com o servidor."""
-        try:
-            self.check_connection()
-        except Exception as e:
-            self.add_log(f"Erro ao verificar conexão periódica: {str(e)}", "ERROR")
-        
-        # Agenda a próxima verificação em 30 segundos
-        self.master.after(30000, self.check_connection_periodic)
-
-    # Modificação no método check_connection para tentar portas alternativas
     def check_connection(self):
-        """Verifica a conexão com o servidor API."""
-        global API_BASE_URL
+        """Solicita uma verificação imediata da conexão (o resultado chega em on_health_status)."""
         self.add_log("Verificando conexão com o servidor...")
+        self.health_monitor.check_now()
+
+    def on_health_status(self, status):
+        """Aplica na interface o resultado do monitor de conexão (executa na thread principal)."""
+        global API_BASE_URL
+        # Verificações periódicas sem mudança de estado não repetem o log
+        report = status.reason != "periódica" or not status.same_state(self.health_status)
+        self.health_status = status
+        
+        if not status.online:
+            self.status_text.set("Erro: Servidor não encontrado")
+            self.status_indicator.config(foreground="#dc3545")  # Vermelho
+            if report:
+                self.add_log("Servidor não encontrado em nenhuma porta. Verifique se o servidor está rodando.", "ERROR")
+            return
         
-        # Tenta com a porta atual primeiro
-        if self.try_connection(self.current_port):
-            return True
-        
-        # Se falhar, tenta outras portas
-        self.add_log("Conexão falhou na porta atual. Tentando portas alternativas...", "WARNING")
-        
-        for port in ALTERNATIVE_PORTS:
-            if port != self.current_port:
-                if self.try_connection(port):
-                    # Atualiza a porta atual
-                    self.current_port = port
-                    API_BASE_URL = f"http://localhost:{port}/api"
-                    self.port_label.config(text=f"Porta: {port}")
-                    return True
-        
-        # Se todas as tentativas falharem
-        self.status_text.set(f"Erro: Servidor não encontrado")
-        self.status_indicator.config(foreground="#dc3545")  # Vermelho
-        self.add_log("Servidor não encontrado em nenhuma porta. Verifique se o servidor está rodando.", "ERROR")
-        return False
-    
-    # Novo método para tentar conexão em uma porta específica
-    def try_connection(self, port):
-        """Tenta conectar ao servidor em uma porta específica."""
-        try:
-            temp_url = f"http://localhost:{port}/api/status"
-            self.add_log(f"Tentando conectar na porta {port}...")
-            
-            response = requests.get(temp_url, timeout=2)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get('ready', False):
-                    self.status_text.set("Conectado e Pronto")
-                    self.status_indicator.config(foreground="#28a745")  # Verde
-                    self.add_log(f"Servidor conectado na porta {port} e autenticado com WhatsApp.", "SUCCESS")
-                    # Esconde o QR code se já estiver conectado
-                    self.qr_frame.pack_forget()
-                    return True
-                else:
-                    self.status_text.set("Aguardando Autenticação")
-                    self.status_indicator.config(foreground="#ffc107")  # Amarelo
-                    self.add_log(f"Servidor está online na porta {port}, mas aguardando autenticação no WhatsApp.", "WARNING")
-                    # Mostra o frame QR Code apenas se não estiver pronto
-                    if not self.qr_frame.winfo_ismapped():
-                        self.qr_frame.pack(fill=tk.X, padx=20, pady=5, after=self.log_frame)
-                    self.master.after(500, self.get_qr_code)  # Pequeno atraso para permitir renderização da UI
-                    return True
-            
-            return False
-        
-        except requests.RequestException:
-            return False
+        if status.port != self.current_port:
+            # O servidor foi encontrado em outra porta
+            self.current_port = status.port
+            API_BASE_URL = f"http://localhost:{status.port}/api"
+            self.transport.base_url = API_BASE_URL
+            self.port_label.config(text=f"Porta: {status.port}")
+            self.add_log(f"Servidor encontrado na porta {status.port}", "WARNING")
+        # Assina os eventos do servidor encontrado (sem efeito se já estiver conectado)
+        self.event_stream.set_base_url(API_BASE_URL)
+        
+        if status.ready:
+            self.status_text.set("Conectado e Pronto")
+            self.status_indicator.config(foreground="#28a745")  # Verde
+            if report:
+                self.add_log(f"Servidor conectado na porta {status.port} e autenticado com WhatsApp.", "SUCCESS")
+            # Esconde o QR code se já estiver conectado
+            self.qr_frame.pack_forget()
+        else:
+            self.status_text.set("Aguardando Autenticação")
+            self.status_indicator.config(foreground="#ffc107")  # Amarelo
+            if report:
+                self.add_log(f"Servidor está online na porta {status.port}, mas aguardando autenticação no WhatsApp.", "WARNING")
+            # Mostra o frame QR Code apenas se não estiver pronto
+            if not self.qr_frame.winfo_ismapped():
+                self.qr_frame.pack(fill=tk.X, padx=20, pady=5, after=self.log_frame)
+            # Com o fluxo de eventos conectado, o QR code chega sozinho
+            if not self.event_stream.connected:
+                self.master.after(500, self.get_qr_code)  # Pequeno atraso para permitir renderização da UI
+
+    def on_event_stream_connection(self, connected):
+        """Alterna entre eventos do servidor e verificações periódicas (thread principal)."""
+        if connected:
+            self.health_monitor.pause()
+            self.add_log("Recebendo eventos do servidor em tempo real.")
+        else:
+            # Sem eventos, volta a verificar a conexão periodicamente
+            self.health_monitor.resume("eventos desconectados")
+
+    def on_server_event(self, event, data):
+        """Trata um evento publicado pelo servidor em /api/events (thread principal)."""
+        if event == "status":
+            self.on_health_status(HealthStatus(self.current_port, online=True,
+                                               ready=bool(data.get("ready")), reason="eventos"))
+        elif event == "qr":
+            if not self.qr_frame.winfo_ismapped():
+                self.qr_frame.pack(fill=tk.X, padx=20, pady=5, after=self.log_frame)
+            self.show_qr_code(data.get("qr"))
+        elif event == "authenticated":
+            self.add_log("QR Code lido. Autenticando no WhatsApp...", "SUCCESS")
+        elif event == "ready":
+            self.on_health_status(HealthStatus(self.current_port, online=True, ready=True, reason="eventos"))
+        elif event == "disconnected":
+            self.on_health_status(HealthStatus(self.current_port, online=True, ready=False, reason="eventos"))
+            self.add_log(f"WhatsApp desconectado: {data.get('reason', 'motivo desconhecido')}", "WARNING")
+        elif event == "change_state":
+            self.add_log(f"Estado do WhatsApp: {data.get('state')}")
 
     def reset_whatsapp_session(self):
         """Reinicia a sessão do WhatsApp para gerar um novo QR code."""
@@ -572,7 +677,7 @@ class WhatsAppMessengerGUI:
                 self.add_log("Solicitando reinicialização da sessão do WhatsApp...")
                 
                 # Tenta fazer uma chamada à API para reiniciar a sessão
-                response = requests.post(f"{API_BASE_URL}/reset-session", timeout=10)
+                response = self.transport.post("reset-session")
                 
                 if response.status_code == 200:
                     self.add_log("Sessão do WhatsApp reiniciada com sucesso.", "SUCCESS")
@@ -583,8 +688,9 @@ class WhatsAppMessengerGUI:
                     if not self.qr_frame.winfo_ismapped():
                         self.qr_frame.pack(fill=tk.X, padx=20, pady=5, after=self.log_frame)
                     
-                    # Aguarda um momento e solicita o novo QR code
-                    self.master.after(2000, self.get_qr_code)
+                    # O novo QR code chega pelo fluxo de eventos; sem ele, consulta após um momento
+                    if not self.event_stream.connected:
+                        self.master.after(2000, self.get_qr_code)
                 else:
                     error_msg = response.json().get('error', 'Erro desconhecido')
                     self.add_log(f"Erro ao reiniciar sessão: {error_msg}", "ERROR")
@@ -598,19 +704,21 @@ class WhatsAppMessengerGUI:
         self.add_log("Solicitando geração de novo QR code...")
         
         try:
-            response = requests.post(f"{API_BASE_URL}/request-new-qrcode", timeout=10)
+            response = self.transport.post("request-new-qrcode")
             
             if response.status_code == 200:
                 self.add_log("Solicitação de novo QR code enviada com sucesso.", "SUCCESS")
-                self.add_log("Aguardando 5 segundos para geração do QR code...")
                 
                 # Atualiza a interface
                 self.qr_text.delete('1.0', tk.END)
                 self.qr_text.insert(tk.END, "Gerando novo QR code, aguarde...")
-                self.qr_image_label.config(image='')  # Limpa a imagem
+                qrcode_handler.clear_qr_display(self.qr_image_label)
                 
-                # Aguarda 5 segundos e tenta obter o QR code
-                self.master.after(5000, self.get_qr_code)
+                # O QR code chega pelo fluxo de eventos assim que for gerado;
+                # sem ele, aguarda 5 segundos e consulta o servidor
+                if not self.event_stream.connected:
+                    self.add_log("Aguardando 5 segundos para geração do QR code...")
+                    self.master.after(5000, self.get_qr_code)
             else:
                 error_msg = response.json().get('error', 'Erro desconhecido')
                 self.add_log(f"Erro ao solicitar novo QR code: {error_msg}", "ERROR")
@@ -624,40 +732,34 @@ class WhatsAppMessengerGUI:
         self.add_log("Solicitando QR Code para autenticação...")
         
         try:
-            response = requests.get(f"{API_BASE_URL}/qrcode", timeout=10)
+            response = self.transport.get("qrcode")
             
             if response.status_code == 200:
                 data = response.json()
                 qr_code_text = data.get('qrCodeText')
                 
                 if qr_code_text:
-                    # 1. Atualiza o texto do QR code na área de texto
-                    self.qr_text.delete('1.0', tk.END)
-                    self.qr_text.insert(tk.END, "QR Code disponível abaixo como imagem")
-                    
-                    # 2. Gera e exibe a imagem do QR code
-                    qrcode_handler.update_qr_display(qr_code_text, self.qr_image_label)
-                    
-                    self.add_log("QR Code recebido e exibido. Escaneie-o com seu WhatsApp.", "SUCCESS")
+                    self.show_qr_code(qr_code_text)
                 else:
                     self.qr_text.delete('1.0', tk.END)
                     self.qr_text.insert(tk.END, "QR Code não disponível")
-                    self.qr_image_label.config(image='')  # Limpa a imagem
+                    qrcode_handler.clear_qr_display(self.qr_image_label)
                     self.add_log("QR Code não disponível no momento.", "WARNING")
             elif response.status_code == 202:
                 # O servidor está reiniciando a sessão
                 message = response.json().get('message', 'Reiniciando sessão...')
                 self.qr_text.delete('1.0', tk.END)
                 self.qr_text.insert(tk.END, message)
-                self.qr_image_label.config(image='')  # Limpa a imagem
+                qrcode_handler.clear_qr_display(self.qr_image_label)
                 self.add_log(message, "WARNING")
                 
-                # Tenta novamente após 5 segundos
-                self.master.after(5000, self.get_qr_code)
+                # Tenta novamente após 5 segundos, se o QR code não vier pelo fluxo de eventos
+                if not self.event_stream.connected:
+                    self.master.after(5000, self.get_qr_code)
             elif response.status_code == 404:
                 self.qr_text.delete('1.0', tk.END)
                 self.qr_text.insert(tk.END, "Erro 404: QR Code não encontrado. Tente solicitar um novo QR code.")
-                self.qr_image_label.config(image='')  # Limpa a imagem
+                qrcode_handler.clear_qr_display(self.qr_image_label)
                 self.add_log("Erro 404: QR Code não encontrado.", "ERROR")
                 
                 # Adiciona botão para solicitar novo QR code
@@ -672,49 +774,88 @@ class WhatsAppMessengerGUI:
             else:
                 self.qr_text.delete('1.0', tk.END)
                 self.qr_text.insert(tk.END, f"Erro ao obter QR Code: Código {response.status_code}")
-                self.qr_image_label.config(image='')  # Limpa a imagem
+                qrcode_handler.clear_qr_display(self.qr_image_label)
                 self.add_log(f"Erro ao obter QR Code: Código {response.status_code}", "ERROR")
         except Exception as e:
             self.qr_text.delete('1.0', tk.END)
             self.qr_text.insert(tk.END, f"Erro: {str(e)}")
-            self.qr_image_label.config(image='')  # Limpa a imagem
+            qrcode_handler.clear_qr_display(self.qr_image_label)
             self.add_log(f"Exceção ao obter QR code: {str(e)}", "ERROR")
             self.log_error(f"Erro ao obter QR code: {e}")
 
+    def show_qr_code(self, qr_code_text):
+        """Exibe o QR code recebido do servidor."""
+        # 1. Atualiza o texto do QR code na área de texto
+        self.qr_text.delete('1.0', tk.END)
+        self.qr_text.insert(tk.END, "QR Code disponível abaixo como imagem")
+        
+        # 2. Gera e exibe a imagem do QR code
+        qrcode_handler.update_qr_display(qr_code_text, self.qr_image_label)
+        
+        self.add_log("QR Code recebido e exibido. Escaneie-o com seu WhatsApp.", "SUCCESS")
+
+    @profiling.profiled()
     def browse_file(self):
         file_path = filedialog.askopenfilename(
             filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx")]
         )
         if file_path:
+            if not file_path.lower().endswith((".csv", ".xlsx")):
+                messagebox.showerror("Erro", "Tipo de arquivo não suportado.")
+                self.add_log("Erro: Tipo de arquivo não suportado.", "ERROR")
+                return
+            
             self.entry_file.delete(0, tk.END)
             self.entry_file.insert(0, file_path)
-            try:
-                self.add_log(f"Carregando arquivo: {os.path.basename(file_path)}")
-                
-                if file_path.lower().endswith(".csv"):
-                    df = pd.read_csv(file_path)
-                elif file_path.lower().endswith(".xlsx"):
-                    df = pd.read_excel(file_path)
-                else:
-                    messagebox.showerror("Erro", "Tipo de arquivo não suportado.")
-                    self.add_log("Erro: Tipo de arquivo não suportado.", "ERROR")
-                    return
-                # Considera que os números estejam na primeira coluna
-                self.contacts = df.iloc[:, 0].dropna().astype(str).tolist()
-                
-                self.add_log(f"{len(self.contacts)} contatos carregados com sucesso.", "SUCCESS")
-                
-                # Pergunta se o usuário deseja analisar os números
-                if messagebox.askyesno("Análise de Números", f"{len(self.contacts)} contatos carregados. Deseja analisar os formatos dos números?"):
-                    self.analyze_phone_numbers()
-                
-                self.progress_var.set(f"0 de {len(self.contacts)}")
-                self.progress_bar["maximum"] = len(self.contacts)
-                self.progress_bar["value"] = 0
-            except Exception as e:
-                messagebox.showerror("Erro", f"Erro ao ler o arquivo: {e}")
-                self.add_log(f"Erro ao ler o arquivo: {str(e)}", "ERROR")
+            self.contacts_file = file_path
+            self.add_log(f"Carregando arquivo: {os.path.basename(file_path)}")
+            self.status_var.set("Carregando contatos...")
+            self.progress_bar["maximum"] = 100
+            self.progress_bar["value"] = 0
+            
+            # A leitura é feita em blocos numa thread para não travar a interface
+            threading.Thread(target=self.load_contacts_file, args=(file_path,), daemon=True).start()
+
+    @profiling.profiled()
+    def load_contacts_file(self, file_path):
+        """Lê o arquivo de contatos em blocos, carregando apenas a coluna de telefones."""
+        def show_progress(fraction):
+            self.progress_bar["value"] = int(fraction * 100)
+            self.status_var.set(f"Carregando contatos... {fraction:.0%}")
+        
+        def on_progress(fraction):
+            self.ui_bus.publish(show_progress, fraction, key="load_progress")
+        
+        try:
+            import contact_loader
+            # Considera que os números estejam na primeira coluna
+            contacts = contact_loader.load_contacts(file_path, on_progress=on_progress)
+        except Exception as e:
+            self.ui_bus.publish(self.on_contacts_load_error, e)
+            return
+        self.ui_bus.publish(self.on_contacts_loaded, contacts)
+
+    def on_contacts_load_error(self, error):
+        self.status_var.set("Pronto")
+        self.progress_bar["value"] = 0
+        messagebox.showerror("Erro", f"Erro ao ler o arquivo: {error}")
+        self.add_log(f"Erro ao ler o arquivo: {str(error)}", "ERROR")
 
+    def on_contacts_loaded(self, contacts):
+        """Finaliza o carregamento dos contatos na thread da interface."""
+        self.contacts = contacts
+        self.status_var.set("Pronto")
+        self.add_log(f"{len(self.contacts)} contatos carregados com sucesso.", "SUCCESS")
+        
+        # Pergunta se o usuário deseja analisar os números
+        if messagebox.askyesno("Análise de Números", f"{len(self.contacts)} contatos carregados. Deseja analisar os formatos dos números?"):
+            self.analyze_phone_numbers()
+        
+        self.progress_var.set(f"0 de {len(self.contacts)}")
+        self.progress_bar["maximum"] = len(self.contacts)
+        self.progress_bar["value"] = 0
+
+    @profiling.profiled()
     def analyze_phone_numbers(self):
         """Analisa os números de telefone carregados e mostra informações de países."""
         if not self.contacts:
@@ -725,24 +866,13 @@ class WhatsAppMessengerGUI:
         try:
             self.add_log("Analisando formatos dos números de telefone...")
             
-            # Envia os números para a API analisar
-            response = requests.post(
-                f"{API_BASE_URL}/analyze-batch",
-                json={"numbers": self.contacts},
-                timeout=10
-            )
-            
-            if response.status_code != 200:
-                messagebox.showerror("Erro", "Falha ao analisar números de telefone.")
-                self.add_log("Erro na análise de números de telefone", "ERROR")
-                return
-                
-            data = response.json()
-            stats = data.get('stats', {})
-            results = data.get('results', [])
+            import phone_numbers
+            from virtual_table import VirtualTable
+            # Analisa os números localmente (mesmas regras do servidor, sem requisição HTTP)
+            results, stats = phone_numbers.analyze_batch(self.contacts)
             
             # Salva os resultados formatados para uso posterior
-            self.contacts = [r.get('formattedNumber') for r in results]
+            self.contacts = results['formattedNumber'].tolist()
             
             # Log estatísticas
             formatted_count = stats.get('formatted', 0)
@@ -782,30 +912,36 @@ class WhatsAppMessengerGUI:
             numbers_frame = ttk.LabelFrame(analysis_window, text="Detalhes dos Números", padding=10, bootstyle=PRIMARY)
             numbers_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
             
-            # Cria uma tabela para mostrar os números
-            cols = ("Número Original", "Número Formatado", "País", "Código")
-            numbers_tree = ttk.Treeview(numbers_frame, columns=cols, show='headings', bootstyle=INFO)
+            # Filtro por país, feito por consulta a índices pré-calculados
+            filter_frame = ttk.Frame(numbers_frame)
+            filter_frame.pack(fill=tk.X, pady=(0, 5))
             
-            # Define as colunas da tabela
-            for col in cols:
-                numbers_tree.heading(col, text=col)
-                numbers_tree.column(col, width=100)
+            country_index = results.groupby('country').indices
+            unrecognized_label = "Não reconhecidos"
+            filters = {"Todos": None, unrecognized_label: country_index.get(phone_numbers.UNKNOWN_COUNTRY, [])}
+            for country in sorted(country_index):
+                if country != phone_numbers.UNKNOWN_COUNTRY:
+                    filters[country] = country_index[country]
             
-            # Adiciona uma scrollbar
-            scrollbar = ttk.Scrollbar(numbers_frame, orient="vertical", command=numbers_tree.yview)
-            numbers_tree.configure(yscrollcommand=scrollbar.set)
-            scrollbar.pack(side="right", fill="y")
-            numbers_tree.pack(side="left", fill="both", expand=True)
+            ttk.Label(filter_frame, text="Filtrar:").pack(side=tk.LEFT, padx=(0, 5))
+            filter_var = tk.StringVar(value="Todos")
+            filter_box = ttk.Combobox(filter_frame, textvariable=filter_var, values=list(filters),
+                                      state="readonly", width=25)
+            filter_box.pack(side=tk.LEFT)
+            count_label = ttk.Label(filter_frame, text=f"Exibindo {len(results)} de {len(results)} números",
+                                    font=("Helvetica", 9), foreground="#888888")
+            count_label.pack(side=tk.RIGHT)
             
-            # Preenche a tabela com os números
-            for result in results:
-                country_info = result.get('countryInfo', {})
-                numbers_tree.insert("", "end", values=(
-                    result.get('original', ''),
-                    result.get('formattedNumber', ''),
-                    country_info.get('country', 'Desconhecido'),
-                    country_info.get('code', '')
-                ))
+            # Tabela virtualizada: só as linhas visíveis existem no Treeview
+            cols = [("Número Original", "original"), ("Número Formatado", "formattedNumber"),
+                    ("País", "country"), ("Código", "code")]
+            numbers_table = VirtualTable(numbers_frame, cols, results, bootstyle=INFO)
+            numbers_table.pack(fill="both", expand=True)
+            
+            def apply_filter(event=None):
+                numbers_table.set_view(filters[filter_var.get()])
+                count_label.config(text=f"Exibindo {numbers_table.row_count} de {len(results)} números")
+            filter_box.bind("<<ComboboxSelected>>", apply_filter)
             
             # Botões de ação
             buttons_frame = ttk.Frame(analysis_window)
@@ -872,6 +1008,8 @@ class WhatsAppMessengerGUI:
         self.add_log(f"{count} arquivos removidos da lista.")
 
     def start_sending(self):
+        if self._preparing_send:
+            return  # O envio anterior ainda está sendo preparado
         if not self.contacts:
             messagebox.showerror("Erro", "Nenhum contato carregado.")
             self.add_log("Erro: Tentativa de envio sem contatos carregados", "ERROR")
@@ -881,7 +1019,7 @@ class WhatsAppMessengerGUI:
         try:
             self.add_log("Verificando estado do servidor antes do envio...")
             
-            response = requests.get(f"{API_BASE_URL}/status", timeout=5)
+            response = self.transport.get("status", timeout=5)
             if response.status_code != 200 or not response.json().get('ready', False):
                 messagebox.showerror("Erro", "Servidor não está pronto. Verifique a conexão e autenticação.")
                 self.add_log("Erro: Servidor não está pronto para envio de mensagens", "ERROR")
@@ -897,39 +1035,152 @@ class WhatsAppMessengerGUI:
             self.add_log("Erro: Tentativa de envio sem mensagem ou anexos", "ERROR")
             return
         
-        self.add_log(f"Iniciando envio para {len(self.contacts)} contatos...", "SUCCESS")
+        # O relatório do modo de perfil cobre só esta campanha, incluindo a preparação
+        profiling.PROFILER.reset()
+        
+        self._preparing_send = True
+        self.status_var.set("Preparando envio...")
+        # A consulta à base de supressão e o hash do diário rodam numa thread:
+        # em listas grandes travariam a interface
+        threading.Thread(target=self.prepare_sending,
+                         args=(msg_text, self.contacts, self.skip_days_var.get(), self.contacts_file,
+                               list(self.files_list)),
+                         daemon=True).start()
+
+    def prepare_sending(self, msg_text, contacts, skip_days, contacts_file, files_list):
+        """Remove descadastrados, contatados recentemente e duplicados e abre o diário da campanha.
+
+        Executa numa thread de trabalho e publica o resultado para on_sending_prepared.
+        A lista filtrada vale só para este envio; self.contacts não é alterada.
+        """
+        stats = None
+        try:
+            contacts, stats = self.suppression.filter(contacts, skip_days)
+        except Exception as e:
+            self.log_from_worker(f"Não foi possível consultar a base de supressão: {e}", "WARNING")
+        
+        # Diário da campanha: permite retomar o envio após uma queda ou interrupção
+        journal = None
+        if contacts:
+            try:
+                journal = CampaignJournal.open(contacts_file, msg_text, files_list, len(contacts),
+                                               contacts=contacts)
+            except (OSError, TypeError) as e:
+                self.log_from_worker(f"Não foi possível abrir o diário da campanha: {e}", "WARNING")
+        self.ui_bus.publish(self.on_sending_prepared, msg_text, contacts, files_list, stats, journal)
+
+    def on_sending_prepared(self, msg_text, contacts, files_list, stats, journal):
+        """Inicia o envio com a lista já filtrada (executa na thread principal).
+
+        Envia os anexos de files_list, a mesma cópia usada na chave do diário: anexos
+        adicionados ou removidos durante a preparação não entram nesta campanha.
+        """
+        self._preparing_send = False
+        if stats:
+            removed = stats["total"] - stats["kept"]
+            if removed:
+                self.add_log(f"{removed} contatos removidos: {stats['opted_out']} descadastrados, "
+                             f"{stats['recent']} contatados recentemente, {stats['duplicates']} duplicados", "WARNING")
+        if not contacts:
+            self.status_var.set("Pronto")
+            messagebox.showinfo("Envio", "Nenhum contato restante após remover descadastrados, "
+                                         "contatados recentemente e duplicados.")
+            return
+        
+        if journal and journal.done_count:
+            resume = messagebox.askyesno(
+                "Retomar Campanha",
+                f"{journal.done_count} de {len(contacts)} contatos desta campanha já foram processados "
+                f"(Sucesso: {journal.successful}, Falhas: {journal.failed}).\n\n"
+                "Deseja continuar de onde parou? Escolha 'Não' para enviar novamente a todos."
+            )
+            if resume:
+                self.add_log(f"Retomando campanha: {journal.done_count} contatos já processados")
+            else:
+                journal.reset()
+                self.add_log("Diário da campanha reiniciado: envio para todos os contatos")
+        
+        self.add_log(f"Iniciando envio para {len(contacts)} contatos...", "SUCCESS")
         if msg_text:
             self.add_log("Tipo de envio: Mensagem de texto")
-        if self.files_list:
-            self.add_log(f"Tipo de envio: {len(self.files_list)} arquivos anexados")
+        if files_list:
+            self.add_log(f"Tipo de envio: {len(files_list)} arquivos anexados")
+        
+        # Limpa os dados anteriores
+        self.successful_numbers = []
+        self.failed_numbers = []
+        self.error_messages = {}
+        self.progress_bar["maximum"] = len(contacts)
+        self.progress_bar["value"] = 0
+        
+        # Converte o intervalo configurado na política de mensagens por minuto
+        interval = max(self.interval_var.get(), 1)
+        concurrency = self.concurrency_var.get()
+        adaptive = self.adaptive_var.get()
+        if adaptive:
+            self.add_log(f"Ritmo adaptativo: até 1 contato a cada {interval}s, até {concurrency} envios simultâneos")
+        else:
+            self.add_log(f"Ritmo: 1 contato a cada {interval}s, até {concurrency} envios simultâneos")
+            self.rate_var.set(f"Ritmo: {60.0 / interval:.1f} contatos/min (fixo)")
+        self.status_var.set(f"Enviando para {len(contacts)} contatos...")
+        
+        from send_engine import SendEngine
+        # O motor chama os callbacks na thread de envio; eles só publicam eventos para a interface
+        self.engine = SendEngine(
+            API_BASE_URL,
+            concurrency=concurrency,
+            rate_per_minute=60.0 / interval,
+            jitter=(1, 3) if self.random_interval_var.get() else (0, 0),
+            max_attempts=self.retry_var.get(),
+            batch_size=self.batch_size_var.get(),
+            submit_ahead=self.submit_ahead_var.get(),
+            journal=journal,
+            adaptive=adaptive,
+            on_log=self.log_from_worker,
+            on_result=self.on_send_result,
+            on_progress=self.on_send_progress,
+            on_rate=self.on_send_rate,
+        )
         
         self.running = True
         self.stop_button["state"] = tk.NORMAL
+        
+        # Mostra as estatísticas durante o envio
+        self.update_statistics()
+        if not self.stats_frame.winfo_ismapped():
+            self.stats_frame.pack(fill=tk.X, padx=20, pady=5, after=self.stop_button)
         # Inicia o envio em uma thread para evitar travar a interface
-        threading.Thread(target=self.send_messages, args=(msg_text,), daemon=True).start()
+        threading.Thread(target=self.send_messages, args=(msg_text, contacts, files_list), daemon=True).start()
 
     def stop_sending(self):
         self.running = False
+        if self.engine:
+            self.engine.stop()
+        self.log_writer.flush()
         self.status_var.set("Parando processo...")
         self.stop_button["state"] = tk.DISABLED
         self.add_log("Interrupção do processo de envio solicitada pelo usuário", "WARNING")
 
     def update_statistics(self):
-        """Atualiza os valores das estatísticas na interface."""
-        total = len(self.contacts)
-        success = len(self.successful_numbers)
-        failures = len(self.failed_numbers)
-        
-        self.total_var.set(str(total))
-        self.success_var.set(str(success))
-        self.failures_var.set(str(failures))
-        
-        # Calcula taxa de sucesso
-        if total > 0:
-            success_rate = (success / (success + failures)) * 100 if success + failures > 0 else 0
-            self.success_rate_var.set(f"{success_rate:.1f}%")
-        else:
-            self.success_rate_var.set("0%")
+        """Atualiza os valores das estatísticas na interface a partir do motor de envio."""
+        if not self.engine:
+            return
+        stats = self.engine.stats.snapshot()
+        
+        self.total_var.set(str(stats["total"] or 0))
+        self.success_var.set(str(stats["successful"]))
+        self.failures_var.set(str(stats["failed"]))
+        
+        success_rate = stats["success_rate"]
+        self.success_rate_var.set(f"{success_rate * 100:.1f}%" if success_rate is not None else "0%")
+        
+        throughput = stats["throughput_per_minute"]
+        self.throughput_var.set(f"{throughput:.1f} contatos/min" if throughput else "-")
+        self.text_latency_var.set(format_latency(stats["latency"]["text"]))
+        self.file_latency_var.set(format_latency(stats["latency"]["file"]))
+        
+        rates = [stats["error_rate_1m"], stats["error_rate_5m"]]
+        self.error_rate_var.set(" / ".join(f"{rate * 100:.0f}%" if rate is not None else "-" for rate in rates))
 
     def show_error_details(self):
         """Exibe uma janela com detalhes dos erros ocorridos durante o envio."""
@@ -999,16 +1250,17 @@ class WhatsAppMessengerGUI:
                 self.add_log("Exportação de falhas cancelada pelo usuário.")
                 return
                 
-            # Cria o DataFrame com os números e erros
+            # Monta as linhas com os números e erros
             data = []
             for number in self.failed_numbers:
                 error_message = self.error_messages.get(number, "Erro desconhecido")
                 data.append({"Número": number, "Erro": error_message})
             
-            df = pd.DataFrame(data)
-            
-            # Salva o DataFrame como CSV
-            df.to_csv(file_path, index=False, encoding='utf-8')
+            # Salva como CSV (sem pandas, que não precisa ser carregado só para isso)
+            with open(file_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=["Número", "Erro"], lineterminator="\n")
+                writer.writeheader()
+                writer.writerows(data)
             
             self.add_log(f"Números com falha exportados para: {os.path.basename(file_path)}", "SUCCESS")
             messagebox.showinfo("Exportar Falhas", f"Arquivo salvo com sucesso em:\n{file_path}")
@@ -1016,180 +1268,177 @@ class WhatsAppMessengerGUI:
             messagebox.showerror("Erro", f"Erro ao exportar falhas: {e}")
             self.add_log(f"Erro ao exportar falhas: {str(e)}", "ERROR")
 
-    def send_messages(self, msg_text):
-        """Envia mensagens para todos os contatos usando a API."""
-        # Limpa os dados anteriores
-        self.successful_numbers = []
-        self.failed_numbers = []
-        self.error_messages = {}
-        
-        total_contacts = len(self.contacts)
-        times = []
-        self.progress_bar["value"] = 0
+    @profiling.profiled()
+    def send_messages(self, msg_text, contacts, files_list):
+        """Envia mensagens para os contatos usando o motor de envio assíncrono.
 
-        for idx, number in enumerate(self.contacts, start=1):
-            if not self.running:
-                self.status_var.set("Envio interrompido")
-                self.add_log("Processo de envio interrompido pelo usuário.", "WARNING")
-                break
-                
-            start_time = time.time()
-            self.status_var.set(f"Enviando para contato {idx}/{total_contacts}...")
-            self.add_log(f"Processando contato {idx}/{total_contacts}: {number}")
-
-            # Tenta enviar a mensagem com número de tentativas configurado
-            success = False
-            attempt = 0
-            max_attempts = self.retry_var.get()
-            last_error = ""
-            
-            while not success and attempt < max_attempts and self.running:
-                attempt += 1
-                if attempt > 1:
-                    self.status_var.set(f"Tentativa {attempt}/{max_attempts} para contato {idx}...")
-                    self.add_log(f"Tentativa {attempt}/{max_attempts} para o número {number}")
-                
-                # Envia a mensagem de texto (se houver)
-                if msg_text:
-                    text_success, text_error = self.send_text_message(number, msg_text)
-                    if not text_success:
-                        last_error = text_error
-                        self.add_log(f"Falha ao enviar texto para {number}: {text_error}", "ERROR")
-                else:
-                    text_success = True  # Se não há mensagem, considera como sucesso
-                
-                # Envia os arquivos (se houver)
-                files_success = True
-                files_error = ""
-                if self.files_list:
-                    for file_path in self.files_list:
-                        filename = os.path.basename(file_path)
-                        self.add_log(f"Enviando arquivo: {filename} para {number}")
-                        file_success, file_error = self.send_file(number, file_path)
-                        if not file_success:
-                            files_success = False
-                            last_error = file_error
-                            self.add_log(f"Falha ao enviar arquivo {filename}: {file_error}", "ERROR")
-                            break
-                
-                success = text_success and files_success
-                
-                if success:
-                    self.add_log(f"Mensagem enviada com sucesso para {number}", "SUCCESS")
-                elif attempt < max_attempts:
-                    # Espera um pouco antes de tentar novamente
-                    self.add_log(f"Aguardando 2s para nova tentativa...", "WARNING")
-                    time.sleep(2)
-            
-            # Registra o resultado
-            if success:
-                self.successful_numbers.append(number)
-                self.log_success(f"Mensagem enviada para: {number}")
+        Executa na thread de envio: não acessa widgets, apenas publica eventos no barramento.
+        """
+        try:
+            with profiling.PROFILER.cprofile():
+                summary = self.engine.run(contacts, msg_text, files_list, total=len(contacts))
+        except Exception as e:
+            self.log_from_worker(f"Erro inesperado durante o envio: {str(e)}", "ERROR")
+            summary = None
+        finally:
+            if self.engine.journal:
+                self.engine.journal.close()
+        self.record_contacted_numbers()
+        self.dump_profile()
+        self.ui_bus.publish(self.on_sending_finished, summary)
+
+    def dump_profile(self):
+        """Grava o relatório do modo de perfil ao final da campanha, se ativo."""
+        try:
+            path = profiling.PROFILER.dump()
+        except OSError as e:
+            self.log_from_worker(f"Não foi possível gravar o relatório de perfil: {e}", "WARNING")
+            return
+        if path:
+            self.log_from_worker(f"Relatório de perfil gravado em {path}")
+            self.log_writer.write("PERFIL", profiling.PROFILER.report())
+
+    def toggle_profiling(self):
+        """Liga ou desliga o modo de perfil pela opção da interface."""
+        if self.profile_var.get():
+            profiling.PROFILER.enable(os.environ.get("WPP_PROFILE") or "1")
+            self.add_log("Modo de perfil ativado: o relatório será gravado ao final do envio")
+        else:
+            profiling.PROFILER.disable()
+
+    def record_contacted_numbers(self):
+        """Registra na base de supressão os números que receberam a mensagem."""
+        journal = self.engine.journal
+        try:
+            # O diário também cobre os envios feitos antes de uma retomada
+            if journal:
+                numbers = [number for _, number, success in journal.iter_results() if success]
             else:
-                self.failed_numbers.append(number)
-                self.error_messages[number] = last_error
-                self.log_error(f"Falha ao enviar para: {number} - Erro: {last_error}")
-
-            # Atualiza estatísticas em tempo real
-            self.update_statistics()
-
-            # Calcula tempo e atualiza a interface
-            elapsed = time.time() - start_time
-            times.append(elapsed)
-            avg_time = sum(times) / len(times)
-            remaining = total_contacts - idx
-            estimated_remaining = avg_time * remaining
+                numbers = self.successful_numbers
+            self.suppression.record_contacted(numbers)
+        except Exception as e:
+            self.log_from_worker(f"Erro ao atualizar a base de supressão: {e}", "WARNING")
+
+    @property
+    def suppression(self):
+        """Base de supressão, aberta (e o pandas carregado) no primeiro uso."""
+        if self._suppression is None:
+            from suppression import SuppressionStore
+            self._suppression = SuppressionStore()
+        return self._suppression
+
+    def import_opt_outs(self):
+        """Marca como descadastrados os números de um arquivo CSV/XLSX."""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx")]
+        )
+        if not file_path:
+            return
+        try:
+            import contact_loader
+            count = self.suppression.opt_out(contact_loader.load_contacts(file_path))
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao importar descadastros: {e}")
+            self.add_log(f"Erro ao importar descadastros: {str(e)}", "ERROR")
+            return
+        self.add_log(f"{count} números marcados como descadastrados.", "SUCCESS")
+        messagebox.showinfo("Descadastros", f"{count} números não receberão mais mensagens.")
+
+    def on_sending_finished(self, summary):
+        """Atualiza a interface ao final do envio (executa na thread principal)."""
+        # Desenha o último progresso e as estatísticas finais
+        self.update_statistics()
+        
+        if summary:
+            # Registra a reutilização das conexões HTTP durante o envio
+            self.add_log(f"Conexões HTTP: {summary['connections_opened']} abertas, "
+                         f"{summary['connections_reused']} reutilizadas; "
+                         f"{summary['upload_bytes'] / 1024:.0f} KB de anexos enviados")
+            latency = summary["stats"]["latency"]
+            self.add_log(f"Latência p50/p95/p99 - texto: {format_latency(latency['text'])}; "
+                         f"arquivos: {format_latency(latency['file'])}")
             
-            # Atualiza a interface com o progresso e tempo estimado
-            self.progress_var.set(f"{idx} de {total_contacts}")
-            self.estimated_var.set(str(datetime.timedelta(seconds=int(estimated_remaining))))
-            self.progress_bar["value"] = idx
-
-            # Determina o tempo de espera entre mensagens
-            interval = self.interval_var.get()
-            if self.random_interval_var.get():
-                random_interval = random.randint(1, 3)
-                interval += random_interval
-                self.add_log(f"Adicionado intervalo aleatório de {random_interval}s")
-                
-            # Aguarda antes de enviar a próxima mensagem
-            if idx < total_contacts:  # Não espera após o último contato
-                self.status_var.set(f"Aguardando {interval}s antes da próxima mensagem...")
-                self.add_log(f"Aguardando {interval}s antes do próximo envio...")
-                for i in range(interval):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+            if summary["skipped"]:
+                self.add_log(f"{summary['skipped']} contatos pulados (já processados em execução anterior)")
+            
+            if summary["interrupted"]:
+                self.status_var.set("Envio interrompido")
+                self.add_log("Processo de envio interrompido pelo usuário.", "WARNING")
         
         # Após finalizar, mostra o frame de estatísticas
         if not self.stats_frame.winfo_ismapped():
             self.stats_frame.pack(fill=tk.X, padx=20, pady=5, after=self.stop_button)
 
-        if self.running:  # Somente mostra mensagem se não foi interrompido
+        if summary is None:  # O motor parou com um erro inesperado (já registrado no log)
+            self.status_var.set("Envio encerrado com erro")
+            self.add_log(f"Envio encerrado por erro. Sucesso: {len(self.successful_numbers)}, Falhas: {len(self.failed_numbers)}", "ERROR")
+        elif self.running:  # Somente mostra mensagem se não foi interrompido
             self.status_var.set("Envio concluído")
             self.add_log(f"Processo concluído. Sucesso: {len(self.successful_numbers)}, Falhas: {len(self.failed_numbers)}", "SUCCESS")
             messagebox.showinfo("Concluído", f"Envio de mensagens concluído.\nSucesso: {len(self.successful_numbers)}\nFalhas: {len(self.failed_numbers)}")
         
         self.running = False
         self.stop_button["state"] = tk.DISABLED
+        
+        # Garante que todo o log da campanha esteja gravado em disco
+        self.log_writer.flush()
 
-    def send_text_message(self, number, message):
-        """Envia uma mensagem de texto para um número usando a API."""
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/send-message",
-                json={"number": number, "message": message},
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                return True, ""
-            else:
-                error_msg = response.json().get('error', 'Erro desconhecido')
-                self.log_error(f"Erro API (texto): {error_msg}")
-                return False, error_msg
-        except Exception as e:
-            error_msg = str(e)
-            self.log_error(f"Exceção ao enviar texto: {error_msg}")
-            return False, error_msg
+    def log_from_worker(self, message, level="INFO"):
+        """Versão de add_log segura para threads de trabalho."""
+        self.ui_bus.publish_batch(self.add_logs, (message, level))
 
-    def send_file(self, number, file_path):
-        """Envia um arquivo para um número usando a API."""
-        try:
-            with open(file_path, 'rb') as file:
-                filename = os.path.basename(file_path)
-                files = {'file': (filename, file)}
-                data = {'number': number}
-                
-                response = requests.post(
-                    f"{API_BASE_URL}/send-file",
-                    data=data,
-                    files=files,
-                    timeout=60  # Timeout maior para upload de arquivos
-                )
-                
-                if response.status_code == 200:
-                    return True, ""
-                else:
-                    error_msg = response.json().get('error', 'Erro desconhecido')
-                    self.log_error(f"Erro API (arquivo): {error_msg}")
-                    return False, error_msg
-        except Exception as e:
-            error_msg = str(e)
-            self.log_error(f"Exceção ao enviar arquivo: {error_msg}")
-            return False, error_msg
+    def on_send_result(self, result):
+        """Registra o resultado do envio para um contato (callback do motor de envio)."""
+        if result.success:
+            self.successful_numbers.append(result.number)
+            self.log_success(f"Mensagem enviada para: {result.number}")
+        else:
+            self.failed_numbers.append(result.number)
+            self.error_messages[result.number] = result.error
+            self.log_error(f"Falha ao enviar para: {result.number} - Erro: {result.error}")
+
+        # Atualiza estatísticas em tempo real (só o último valor é desenhado)
+        self.ui_bus.publish(self.update_statistics, key="stats")
+
+    def on_send_progress(self, done, total, estimated_remaining):
+        """Publica o progresso do envio (callback do motor de envio)."""
+        self.ui_bus.publish(self.show_send_progress, done, total, estimated_remaining, key="progress")
+
+    def on_send_rate(self, rate_per_minute, reason):
+        """Publica o ajuste do ritmo adaptativo (callback do motor de envio)."""
+        self.ui_bus.publish(self.rate_var.set, f"Ritmo: {rate_per_minute:.1f} contatos/min — {reason}", key="rate")
+        if reason.startswith("Reduzindo"):
+            self.log_from_worker(f"Ritmo reduzido para {rate_per_minute:.1f} contatos/min: {reason}", "WARNING")
+
+    def show_send_progress(self, done, total, estimated_remaining):
+        """Atualiza a barra de progresso e o tempo estimado."""
+        self.progress_var.set(f"{done} de {total}")
+        if estimated_remaining is not None:
+            self.estimated_var.set(str(datetime.timedelta(seconds=int(estimated_remaining))))
+        self.progress_bar["value"] = done
+        if self.running:
+            self.status_var.set(f"Enviando... {done}/{total} contatos processados")
 
     def log_success(self, message):
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"{datetime.datetime.now()} - SUCESSO: {message}\n")
+        self.log_writer.write("SUCESSO", message)
     
     def log_error(self, message):
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"{datetime.datetime.now()} - ERRO: {message}\n")
+        self.log_writer.write("ERRO", message)
     
     def log_warning(self, message):
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"{datetime.datetime.now()} - AVISO: {message}\n")
+        self.log_writer.write("AVISO", message)
+
+    def on_close(self):
+        """Interrompe o envio e grava o log pendente antes de fechar a janela."""
+        self.running = False
+        if self.engine:
+            self.engine.stop()
+        self.event_stream.stop()
+        self.health_monitor.stop()
+        self.ui_bus.stop()
+        metrics.stop_exporters(self.metrics_exporters)
+        self.log_writer.close()
+        self.master.destroy()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,221 @@
+// logger.js - Logs com níveis, por módulo, com amostragem e saída em buffer
+//
+// Configuração por variáveis de ambiente:
+//   LOG_LEVEL   nível padrão: debug, info, warn, error ou silent (padrão: info)
+//   LOG_LEVELS  níveis por módulo, ex: "phone=debug,http=debug,jobs=warn"
+//   LOG_SAMPLE  amostragem por módulo (1 a cada N linhas), ex: "phone=1" mostra todas
+//   LOG_FORMAT  text (padrão) ou json (um objeto JSON por linha)
+//   LOG_FILE    grava em um arquivo em vez da saída padrão
+//
+// As linhas não são escritas na hora: ficam num buffer que é gravado de uma vez
+// na próxima volta do event loop (ou antes, se passar de FLUSH_BYTES). Assim um
+// lote com milhares de linhas vira poucas escritas, e a requisição não espera o console.
+// Na saída do processo o buffer é gravado de forma síncrona (veja o limite de
+// ordem descrito em flushSync).
+const fs = require('fs');
+
+const LEVELS = { debug: 10, info: 20, warn: 30, error: 40, silent: 100 };
+const LEVEL_NAMES = { 10: 'DEBUG', 20: 'INFO', 30: 'WARN', 40: 'ERROR' };
+
+const FLUSH_BYTES = 64 * 1024;
+// Se o destino não der conta (ex: console lento), descarta linhas abaixo de warn
+// a partir deste tamanho em vez de acumular memória
+const MAX_BUFFER_BYTES = 8 * 1024 * 1024;
+
+// Lê listas no formato "modulo=valor,modulo=valor"
+function parseModuleList(value) {
+    const result = {};
+    for (const entry of (value || '').split(',')) {
+        const [module, setting] = entry.split('=').map(part => part.trim());
+        if (module && setting) {
+            result[module] = setting;
+        }
+    }
+    return result;
+}
+
+function levelValue(name, fallback) {
+    const value = LEVELS[String(name || '').toLowerCase()];
+    return value !== undefined ? value : fallback;
+}
+
+const defaultLevel = levelValue(process.env.LOG_LEVEL, LEVELS.info);
+const moduleLevels = parseModuleList(process.env.LOG_LEVELS);
+const moduleSamples = parseModuleList(process.env.LOG_SAMPLE);
+const jsonFormat = (process.env.LOG_FORMAT || '').toLowerCase() === 'json';
+const logFile = process.env.LOG_FILE || null;
+
+// Destino: arquivo (escrita assíncrona) ou a saída padrão
+const destination = logFile ? fs.createWriteStream(logFile, { flags: 'a' }) : process.stdout;
+
+let buffer = [];
+let bufferBytes = 0;
+let flushScheduled = false;
+let waitingDrain = false;
+let dropped = 0;
+
+function flush() {
+    flushScheduled = false;
+    if (waitingDrain || buffer.length === 0) {
+        return;
+    }
+    if (dropped > 0) {
+        buffer.push(formatLine(LEVELS.warn, 'logger', 'Linhas de log descartadas (destino lento)', { dropped }));
+        dropped = 0;
+    }
+    const chunk = buffer.join('');
+    buffer = [];
+    bufferBytes = 0;
+    // Se o destino pedir para esperar, as próximas linhas acumulam até o 'drain'
+    if (!destination.write(chunk)) {
+        waitingDrain = true;
+        destination.once('drain', () => {
+            waitingDrain = false;
+            flush();
+        });
+    }
+}
+
+// Grava o que restou no buffer de forma síncrona (saída do processo).
+// Limite: se o destino ainda estiver esperando 'drain' (waitingDrain), o bloco
+// entregue antes continua na fila interna do stream e não pode ser gravado de
+// forma síncrona. As linhas do buffer são escritas mesmo assim e podem aparecer
+// antes desse bloco (ou sem ele, se o processo terminar antes de o stream
+// esvaziar). Na saída padrão do Linux (arquivo ou pipe), a escrita é síncrona e
+// isso não acontece; com LOG_FILE ou em pipes no Windows/macOS, sim.
+function flushSync() {
+    if (buffer.length === 0) {
+        return;
+    }
+    const chunk = buffer.join('');
+    buffer = [];
+    bufferBytes = 0;
+    try {
+        if (logFile) {
+            fs.appendFileSync(logFile, chunk);
+        } else {
+            fs.writeSync(process.stdout.fd, chunk);
+        }
+    } catch (e) {
+        // Sem destino para escrever; nada mais a fazer
+    }
+}
+
+process.on('exit', flushSync);
+
+function enqueue(level, line) {
+    if (bufferBytes >= MAX_BUFFER_BYTES && level < LEVELS.warn) {
+        dropped++;
+        return;
+    }
+    buffer.push(line);
+    bufferBytes += line.length;
+    if (bufferBytes >= FLUSH_BYTES && !waitingDrain) {
+        flush();
+    } else if (!flushScheduled) {
+        flushScheduled = true;
+        setImmediate(flush);
+    }
+}
+
+function serializeValue(value) {
+    if (value instanceof Error) {
+        return { message: value.message, stack: value.stack };
+    }
+    return value;
+}
+
+function formatText(value) {
+    if (typeof value === 'string') {
+        return /[\s"=]/.test(value) || value === '' ? JSON.stringify(value) : value;
+    }
+    if (value instanceof Error) {
+        return JSON.stringify(value.message);
+    }
+    return typeof value === 'object' && value !== null ? JSON.stringify(value) : String(value);
+}
+
+function formatLine(level, module, message, fields) {
+    const time = new Date().toISOString();
+    if (jsonFormat) {
+        const entry = { time, level: LEVEL_NAMES[level].toLowerCase(), module, msg: message };
+        for (const key in fields) {
+            entry[key] = serializeValue(fields[key]);
+        }
+        return JSON.stringify(entry) + '\n';
+    }
+    let line = `${time} ${LEVEL_NAMES[level].padEnd(5)} [${module}] ${message}`;
+    let stack = '';
+    for (const key in fields) {
+        const value = fields[key];
+        line += ` ${key}=${formatText(value)}`;
+        if (value instanceof Error && value.stack && level >= LEVELS.error) {
+            stack += '\n' + value.stack;
+        }
+    }
+    return line + stack + '\n';
+}
+
+class Logger {
+    /**
+     * Logger de um módulo. Use createLogger em vez de instanciar diretamente.
+     *
+     * Args:
+     *   module: Nome do módulo, usado em LOG_LEVELS e LOG_SAMPLE
+     *   sampleEvery: Grava 1 a cada sampleEvery chamadas (1 grava todas)
+     */
+    constructor(module, sampleEvery = 1) {
+        this.module = module;
+        this.threshold = levelValue(moduleLevels[module], defaultLevel);
+        this.sampleEvery = sampleEvery;
+        this.calls = 0;
+    }
+
+    isEnabled(level) {
+        return LEVELS[level] >= this.threshold;
+    }
+
+    /**
+     * Logger derivado que grava só 1 a cada `every` linhas, para linhas por item
+     * em laços. LOG_SAMPLE pode mudar a taxa do módulo.
+     */
+    sample(every) {
+        const override = parseInt(moduleSamples[this.module], 10);
+        return new Logger(this.module, Math.max(override || every, 1));
+    }
+
+    log(level, message, fields) {
+        const value = LEVELS[level];
+        // O nível é conferido antes de qualquer formatação
+        if (value < this.threshold) {
+            return;
+        }
+        if (this.sampleEvery > 1) {
+            if (this.calls++ % this.sampleEvery !== 0) {
+                return;
+            }
+            fields = Object.assign({}, fields, { sampled: this.sampleEvery });
+        }
+        enqueue(value, formatLine(value, this.module, message, fields));
+    }
+
+    debug(message, fields) { this.log('debug', message, fields); }
+    info(message, fields) { this.log('info', message, fields); }
+    warn(message, fields) { this.log('warn', message, fields); }
+    error(message, fields) { this.log('error', message, fields); }
+}
+
+/**
+ * Cria o logger de um módulo.
+ *
+ * Args:
+ *   module: Nome do módulo (ex: 'server', 'jobs', 'phone')
+ *
+ * Returns:
+ *   Logger: Com os métodos debug, info, warn, error, isEnabled e sample
+ */
+function createLogger(module) {
+    return new Logger(module);
+}
+
+module.exports = { createLogger, flushSync, LEVELS };
@@ -0,0 +1,93 @@
+// logger.test.js - Níveis, amostragem e gravação do buffer do logger
+// Executar com: npm test (dentro de server/) ou node --test
+const test = require('node:test');
+const assert = require('node:assert');
+const { spawnSync } = require('child_process');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+const LOGGER = path.join(__dirname, 'logger.js');
+
+// Roda o script em um processo separado (a configuração é lida ao carregar o
+// módulo) e retorna as linhas JSON gravadas
+function run(script, env = {}) {
+    const result = spawnSync(process.execPath, ['-e', `const { createLogger } = require(${JSON.stringify(LOGGER)});\n${script}`], {
+        env: Object.assign({}, process.env, { LOG_LEVEL: '', LOG_LEVELS: '', LOG_SAMPLE: '', LOG_FILE: '', LOG_FORMAT: 'json' }, env),
+        encoding: 'utf8',
+    });
+    assert.strictEqual(result.status, 0, result.stderr);
+    return result.stdout.split('\n').filter(Boolean).map(line => JSON.parse(line));
+}
+
+const LOG_ALL_LEVELS = `
+for (const module of ['http', 'phone']) {
+    const log = createLogger(module);
+    log.debug('d'); log.info('i'); log.warn('w'); log.error('e');
+}`;
+
+function levelsOf(lines, module) {
+    return lines.filter(line => line.module === module).map(line => line.level);
+}
+
+test('nível padrão é info', () => {
+    const lines = run(LOG_ALL_LEVELS);
+    assert.deepStrictEqual(levelsOf(lines, 'http'), ['info', 'warn', 'error']);
+});
+
+test('LOG_LEVEL e LOG_LEVELS por módulo', () => {
+    const lines = run(LOG_ALL_LEVELS, { LOG_LEVEL: 'warn', LOG_LEVELS: 'phone=debug, http = error' });
+    assert.deepStrictEqual(levelsOf(lines, 'http'), ['error']);
+    assert.deepStrictEqual(levelsOf(lines, 'phone'), ['debug', 'info', 'warn', 'error']);
+});
+
+test('nível desconhecido usa o padrão e silent desliga tudo', () => {
+    assert.deepStrictEqual(levelsOf(run(LOG_ALL_LEVELS, { LOG_LEVEL: 'verbose' }), 'http'), ['info', 'warn', 'error']);
+    assert.deepStrictEqual(run(LOG_ALL_LEVELS, { LOG_LEVEL: 'silent' }), []);
+});
+
+test('isEnabled segue o nível do módulo', () => {
+    const lines = run(`
+const log = createLogger('jobs');
+createLogger('out').info('estado', { debug: log.isEnabled('debug'), info: log.isEnabled('info') });`, { LOG_LEVELS: 'jobs=warn' });
+    assert.deepStrictEqual([lines[0].debug, lines[0].info], [false, false]);
+});
+
+const LOG_SAMPLED = `
+const log = createLogger('phone').sample(10);
+for (let i = 0; i < 35; i++) { log.info('n', { i }); }`;
+
+test('sample grava 1 a cada N chamadas', () => {
+    const lines = run(LOG_SAMPLED);
+    assert.deepStrictEqual(lines.map(line => line.i), [0, 10, 20, 30]);
+    assert.ok(lines.every(line => line.sampled === 10));
+});
+
+test('LOG_SAMPLE muda a taxa do módulo', () => {
+    assert.strictEqual(run(LOG_SAMPLED, { LOG_SAMPLE: 'phone=1' }).length, 35);
+    assert.deepStrictEqual(run(LOG_SAMPLED, { LOG_SAMPLE: 'phone=20' }).map(line => line.i), [0, 20]);
+});
+
+test('linhas abaixo do nível não contam para a amostragem', () => {
+    const lines = run(`
+const log = createLogger('phone').sample(2);
+for (let i = 0; i < 6; i++) { log.debug('d'); log.info('n', { i }); }`);
+    assert.deepStrictEqual(lines.map(line => line.i), [0, 2, 4]);
+});
+
+test('formato texto inclui campos e o buffer é gravado na saída', () => {
+    const result = spawnSync(process.execPath, ['-e', `
+const { createLogger } = require(${JSON.stringify(LOGGER)});
+createLogger('http').warn('Falha', { status: 500, path: '/api/x y' });
+process.exit(0);`], { env: Object.assign({}, process.env, { LOG_FORMAT: 'text', LOG_LEVEL: '', LOG_FILE: '' }), encoding: 'utf8' });
+    // process.exit antes da próxima volta do event loop: a linha vem do flushSync
+    assert.match(result.stdout, /WARN  \[http\] Falha status=500 path="\/api\/x y"\n$/);
+});
+
+test('LOG_FILE grava no arquivo', () => {
+    const file = path.join(fs.mkdtempSync(path.join(os.tmpdir(), 'logger-')), 'server_log.txt');
+    const lines = run(LOG_ALL_LEVELS, { LOG_FILE: file, LOG_LEVEL: 'error' });
+    assert.deepStrictEqual(lines, []);
+    const written = fs.readFileSync(file, 'utf8').split('\n').filter(Boolean).map(line => JSON.parse(line));
+    assert.deepStrictEqual(written.map(line => line.module), ['http', 'phone']);
+});
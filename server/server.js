@@ -1,14 +1,22 @@
 // server.js - Servidor WhatsApp Simplificado
 
-// Adicione isso no início do arquivo server.js para diagnóstico
-console.log("Iniciando servidor...");
-console.log("Diretório atual:", process.cwd());
-console.log("Node.js version:", process.version);
-console.log("Listando módulos necessários...");
+// Logs por módulo; o nível vem de LOG_LEVEL/LOG_LEVELS (veja logger.js)
+const { createLogger, flushSync } = require('./logger');
+const log = createLogger('server');
+const waLog = createLogger('whatsapp');
+const httpLog = createLogger('http');
+const jobLog = createLogger('jobs');
+const sendLog = createLogger('send');
+const mediaLog = createLogger('media');
+const phoneLog = createLogger('phone');
+
+// Diagnóstico da inicialização
+log.info('Iniciando servidor...', { cwd: process.cwd(), node: process.version });
 
 // Captura erros para diagnóstico
 process.on('uncaughtException', (err) => {
-    console.error('Erro não tratado:', err);
+    log.error('Erro não tratado', { err });
+    flushSync();
 });
 
 // Função para tentar carregar um módulo com diagnóstico
@@ -16,16 +24,16 @@ function loadModuleSafely(moduleName) {
     try {
         const module = require(moduleName);
         const version = module.version || (module.package ? module.package.version : 'desconhecida');
-        console.log(`✓ Módulo ${moduleName} carregado (versão: ${version})`);
+        log.debug(`✓ Módulo ${moduleName} carregado`, { version });
         return module;
     } catch (err) {
-        console.error(`✗ Erro ao carregar ${moduleName}:`, err.message);
+        log.error(`✗ Erro ao carregar ${moduleName}`, { err: err.message });
         return null;
     }
 }
 
 // Tenta carregar os módulos principais com diagnóstico detalhado
-let express, Client, LocalAuth, MessageMedia, qrcode, fs, multer, cors, bodyParser;
+let express, Client, LocalAuth, MessageMedia, qrcode, fs, crypto, multer, cors, bodyParser;
 
 try {
     express = loadModuleSafely('express');
@@ -37,20 +45,21 @@ try {
     }
     qrcode = loadModuleSafely('qrcode-terminal');
     fs = loadModuleSafely('fs');
+    crypto = loadModuleSafely('crypto');
     multer = loadModuleSafely('multer');
     cors = loadModuleSafely('cors');
     bodyParser = loadModuleSafely('body-parser');
     
 } catch (err) {
-    console.error('Erro crítico ao carregar dependências:', err);
+    log.error('Erro crítico ao carregar dependências', { err });
 }
 
-if (!express || !Client || !LocalAuth || !MessageMedia || !qrcode || !fs || !multer || !cors || !bodyParser) {
-    console.error('Uma ou mais dependências críticas não puderam ser carregadas. Abortando inicialização do servidor.');
+if (!express || !Client || !LocalAuth || !MessageMedia || !qrcode || !fs || !crypto || !multer || !cors || !bodyParser) {
+    log.error('Uma ou mais dependências críticas não puderam ser carregadas. Abortando inicialização do servidor.');
     process.exit(1);
 }
 
-console.log('Todas as dependências carregadas com sucesso. Inicializando servidor...');
+log.info('Todas as dependências carregadas com sucesso. Inicializando servidor...');
 
 const app = express();
 // MODIFICAÇÃO: Permitir porta alternativa via variável de ambiente ou usar portas alternativas
@@ -63,16 +72,29 @@ const upload = multer({ dest: 'uploads/' });
 
 // Middleware
 app.use(cors());
-app.use(bodyParser.json());
+app.use(bodyParser.json({ limit: '10mb' })); // Limite maior para lotes de mensagens e de números
 app.use(express.static('public'));
 
+// Resumo de cada requisição (método, rota, status e duração), visível com LOG_LEVELS=http=debug
+if (httpLog.isEnabled('debug')) {
+    app.use((req, res, next) => {
+        const started = process.hrtime.bigint();
+        res.on('finish', () => {
+            httpLog.debug(`${req.method} ${req.path}`, {
+                status: res.statusCode,
+                ms: Math.round(Number(process.hrtime.bigint() - started) / 1e5) / 10,
+            });
+        });
+        next();
+    });
+}
+
 // Variáveis globais
 let clientReady = false;
 let qrData = null;
 
 // Inicializa o cliente WhatsApp
-console.log('Inicializando cliente WhatsApp...');
-console.log('Diretório de sessão:', './whatsapp-session');
+waLog.info('Inicializando cliente WhatsApp...', { session: './whatsapp-session' });
 
 const puppeteerOptions = {
     headless: true,
@@ -85,7 +107,7 @@ const puppeteerOptions = {
     ]
 };
 
-console.log('Opções Puppeteer:', JSON.stringify(puppeteerOptions, null, 2));
+waLog.debug('Opções Puppeteer', { puppeteer: puppeteerOptions });
 
 const client = new Client({
     authStrategy: new LocalAuth({
@@ -94,55 +116,368 @@ const client = new Client({
     puppeteer: puppeteerOptions
 });
 
+// Clientes inscritos em /api/events (Server-Sent Events)
+const eventClients = new Set();
+
+// Envia um evento a todos os clientes inscritos
+function publishEvent(type, data = {}) {
+    const payload = `event: ${type}\ndata: ${JSON.stringify(data)}\n\n`;
+    for (const res of eventClients) {
+        res.write(payload);
+    }
+}
+
 // Evento quando o QR code é recebido
 client.on('qr', (qr) => {
     qrData = qr;
     qrcode.generate(qr, { small: true });
-    console.log('QR Code gerado. Escaneie-o com seu WhatsApp.');
+    waLog.info('QR Code gerado. Escaneie-o com seu WhatsApp.');
+    publishEvent('qr', { qr });
 });
 
 // Evento quando o cliente está pronto
 client.on('ready', () => {
     clientReady = true;
     qrData = null;
-    console.log('Cliente WhatsApp está pronto!');
+    waLog.info('Cliente WhatsApp está pronto!');
+    publishEvent('ready');
 });
 
 // Evento de autenticação
 client.on('authenticated', () => {
-    console.log('Autenticado com sucesso!');
+    waLog.info('Autenticado com sucesso!');
+    publishEvent('authenticated');
 });
 
 // Evento de desconexão
 client.on('disconnected', (reason) => {
     clientReady = false;
-    console.log('Cliente desconectado:', reason);
+    waLog.warn('Cliente desconectado', { reason });
+    publishEvent('disconnected', { reason });
     // Reinicializa o cliente após um tempo
     setTimeout(() => client.initialize(), 5000);
 });
 
 // Adiciona um handler de erro específico para o cliente
 client.on('auth_failure', (error) => {
-    console.error('Falha na autenticação:', error);
+    waLog.error('Falha na autenticação', { err: error });
 });
 
 // Handler para outros eventos e erros
 client.on('change_state', state => {
-    console.log('Estado do cliente mudou para:', state);
+    waLog.info('Estado do cliente mudou', { state });
+    publishEvent('change_state', { state });
 });
 
 // Inicializa o cliente
-console.log('Chamando client.initialize()');
+waLog.debug('Chamando client.initialize()');
 try {
     client.initialize();
-    console.log('Cliente inicializado com sucesso');
+    waLog.info('Cliente inicializado com sucesso');
 } catch (err) {
-    console.error('Erro ao inicializar cliente:', err);
+    waLog.error('Erro ao inicializar cliente', { err });
+}
+
+// Histogramas no formato de texto do Prometheus, expostos em /api/metrics
+function createHistogram(name, help, labelName, buckets) {
+    return { name, help, labelName, buckets, series: new Map() };
+}
+
+function observeHistogram(histogram, labelValue, value) {
+    let series = histogram.series.get(labelValue);
+    if (!series) {
+        series = { counts: new Array(histogram.buckets.length).fill(0), sum: 0, count: 0 };
+        histogram.series.set(labelValue, series);
+    }
+    const bucket = histogram.buckets.findIndex(bound => value <= bound);
+    if (bucket >= 0) {
+        series.counts[bucket]++;
+    }
+    series.sum += value;
+    series.count++;
+}
+
+function renderHistogram(histogram) {
+    const lines = [`# HELP ${histogram.name} ${histogram.help}`, `# TYPE ${histogram.name} histogram`];
+    for (const [labelValue, series] of histogram.series) {
+        const label = `${histogram.labelName}="${labelValue}"`;
+        let cumulative = 0;
+        histogram.buckets.forEach((bound, i) => {
+            cumulative += series.counts[i];
+            lines.push(`${histogram.name}_bucket{${label},le="${bound}"} ${cumulative}`);
+        });
+        lines.push(`${histogram.name}_bucket{${label},le="+Inf"} ${series.count}`);
+        lines.push(`${histogram.name}_sum{${label}} ${series.sum}`);
+        lines.push(`${histogram.name}_count{${label}} ${series.count}`);
+    }
+    return lines;
+}
+
+const sendDuration = createHistogram(
+    'wpp_server_send_duration_seconds', 'Duração de client.sendMessage, por tipo de envio', 'type',
+    [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+);
+const uploadSize = createHistogram(
+    'wpp_server_upload_size_bytes', 'Tamanho dos arquivos recebidos, por rota', 'route',
+    [16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864]
+);
+const sendFailures = new Map(); // tipo de envio -> quantidade de falhas
+
+// Envia pelo whatsapp-web.js medindo a duração (type: text, file, media ou batch)
+async function timedSendMessage(type, chatId, content, options) {
+    const started = process.hrtime.bigint();
+    try {
+        return await client.sendMessage(chatId, content, options);
+    } catch (error) {
+        sendFailures.set(type, (sendFailures.get(type) || 0) + 1);
+        throw error;
+    } finally {
+        observeHistogram(sendDuration, type, Number(process.hrtime.bigint() - started) / 1e9);
+    }
 }
 
+// Fila de envios: toda chamada a client.sendMessage passa por aqui. No máximo
+// SEND_CONCURRENCY trabalhos rodam ao mesmo tempo (cada um ocupa o Puppeteer) e
+// os trabalhos de um mesmo destinatário são executados na ordem em que chegaram.
+// O trabalho continua mesmo que o cliente HTTP desconecte; o resultado fica
+// disponível em /api/jobs/status por JOB_RETENTION_SECONDS.
+const SEND_CONCURRENCY = Math.max(parseInt(process.env.SEND_CONCURRENCY || '2', 10) || 1, 1);
+const MAX_QUEUED_JOBS = parseInt(process.env.MAX_QUEUED_JOBS || '10000', 10);
+const JOB_RETENTION_MS = parseInt(process.env.JOB_RETENTION_SECONDS || '900', 10) * 1000;
+const MAX_STATUS_WAIT_MS = 30000;
+const FINAL_JOB_STATES = new Set(['done', 'failed', 'canceled']);
+
+const jobs = new Map();            // jobId -> trabalho
+const recipientQueues = new Map(); // chatId -> trabalhos do destinatário ainda não concluídos, em ordem
+const readyRecipients = [];        // destinatários cujo próximo trabalho pode começar (rodízio)
+const jobWaiters = new Set();      // consultas de status esperando algum trabalho terminar
+const jobsFinished = new Map();    // estado final -> quantidade
+const jobQueueWait = createHistogram(
+    'wpp_server_job_queue_seconds', 'Tempo dos trabalhos na fila até começarem, por tipo', 'type',
+    [0.01, 0.1, 0.5, 1, 5, 15, 60, 300]
+);
+let queuedJobs = 0;
+let runningJobs = 0;
+let jobSequence = 0;
+
+// Cria um trabalho e o coloca na fila. steps: [{ content } | { mediaId, options }]
+function enqueueJob(type, number, steps) {
+    const job = {
+        id: `${Date.now().toString(36)}-${(++jobSequence).toString(36)}`,
+        type,
+        number,
+        chatId: `${formatPhoneNumber(String(number))}@c.us`,
+        steps,
+        stepCount: steps.length,
+        status: 'queued',
+        stepsCompleted: 0,
+        stepDurationsMs: [],
+        messageIds: [],
+        error: null,
+        createdAt: Date.now(),
+        startedAt: null,
+        finishedAt: null,
+    };
+    job.finished = new Promise(resolve => { job.resolve = resolve; });
+    jobs.set(job.id, job);
+    queuedJobs++;
+
+    const queue = recipientQueues.get(job.chatId);
+    if (queue) {
+        queue.push(job); // Roda depois dos trabalhos anteriores do mesmo destinatário
+    } else {
+        recipientQueues.set(job.chatId, [job]);
+        readyRecipients.push(job.chatId);
+    }
+    pumpJobs();
+    return job;
+}
+
+// Etapas de um trabalho recebido em JSON: o texto e depois cada mídia registrada
+function jobSteps(item) {
+    const steps = item.message ? [{ content: item.message }] : [];
+    for (const mediaId of item.mediaIds || []) {
+        steps.push({ mediaId, options: { caption: item.caption || '' } });
+    }
+    return steps;
+}
+
+// Inicia trabalhos enquanto houver vaga e destinatário com trabalho pendente
+function pumpJobs() {
+    while (runningJobs < SEND_CONCURRENCY && readyRecipients.length > 0) {
+        const chatId = readyRecipients.shift();
+        const queue = recipientQueues.get(chatId);
+        // Trabalhos cancelados continuam na fila do destinatário até chegarem à frente
+        while (queue.length > 0 && queue[0].status === 'canceled') {
+            queue.shift();
+        }
+        if (queue.length === 0) {
+            recipientQueues.delete(chatId);
+            continue;
+        }
+        runJob(queue[0]);
+    }
+}
+
+async function runJob(job) {
+    queuedJobs--;
+    runningJobs++;
+    job.status = 'running';
+    job.startedAt = Date.now();
+    observeHistogram(jobQueueWait, job.type, (job.startedAt - job.createdAt) / 1000);
+
+    try {
+        if (!clientReady) {
+            throw new Error('Cliente WhatsApp não está pronto');
+        }
+        for (const step of job.steps) {
+            const content = step.mediaId ? getCachedMedia(step.mediaId) : step.content;
+            if (!content) {
+                throw new Error('Mídia não encontrada');
+            }
+            const started = Date.now();
+            const result = await timedSendMessage(job.type, job.chatId, content, step.options);
+            job.stepDurationsMs.push(Date.now() - started);
+            job.messageIds.push(result.id._serialized);
+            job.stepsCompleted++;
+        }
+        job.status = 'done';
+    } catch (error) {
+        jobLog.warn('Erro no trabalho', { job: job.id, number: job.number, err: error.message });
+        job.status = 'failed';
+        job.error = error.message;
+    } finally {
+        runningJobs--;
+        finishJob(job);
+
+        // O próximo trabalho do destinatário volta para o fim da fila de destinatários
+        const queue = recipientQueues.get(job.chatId);
+        queue.shift();
+        if (queue.length > 0) {
+            readyRecipients.push(job.chatId);
+        } else {
+            recipientQueues.delete(job.chatId);
+        }
+        pumpJobs();
+    }
+}
+
+function finishJob(job) {
+    job.finishedAt = Date.now();
+    // O trabalho fica em jobs por JOB_RETENTION_SECONDS; as etapas podem conter
+    // mídias inteiras (base64), então são liberadas assim que o trabalho termina
+    job.steps = null;
+    jobsFinished.set(job.status, (jobsFinished.get(job.status) || 0) + 1);
+    job.resolve(job);
+    for (const waiter of jobWaiters) {
+        waiter(job);
+    }
+}
+
+// Remove o trabalho da fila, se ainda não tiver começado
+function cancelJob(job) {
+    if (job.status !== 'queued') {
+        return false;
+    }
+    queuedJobs--;
+    job.status = 'canceled';
+    finishJob(job);
+    return true;
+}
+
+function serializeJob(job) {
+    const now = Date.now();
+    return {
+        id: job.id,
+        number: job.number,
+        status: job.status,
+        stepsCompleted: job.stepsCompleted,
+        stepCount: job.stepCount,
+        messageIds: job.messageIds,
+        error: job.error,
+        queuedMs: (job.startedAt || job.finishedAt || now) - job.createdAt,
+        runMs: job.startedAt ? (job.finishedAt || now) - job.startedAt : 0,
+        stepDurationsMs: job.stepDurationsMs,
+    };
+}
+
+// Descarta os resultados antigos
+setInterval(() => {
+    const cutoff = Date.now() - JOB_RETENTION_MS;
+    for (const [id, job] of jobs) {
+        if (job.finishedAt && job.finishedAt < cutoff) {
+            jobs.delete(id);
+        }
+    }
+}, 60000).unref();
+
+// Responde 429 se não couberem mais `count` trabalhos na fila; retorna true nesse caso.
+// Toda rota que chama enqueueJob confere o limite antes
+function rejectIfQueueFull(res, count) {
+    if (queuedJobs + count <= MAX_QUEUED_JOBS) {
+        return false;
+    }
+    // Fila cheia: o cliente deve esperar os trabalhos pendentes andarem
+    res.setHeader('Retry-After', '5');
+    res.status(429).json({ error: 'Fila de envios cheia', queued: queuedJobs });
+    return true;
+}
+
+// Indica se a requisição pediu resposta imediata (202 com o identificador do trabalho)
+function wantsAsync(req) {
+    const value = req.query.async !== undefined ? req.query.async : (req.body || {}).async;
+    return value === true || value === 'true' || value === '1';
+}
+
+// Responde a uma rota de envio: 202 com o trabalho, ou aguarda o resultado
+async function respondWithJob(req, res, job, errorMessage) {
+    if (wantsAsync(req)) {
+        return res.status(202).json({ success: true, jobId: job.id, status: job.status });
+    }
+    await job.finished;
+    if (job.status === 'done') {
+        sendLog.info('Envio concluído', {
+            job: job.id, type: job.type, steps: job.stepsCompleted,
+            queuedMs: job.startedAt - job.createdAt, runMs: job.finishedAt - job.startedAt,
+        });
+        return res.json({ success: true, jobId: job.id, messageId: job.messageIds[job.messageIds.length - 1] });
+    }
+    res.status(500).json({ error: errorMessage, details: job.error, jobId: job.id });
+}
+
+// Intervalo entre comentários de keep-alive no fluxo de eventos
+const EVENTS_HEARTBEAT_MS = 25000;
+
+// Rota de eventos (Server-Sent Events): o cliente recebe o QR code e as mudanças
+// de estado assim que acontecem, sem consultar /api/status e /api/qrcode
+app.get('/api/events', (req, res) => {
+    res.status(200);
+    res.setHeader('Content-Type', 'text/event-stream');
+    res.setHeader('Cache-Control', 'no-cache');
+    res.setHeader('Connection', 'keep-alive');
+    res.flushHeaders();
+    
+    // Estado atual primeiro, para quem se conecta no meio do processo
+    res.write('retry: 3000\n\n');
+    res.write(`event: status\ndata: ${JSON.stringify({ ready: clientReady, qrCode: !!qrData })}\n\n`);
+    if (qrData) {
+        res.write(`event: qr\ndata: ${JSON.stringify({ qr: qrData })}\n\n`);
+    }
+    
+    eventClients.add(res);
+    log.debug('Cliente inscrito nos eventos', { clients: eventClients.size });
+    
+    // Mantém a conexão viva através de proxies e detecta clientes desconectados
+    const heartbeat = setInterval(() => res.write(': ping\n\n'), EVENTS_HEARTBEAT_MS);
+    req.on('close', () => {
+        clearInterval(heartbeat);
+        eventClients.delete(res);
+    });
+});
+
 // Rota para verificar o status do cliente
 app.get('/api/status', (req, res) => {
-    console.log('Recebida solicitação de status. Cliente pronto:', clientReady);
+    log.debug('Recebida solicitação de status', { ready: clientReady });
     res.json({
         ready: clientReady,
         qrCode: qrData ? true : false
@@ -154,16 +489,16 @@ app.get('/api/status', (req, res) => {
 
 // Rota para obter o QR code
 app.get('/api/qrcode', async (req, res) => {
-    console.log('Recebida solicitação de QR Code. Disponível:', qrData ? 'Sim' : 'Não');
+    waLog.debug('Recebida solicitação de QR Code', { available: !!qrData });
     
     if (!qrData) {
         // Se o QR code não estiver disponível, tente reiniciar a sessão
-        console.log('QR Code não disponível. Tentando reiniciar a sessão...');
+        waLog.info('QR Code não disponível. Tentando reiniciar a sessão...');
         try {
             // Libera a sessão atual
             if (client.pupBrowser) {
                 await client.destroy();
-                console.log('Cliente destruído para reinicialização');
+                waLog.info('Cliente destruído para reinicialização');
             }
             
             // Força a reinicialização após breve pausa
@@ -171,7 +506,7 @@ app.get('/api/qrcode', async (req, res) => {
                 qrData = null;
                 clientReady = false;
                 client.initialize();
-                console.log('Cliente reinicializado, aguardando novo QR code');
+                waLog.info('Cliente reinicializado, aguardando novo QR code');
             }, 1000);
             
             // Responde que está reiniciando
@@ -179,7 +514,7 @@ app.get('/api/qrcode', async (req, res) => {
                 message: 'QR Code não disponível. Reiniciando sessão. Tente novamente em 5 segundos.' 
             });
         } catch (err) {
-            console.error('Erro ao tentar reiniciar sessão:', err);
+            waLog.error('Erro ao tentar reiniciar sessão', { err });
             return res.status(500).json({ error: 'Erro ao tentar gerar novo QR Code' });
         }
     }
@@ -188,35 +523,36 @@ app.get('/api/qrcode', async (req, res) => {
         // Retorna o texto do QR code
         res.json({ qrCodeText: qrData });
     } catch (error) {
-        console.error('Erro ao disponibilizar QR Code:', error);
+        waLog.error('Erro ao disponibilizar QR Code', { err: error });
         res.status(500).json({ error: 'Erro ao gerar QR Code' });
     }
 });
 
 // Adicione esta nova rota no servidor para forçar a regeneração do QR code:
 app.post('/api/request-new-qrcode', async (req, res) => {
-    console.log('Solicitação para gerar novo QR code recebida');
+    waLog.info('Solicitação para gerar novo QR code recebida');
     
     try {
         // Libera a sessão atual sem apagar os arquivos
         if (client.pupBrowser) {
             await client.destroy();
-            console.log('Cliente destruído para regeneração de QR');
+            waLog.info('Cliente destruído para regeneração de QR');
         }
         
         // Limpa dados
         qrData = null;
         clientReady = false;
+        publishEvent('status', { ready: false, qrCode: false });
         
         // Reinicia o cliente
         setTimeout(() => {
             client.initialize();
-            console.log('Cliente reinicializado, aguardando novo QR code');
+            waLog.info('Cliente reinicializado, aguardando novo QR code');
         }, 1000);
         
         res.json({ success: true, message: 'Solicitação para novo QR Code enviada. Aguarde 5 segundos e tente obter o QR Code novamente.' });
     } catch (error) {
-        console.error('Erro ao solicitar novo QR code:', error);
+        waLog.error('Erro ao solicitar novo QR code', { err: error });
         res.status(500).json({ error: 'Erro ao solicitar novo QR code' });
     }
 });
@@ -224,29 +560,28 @@ app.post('/api/request-new-qrcode', async (req, res) => {
 // Rota para enviar mensagem de texto
 app.post('/api/send-message', async (req, res) => {
     const { number, message } = req.body;
-    console.log(`Recebida solicitação para enviar mensagem para ${number}`);
+    sendLog.debug('Recebida solicitação para enviar mensagem', { number });
     
     if (!clientReady) {
-        console.log('Cliente não está pronto. Rejeitando solicitação.');
+        sendLog.warn('Cliente não está pronto. Rejeitando solicitação.');
         return res.status(400).json({ error: 'Cliente WhatsApp não está pronto' });
     }
     
     if (!number || !message) {
-        console.log('Dados incompletos. Rejeitando solicitação.');
+        sendLog.warn('Dados incompletos. Rejeitando solicitação.');
         return res.status(400).json({ error: 'Número e mensagem são obrigatórios' });
     }
     
+    if (rejectIfQueueFull(res, 1)) {
+        return;
+    }
+    
     try {
-        // Formata o número para o padrão internacional
-        const formattedNumber = formatPhoneNumber(number);
-        console.log(`Número formatado: ${formattedNumber}`);
-        
-        // Envia a mensagem
-        const result = await client.sendMessage(`${formattedNumber}@c.us`, message);
-        console.log('Mensagem enviada com sucesso');
-        res.json({ success: true, messageId: result.id._serialized });
+        // Coloca a mensagem na fila de envios (com ?async=1, responde 202 sem esperar o envio)
+        const job = enqueueJob('text', number, [{ content: message }]);
+        await respondWithJob(req, res, job, 'Erro ao enviar mensagem');
     } catch (error) {
-        console.error('Erro ao enviar mensagem:', error);
+        sendLog.error('Erro ao enviar mensagem', { number, err: error });
         res.status(500).json({ error: 'Erro ao enviar mensagem', details: error.message });
     }
 });
@@ -255,53 +590,385 @@ app.post('/api/send-message', async (req, res) => {
 app.post('/api/send-file', upload.single('file'), async (req, res) => {
     const { number } = req.body;
     const caption = req.body.caption || '';
-    console.log(`Recebida solicitação para enviar arquivo para ${number}`);
+    sendLog.debug('Recebida solicitação para enviar arquivo', { number });
     
     if (!clientReady) {
-        console.log('Cliente não está pronto. Rejeitando solicitação.');
+        sendLog.warn('Cliente não está pronto. Rejeitando solicitação.');
         return res.status(400).json({ error: 'Cliente WhatsApp não está pronto' });
     }
     
     if (!number || !req.file) {
-        console.log('Dados incompletos. Rejeitando solicitação.');
+        sendLog.warn('Dados incompletos. Rejeitando solicitação.');
         return res.status(400).json({ error: 'Número e arquivo são obrigatórios' });
     }
     
+    if (rejectIfQueueFull(res, 1)) {
+        fs.unlink(req.file.path, () => {});
+        return;
+    }
+    
     try {
-        // Formata o número para o padrão internacional
-        const formattedNumber = formatPhoneNumber(number);
-        console.log(`Número formatado: ${formattedNumber}`);
+        observeHistogram(uploadSize, 'send-file', req.file.size);
         
         // Caminho do arquivo
         const filePath = req.file.path;
         const fileName = req.file.originalname;
-        console.log(`Enviando arquivo: ${fileName} (${filePath})`);
+        sendLog.debug('Enviando arquivo', { file: fileName, path: filePath });
         
-        // Envia o arquivo
+        // Carrega o arquivo em memória; o temporário não é mais necessário
         const media = MessageMedia.fromFilePath(filePath);
         media.filename = fileName;
-        
-        const result = await client.sendMessage(`${formattedNumber}@c.us`, media, { caption });
-        console.log('Arquivo enviado com sucesso');
-        
-        // Remove o arquivo temporário
         fs.unlinkSync(filePath);
         
-        res.json({ success: true, messageId: result.id._serialized });
+        // Coloca o arquivo na fila de envios (com ?async=1, responde 202 sem esperar o envio)
+        const job = enqueueJob('file', number, [{ content: media, options: { caption } }]);
+        await respondWithJob(req, res, job, 'Erro ao enviar arquivo');
     } catch (error) {
-        console.error('Erro ao enviar arquivo:', error);
+        sendLog.error('Erro ao enviar arquivo', { number, err: error });
         // Tenta limpar o arquivo temporário em caso de erro
-        if (req.file && req.file.path) {
+        if (req.file && req.file.path && fs.existsSync(req.file.path)) {
             try {
                 fs.unlinkSync(req.file.path);
             } catch (e) {
-                console.error('Erro ao remover arquivo temporário:', e);
+                log.warn('Erro ao remover arquivo temporário', { err: e });
             }
         }
         res.status(500).json({ error: 'Erro ao enviar arquivo', details: error.message });
     }
 });
 
+// Cache LRU de mídias já preparadas (MessageMedia), identificadas pelo hash SHA-256 do conteúdo.
+// Assim um anexo é enviado pelo cliente uma única vez por campanha, e não uma vez por destinatário.
+const MEDIA_CACHE_MAX_BYTES = parseInt(process.env.MEDIA_CACHE_MAX_MB || '256', 10) * 1024 * 1024;
+const mediaCache = new Map(); // mediaId -> { media, size }
+let mediaCacheBytes = 0;
+
+function cacheMedia(mediaId, media) {
+    if (mediaCache.has(mediaId)) {
+        return;
+    }
+    const size = media.data.length; // Tamanho em base64, que é o que fica em memória
+    mediaCache.set(mediaId, { media, size });
+    mediaCacheBytes += size;
+    
+    // Remove as mídias usadas há mais tempo até respeitar o limite
+    for (const [oldId, entry] of mediaCache) {
+        if (mediaCacheBytes <= MEDIA_CACHE_MAX_BYTES || oldId === mediaId) {
+            break;
+        }
+        mediaCache.delete(oldId);
+        mediaCacheBytes -= entry.size;
+        mediaLog.info('Mídia removida do cache', { mediaId: oldId, limitBytes: MEDIA_CACHE_MAX_BYTES });
+    }
+}
+
+function getCachedMedia(mediaId) {
+    const entry = mediaCache.get(mediaId);
+    if (!entry) {
+        return null;
+    }
+    // Reinsere para marcar como usada mais recentemente
+    mediaCache.delete(mediaId);
+    mediaCache.set(mediaId, entry);
+    return entry.media;
+}
+
+// Rota para registrar uma mídia e obter seu identificador
+app.post('/api/media', upload.single('file'), (req, res) => {
+    if (!req.file) {
+        return res.status(400).json({ error: 'Arquivo é obrigatório' });
+    }
+    
+    observeHistogram(uploadSize, 'media', req.file.size);
+    
+    try {
+        const mediaId = crypto.createHash('sha256').update(fs.readFileSync(req.file.path)).digest('hex');
+        const cached = mediaCache.has(mediaId);
+        
+        if (!cached) {
+            const media = MessageMedia.fromFilePath(req.file.path);
+            media.filename = req.file.originalname;
+            cacheMedia(mediaId, media);
+            mediaLog.info('Mídia registrada', { file: req.file.originalname, mediaId });
+        }
+        
+        res.json({ success: true, mediaId, size: req.file.size, cached });
+    } catch (error) {
+        mediaLog.error('Erro ao registrar mídia', { err: error });
+        res.status(500).json({ error: 'Erro ao registrar mídia', details: error.message });
+    } finally {
+        // O conteúdo já está em memória; remove o arquivo temporário
+        try {
+            fs.unlinkSync(req.file.path);
+        } catch (e) {
+            log.warn('Erro ao remover arquivo temporário', { err: e });
+        }
+    }
+});
+
+// Rota para verificar se uma mídia já está registrada (evita reenviar o arquivo)
+app.get('/api/media/:mediaId', (req, res) => {
+    const entry = mediaCache.get(req.params.mediaId);
+    if (!entry) {
+        return res.status(404).json({ error: 'Mídia não encontrada' });
+    }
+    res.json({ success: true, mediaId: req.params.mediaId, filename: entry.media.filename });
+});
+
+// Rota para enviar uma mídia previamente registrada
+app.post('/api/send-media', async (req, res) => {
+    const { number, mediaId } = req.body;
+    const caption = req.body.caption || '';
+    sendLog.debug('Recebida solicitação para enviar mídia', { mediaId, number });
+    
+    if (!clientReady) {
+        sendLog.warn('Cliente não está pronto. Rejeitando solicitação.');
+        return res.status(400).json({ error: 'Cliente WhatsApp não está pronto' });
+    }
+    
+    if (!number || !mediaId) {
+        sendLog.warn('Dados incompletos. Rejeitando solicitação.');
+        return res.status(400).json({ error: 'Número e mídia são obrigatórios' });
+    }
+    
+    const media = getCachedMedia(mediaId);
+    if (!media) {
+        return res.status(404).json({ error: 'Mídia não encontrada' });
+    }
+    
+    if (rejectIfQueueFull(res, 1)) {
+        return;
+    }
+    
+    try {
+        const job = enqueueJob('media', number, [{ content: media, options: { caption } }]);
+        await respondWithJob(req, res, job, 'Erro ao enviar arquivo');
+    } catch (error) {
+        sendLog.error('Erro ao enviar mídia', { number, err: error });
+        res.status(500).json({ error: 'Erro ao enviar arquivo', details: error.message });
+    }
+});
+
+// Aguarda o tempo indicado em milissegundos
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+// Rota para envio em lote: recebe uma lista de trabalhos {number, message, mediaIds},
+// processa em sequência e devolve cada resultado assim que fica pronto, como NDJSON
+// (um objeto JSON por linha)
+app.post('/api/send-batch', async (req, res) => {
+    const items = req.body.jobs;
+    const intervalMs = Math.max(parseInt(req.body.intervalMs, 10) || 0, 0);
+    const [jitterMin, jitterMax] = Array.isArray(req.body.jitterMs) ? req.body.jitterMs : [0, 0];
+    sendLog.info('Recebida solicitação de envio em lote', { jobs: items ? items.length : 0 });
+    
+    if (!clientReady) {
+        sendLog.warn('Cliente não está pronto. Rejeitando solicitação.');
+        return res.status(400).json({ error: 'Cliente WhatsApp não está pronto' });
+    }
+    
+    if (!Array.isArray(items) || items.length === 0) {
+        return res.status(400).json({ error: 'Lista de trabalhos é obrigatória' });
+    }
+    
+    // Confere antes de começar se todas as mídias continuam no cache
+    const missing = [...new Set(items.flatMap(item => item.mediaIds || []))].filter(id => !mediaCache.has(id));
+    if (missing.length > 0) {
+        return res.status(404).json({ error: 'Mídia não encontrada', mediaIds: missing });
+    }
+    
+    // O lote enfileira um destinatário por vez, à medida que o anterior termina
+    if (rejectIfQueueFull(res, 1)) {
+        return;
+    }
+    
+    // Interrompe o lote se o cliente desconectar
+    let aborted = false;
+    let sent = 0;
+    let failed = 0;
+    const batchStarted = Date.now();
+    res.on('close', () => {
+        if (!res.writableEnded) {
+            aborted = true;
+        }
+    });
+    
+    res.status(200);
+    res.setHeader('Content-Type', 'application/x-ndjson');
+    res.flushHeaders();
+    
+    for (let i = 0; i < items.length && !aborted; i++) {
+        // Ritmo definido pelo cliente entre um destinatário e o próximo
+        if (i > 0 && (intervalMs > 0 || jitterMax > 0)) {
+            await sleep(intervalMs + jitterMin + Math.random() * (jitterMax - jitterMin));
+        }
+        
+        const item = items[i] || {};
+        const line = { index: i, number: item.number, success: true, stepsCompleted: 0 };
+        
+        try {
+            if (!item.number || (!item.message && (item.mediaIds || []).length === 0)) {
+                throw new Error('Número e mensagem são obrigatórios');
+            }
+            // Cada destinatário do lote passa pela fila de envios, como os demais envios
+            const job = await enqueueJob('batch', item.number, jobSteps(item)).finished;
+            line.stepsCompleted = job.stepsCompleted;
+            if (job.status !== 'done') {
+                throw new Error(job.error || 'Envio cancelado');
+            }
+            sent++;
+        } catch (error) {
+            // Falhas de envio já aparecem no log da fila; o resumo do lote traz o total
+            sendLog.debug('Erro no trabalho do lote', { index: i, number: item.number, err: error.message });
+            failed++;
+            line.success = false;
+            line.error = error.message;
+        }
+        
+        res.write(JSON.stringify(line) + '\n');
+    }
+    
+    res.end();
+    sendLog.info(`Lote finalizado${aborted ? ' (interrompido pelo cliente)' : ''}`, {
+        jobs: items.length, sent, failed, ms: Date.now() - batchStarted,
+    });
+});
+
+// Rota para enfileirar envios: recebe uma lista de trabalhos {number, message, mediaIds, caption}
+// e responde 202 com os identificadores na mesma ordem, sem esperar os envios
+app.post('/api/jobs', (req, res) => {
+    const items = req.body.jobs;
+    
+    if (!clientReady) {
+        return res.status(400).json({ error: 'Cliente WhatsApp não está pronto' });
+    }
+    
+    if (!Array.isArray(items) || items.length === 0) {
+        return res.status(400).json({ error: 'Lista de trabalhos é obrigatória' });
+    }
+    
+    const invalid = items.findIndex(item => !item || !item.number || (!item.message && (item.mediaIds || []).length === 0));
+    if (invalid >= 0) {
+        return res.status(400).json({ error: 'Número e mensagem são obrigatórios', index: invalid });
+    }
+    
+    const missing = [...new Set(items.flatMap(item => item.mediaIds || []))].filter(id => !mediaCache.has(id));
+    if (missing.length > 0) {
+        return res.status(404).json({ error: 'Mídia não encontrada', mediaIds: missing });
+    }
+    
+    if (rejectIfQueueFull(res, items.length)) {
+        return;
+    }
+    
+    const accepted = items.map(item => {
+        const job = enqueueJob('job', item.number, jobSteps(item));
+        return { id: job.id, status: job.status };
+    });
+    jobLog.info('Trabalhos enfileirados', { accepted: accepted.length, queued: queuedJobs, running: runningJobs });
+    res.status(202).json({ success: true, jobs: accepted });
+});
+
+// Rota de status em lote: recebe {ids, waitMs}. Com waitMs, se nenhum dos trabalhos
+// tiver terminado, espera até um terminar (ou o tempo acabar) antes de responder
+app.post('/api/jobs/status', (req, res) => {
+    const ids = Array.isArray(req.body.ids) ? req.body.ids.map(String) : [];
+    const waitMs = Math.min(Math.max(parseInt(req.body.waitMs, 10) || 0, 0), MAX_STATUS_WAIT_MS);
+    
+    const respond = () => res.json({
+        jobs: ids.map(id => (jobs.has(id) ? serializeJob(jobs.get(id)) : { id, status: 'unknown', error: 'Trabalho não encontrado' })),
+        queued: queuedJobs,
+        running: runningJobs,
+    });
+    
+    const anyFinished = ids.some(id => !jobs.has(id) || FINAL_JOB_STATES.has(jobs.get(id).status));
+    if (waitMs === 0 || ids.length === 0 || anyFinished) {
+        return respond();
+    }
+    
+    const wanted = new Set(ids);
+    const done = () => {
+        clearTimeout(timer);
+        jobWaiters.delete(waiter);
+        if (!res.writableEnded) {
+            respond();
+        }
+    };
+    const waiter = (job) => {
+        if (wanted.has(job.id)) {
+            done();
+        }
+    };
+    const timer = setTimeout(done, waitMs);
+    jobWaiters.add(waiter);
+    req.on('close', () => {
+        clearTimeout(timer);
+        jobWaiters.delete(waiter);
+    });
+});
+
+// Rota de status de um trabalho
+app.get('/api/jobs/:jobId', (req, res) => {
+    const job = jobs.get(req.params.jobId);
+    if (!job) {
+        return res.status(404).json({ error: 'Trabalho não encontrado' });
+    }
+    res.json(serializeJob(job));
+});
+
+// Rota para cancelar trabalhos que ainda não começaram
+app.post('/api/jobs/cancel', (req, res) => {
+    const ids = Array.isArray(req.body.ids) ? req.body.ids.map(String) : [];
+    let canceled = 0;
+    for (const id of ids) {
+        const job = jobs.get(id);
+        if (job && cancelJob(job)) {
+            canceled++;
+        }
+    }
+    jobLog.info('Trabalhos cancelados', { requested: ids.length, canceled });
+    pumpJobs();
+    res.json({ success: true, canceled });
+});
+
+// Rota de métricas no formato de texto do Prometheus
+app.get('/api/metrics', (req, res) => {
+    const memoryUsage = process.memoryUsage();
+    const lines = [
+        ...renderHistogram(sendDuration),
+        '# HELP wpp_server_send_failures_total Falhas de client.sendMessage, por tipo de envio',
+        '# TYPE wpp_server_send_failures_total counter',
+        ...[...sendFailures].map(([type, count]) => `wpp_server_send_failures_total{type="${type}"} ${count}`),
+        ...renderHistogram(uploadSize),
+        ...renderHistogram(jobQueueWait),
+        '# HELP wpp_server_jobs Trabalhos na fila de envios, por estado',
+        '# TYPE wpp_server_jobs gauge',
+        `wpp_server_jobs{state="queued"} ${queuedJobs}`,
+        `wpp_server_jobs{state="running"} ${runningJobs}`,
+        '# HELP wpp_server_jobs_finished_total Trabalhos finalizados, por estado final',
+        '# TYPE wpp_server_jobs_finished_total counter',
+        ...[...jobsFinished].map(([status, count]) => `wpp_server_jobs_finished_total{status="${status}"} ${count}`),
+        '# HELP wpp_server_send_concurrency Limite de envios simultâneos (SEND_CONCURRENCY)',
+        '# TYPE wpp_server_send_concurrency gauge',
+        `wpp_server_send_concurrency ${SEND_CONCURRENCY}`,
+        '# HELP wpp_server_memory_bytes Memória do processo Node.js, por área',
+        '# TYPE wpp_server_memory_bytes gauge',
+        `wpp_server_memory_bytes{area="rss"} ${memoryUsage.rss}`,
+        `wpp_server_memory_bytes{area="heap_total"} ${memoryUsage.heapTotal}`,
+        `wpp_server_memory_bytes{area="heap_used"} ${memoryUsage.heapUsed}`,
+        `wpp_server_memory_bytes{area="external"} ${memoryUsage.external}`,
+        '# HELP wpp_server_media_cache_bytes Bytes ocupados pelo cache de mídias',
+        '# TYPE wpp_server_media_cache_bytes gauge',
+        `wpp_server_media_cache_bytes ${mediaCacheBytes}`,
+        '# HELP wpp_server_media_cache_entries Mídias no cache',
+        '# TYPE wpp_server_media_cache_entries gauge',
+        `wpp_server_media_cache_entries ${mediaCache.size}`,
+        '# HELP wpp_server_client_ready Cliente WhatsApp pronto (1) ou não (0)',
+        '# TYPE wpp_server_client_ready gauge',
+        `wpp_server_client_ready ${clientReady ? 1 : 0}`,
+    ];
+    res.type('text/plain; version=0.0.4; charset=utf-8').send(lines.join('\n') + '\n');
+});
+
 // Lista de códigos de país comuns e seus tamanhos de número
 const countryCodes = {
     '1': { name: 'EUA/Canadá', lengths: [10] }, // EUA/Canadá: +1 e 10 dígitos
@@ -312,6 +979,11 @@ const countryCodes = {
     '81': { name: 'Japão', lengths: [10, 11] }, // Japão: +81 e 10-11 dígitos
 };
 
+// formatPhoneNumber roda uma vez por número (lotes de análise e cada envio): com
+// LOG_LEVELS=phone=debug, grava 1 a cada PHONE_LOG_SAMPLE linhas (LOG_SAMPLE=phone=1 grava todas)
+const PHONE_LOG_SAMPLE = 1000;
+const phoneSampleLog = phoneLog.sample(PHONE_LOG_SAMPLE);
+
 // Função melhorada para formatar número de telefone internacional
 function formatPhoneNumber(number) {
     // Remove todos os caracteres que não são dígitos
@@ -330,20 +1002,20 @@ function formatPhoneNumber(number) {
     if (!countryCode) {
         // Se tiver 8-9 dígitos sem DDD, assume que é brasileiro e adiciona 55 + um DDD padrão (11)
         if (cleaned.length <= 9) {
-            console.log(`Número curto detectado: ${cleaned}. Adicionando código do Brasil (55) e DDD padrão.`);
+            phoneSampleLog.debug('Número curto detectado. Adicionando código do Brasil (55) e DDD padrão.', { number: cleaned });
             cleaned = '5511' + cleaned;
         } 
         // Se tiver 10-11 dígitos (número brasileiro típico com DDD), adiciona só o 55
         else if (cleaned.length >= 10 && cleaned.length <= 11) {
-            console.log(`Número sem código de país detectado: ${cleaned}. Adicionando código do Brasil (55).`);
+            phoneSampleLog.debug('Número sem código de país detectado. Adicionando código do Brasil (55).', { number: cleaned });
             cleaned = '55' + cleaned;
         }
         // Se for maior, assume que já tem o código mas não foi reconhecido
         else {
-            console.log(`Número longo não reconhecido: ${cleaned}. Mantendo original.`);
+            phoneSampleLog.debug('Número longo não reconhecido. Mantendo original.', { number: cleaned });
         }
     } else {
-        console.log(`Código de país detectado: +${countryCode} (${countryCodes[countryCode].name})`);
+        phoneSampleLog.debug('Código de país detectado', { code: countryCode, country: countryCodes[countryCode].name });
     }
     
     return cleaned;
@@ -352,7 +1024,7 @@ function formatPhoneNumber(number) {
 // Rota para analisar um número e retornar informações do país
 app.post('/api/analyze-number', (req, res) => {
     const { number } = req.body;
-    console.log(`Recebida solicitação para analisar número: ${number}`);
+    phoneLog.debug('Recebida solicitação para analisar número', { number });
     
     if (!number) {
         return res.status(400).json({ error: 'Número é obrigatório' });
@@ -381,7 +1053,7 @@ app.post('/api/analyze-number', (req, res) => {
             formattedNumber: formatPhoneNumber(number)
         });
     } catch (error) {
-        console.error('Erro ao analisar número:', error);
+        phoneLog.error('Erro ao analisar número', { err: error });
         res.status(500).json({ error: 'Erro ao analisar número', details: error.message });
     }
 });
@@ -389,7 +1061,7 @@ app.post('/api/analyze-number', (req, res) => {
 // Rota para analisar todos os números de um lote
 app.post('/api/analyze-batch', (req, res) => {
     const { numbers } = req.body;
-    console.log(`Recebida solicitação para analisar lote de ${numbers ? numbers.length : 0} números`);
+    const started = process.hrtime.bigint();
     
     if (!numbers || !Array.isArray(numbers)) {
         return res.status(400).json({ error: 'Lista de números é obrigatória' });
@@ -429,16 +1101,23 @@ app.post('/api/analyze-batch', (req, res) => {
             countryStats[country]++;
         });
         
+        const formatted = results.filter(r => r.countryInfo.isFormatted).length;
         res.json({
             results: results,
             stats: {
                 total: results.length,
-                formatted: results.filter(r => r.countryInfo.isFormatted).length,
+                formatted: formatted,
                 byCountry: countryStats
             }
         });
+        // Uma linha por requisição; as linhas por número ficam em debug (amostradas)
+        phoneLog.info('Lote de números analisado', {
+            count: results.length,
+            formatted,
+            ms: Math.round(Number(process.hrtime.bigint() - started) / 1e5) / 10,
+        });
     } catch (error) {
-        console.error('Erro ao analisar lote de números:', error);
+        phoneLog.error('Erro ao analisar lote de números', { count: numbers.length, err: error });
         res.status(500).json({ error: 'Erro ao analisar lote de números', details: error.message });
     }
 });
@@ -446,7 +1125,7 @@ app.post('/api/analyze-batch', (req, res) => {
 // Rota para reiniciar a sessão do WhatsApp
 app.post('/api/reset-session', async (req, res) => {
     try {
-        console.log('Solicitação para reiniciar sessão do WhatsApp recebida');
+        waLog.info('Solicitação para reiniciar sessão do WhatsApp recebida');
         
         // Informa que vamos encerrar a sessão atual
         clientReady = false;
@@ -454,9 +1133,9 @@ app.post('/api/reset-session', async (req, res) => {
         // Tenta desconectar o cliente atual
         try {
             await client.destroy();
-            console.log('Cliente destruído com sucesso');
+            waLog.info('Cliente destruído com sucesso');
         } catch (destroyError) {
-            console.log('Erro ao destruir cliente:', destroyError);
+            waLog.warn('Erro ao destruir cliente', { err: destroyError });
             // Continuamos mesmo com erro, pois vamos recriar o cliente de qualquer forma
         }
         
@@ -482,24 +1161,25 @@ app.post('/api/reset-session', async (req, res) => {
                 };
                 
                 deleteFolderRecursive(authFolder);
-                console.log('Pasta de autenticação removida com sucesso');
+                waLog.info('Pasta de autenticação removida com sucesso');
             }
         } catch (fsError) {
-            console.log('Erro ao remover pasta de autenticação:', fsError);
+            waLog.warn('Erro ao remover pasta de autenticação', { err: fsError });
             // Continuamos mesmo com erro
         }
         
         // Reinicia as variáveis globais
         clientReady = false;
         qrData = null;
+        publishEvent('status', { ready: false, qrCode: false });
         
         // Cria e inicializa um novo cliente
         client.initialize();
-        console.log('Novo cliente inicializado, aguardando QR code');
+        waLog.info('Novo cliente inicializado, aguardando QR code');
         
         res.json({ success: true, message: 'Sessão reiniciada com sucesso' });
     } catch (error) {
-        console.error('Erro ao reiniciar sessão:', error);
+        waLog.error('Erro ao reiniciar sessão', { err: error });
         res.status(500).json({ error: 'Falha ao reiniciar sessão', details: error.message });
     }
 });
@@ -507,36 +1187,36 @@ app.post('/api/reset-session', async (req, res) => {
 // Função que tenta iniciar o servidor em uma porta, com fallback para portas alternativas
 function startServer(portToUse) {
     const server = app.listen(portToUse, () => {
-        console.log(`Servidor rodando em http://localhost:${portToUse}`);
+        log.info(`Servidor rodando em http://localhost:${portToUse}`);
         // Salva a porta atual para que o cliente saiba onde conectar
         fs.writeFileSync('server_port.txt', portToUse.toString());
     });
 
     server.on('error', (error) => {
         if (error.code === 'EADDRINUSE') {
-            console.error(`A porta ${portToUse} já está em uso. Tentando outra porta...`);
+            log.warn(`A porta ${portToUse} já está em uso. Tentando outra porta...`);
             
             // Se for a porta padrão, tenta usar portas alternativas
             if (ALTERNATIVE_PORTS.length > 0) {
                 const nextPort = ALTERNATIVE_PORTS.shift();
-                console.log(`Tentando porta alternativa: ${nextPort}`);
+                log.info(`Tentando porta alternativa: ${nextPort}`);
                 startServer(nextPort);
             } else {
-                console.error('Todas as portas alternativas estão em uso. Não foi possível iniciar o servidor.');
+                log.error('Todas as portas alternativas estão em uso. Não foi possível iniciar o servidor.');
                 process.exit(1);
             }
         } else {
-            console.error('Erro no servidor HTTP:', error);
+            log.error('Erro no servidor HTTP', { err: error });
         }
     });
 
     // Monitoramento de memória para diagnóstico
     setInterval(() => {
         const memoryUsage = process.memoryUsage();
-        console.log('Uso de memória:', {
-            rss: `${Math.round(memoryUsage.rss / 1024 / 1024)} MB`,
-            heapTotal: `${Math.round(memoryUsage.heapTotal / 1024 / 1024)} MB`,
-            heapUsed: `${Math.round(memoryUsage.heapUsed / 1024 / 1024)} MB`
+        log.debug('Uso de memória', {
+            rssMb: Math.round(memoryUsage.rss / 1024 / 1024),
+            heapTotalMb: Math.round(memoryUsage.heapTotal / 1024 / 1024),
+            heapUsedMb: Math.round(memoryUsage.heapUsed / 1024 / 1024),
         });
     }, 60000); // Registra uso de memória a cada minuto
 }
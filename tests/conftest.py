@@ -0,0 +1,35 @@
+# conftest.py - Os módulos do cliente são importados pelo nome, como em client/
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "client"))
+
+
+class FakeClock:
+    """Relógio controlado pelo teste: asyncio.sleep avança o tempo sem esperar."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(request, monkeypatch):
+    """
+    Substitui o relógio do módulo em teste, indicado por CLOCK_MODULE no arquivo de teste.
+
+    Troca time.monotonic e, se o módulo usar asyncio, também asyncio.sleep.
+    """
+    module = request.module.CLOCK_MODULE
+    clock = FakeClock()
+    monkeypatch.setattr(module.time, "monotonic", clock.monotonic)
+    if hasattr(module, "asyncio"):
+        monkeypatch.setattr(module.asyncio, "sleep", clock.sleep)
+    return clock
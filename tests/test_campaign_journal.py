@@ -0,0 +1,113 @@
+# test_campaign_journal.py - Registro, retomada e reinício do diário de campanha
+import os
+
+import pytest
+
+from campaign_journal import JOURNAL_FILE, CampaignJournal, campaign_key
+
+
+@pytest.fixture
+def journal_dir(tmp_path):
+    return str(tmp_path / "campanha")
+
+
+def test_resume_from_checkpoint(journal_dir):
+    journal = CampaignJournal(journal_dir, total=10)
+    journal.record(1, "+55 (11) 99999-0001", True)
+    journal.record(3, "5511999990003", False, "número inválido")
+    journal.close()
+
+    resumed = CampaignJournal(journal_dir, total=10)
+
+    assert (resumed.successful, resumed.failed, resumed.done_count) == (1, 1, 2)
+    assert [i for i in range(1, 11) if resumed.is_done(i)] == [1, 3]
+    assert list(resumed.iter_results()) == [(1, "5511999990001", True), (3, "5511999990003", False)]
+    resumed.close()
+
+
+def test_resume_replays_lines_after_checkpoint(journal_dir):
+    journal = CampaignJournal(journal_dir, total=5, checkpoint_interval=3600)
+    journal.record(1, "1", True)
+    journal.checkpoint()
+    journal.record(2, "2", True)
+    journal.record(4, "4", False)
+    journal.sync()  # Queda sem close: o bitmap salvo só cobre o primeiro registro
+
+    resumed = CampaignJournal(journal_dir, total=5)
+
+    assert resumed.done_count == 3
+    assert [i for i in range(1, 6) if resumed.is_done(i)] == [1, 2, 4]
+    resumed.close()
+    journal._file.close()
+
+
+def test_incomplete_line_is_discarded(journal_dir):
+    journal = CampaignJournal(journal_dir, total=5)
+    journal.record(1, "1", True)
+    journal.close()
+    with open(os.path.join(journal_dir, JOURNAL_FILE), "ab") as f:
+        f.write(b"2\t2\to")
+
+    resumed = CampaignJournal(journal_dir, total=5)
+    resumed.record(3, "3", True)
+    resumed.close()
+
+    assert list(CampaignJournal(journal_dir, total=5).iter_results()) == [(1, "1", True), (3, "3", True)]
+
+
+def test_repeated_and_out_of_range_indexes_are_counted_once(journal_dir):
+    journal = CampaignJournal(journal_dir, total=3)
+    journal.record(2, "2", False)
+    journal.record(2, "2", True)
+    journal.record(0, "0", True)
+    journal.record(4, "4", True)
+
+    assert (journal.successful, journal.failed) == (0, 1)
+    assert not journal.is_done(0) and not journal.is_done(4)
+    journal.close()
+
+
+def test_reset_clears_progress(journal_dir):
+    journal = CampaignJournal(journal_dir, total=4)
+    for index in range(1, 5):
+        journal.record(index, str(index), True)
+    journal.reset()
+    journal.record(2, "2", True)
+    journal.close()
+
+    resumed = CampaignJournal(journal_dir, total=4)
+
+    assert resumed.done_count == 1
+    assert [i for i in range(1, 5) if resumed.is_done(i)] == [2]
+    assert list(resumed.iter_results()) == [(2, "2", True)]
+    resumed.close()
+
+
+def test_changed_total_starts_over(journal_dir):
+    journal = CampaignJournal(journal_dir, total=3)
+    journal.record(1, "1", True)
+    journal.close()
+
+    # O bitmap de outra quantidade de contatos é ignorado; o diário é relido do início
+    resumed = CampaignJournal(journal_dir, total=20)
+
+    assert resumed.done_count == 1 and resumed.is_done(1)
+    resumed.close()
+
+
+def test_open_uses_campaign_key(tmp_path):
+    contacts_path = tmp_path / "contatos.csv"
+    contacts_path.write_text("telefone\n1\n2\n", encoding="utf-8")
+    base_dir = str(tmp_path / "campaigns")
+
+    first = CampaignJournal.open(str(contacts_path), "Olá", [], total=2, base_dir=base_dir)
+    first.record(1, "1", True)
+    first.close()
+    same = CampaignJournal.open(str(contacts_path), "Olá", [], total=2, base_dir=base_dir)
+    other = CampaignJournal.open(str(contacts_path), "Olá", [], total=1, contacts=["2"], base_dir=base_dir)
+
+    assert same.directory == first.directory and same.done_count == 1
+    assert other.directory != first.directory and other.done_count == 0
+    assert campaign_key(str(contacts_path), "Olá", []) != campaign_key(str(contacts_path), "Oi", [])
+    same.close()
+    other.close()
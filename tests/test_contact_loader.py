@@ -0,0 +1,76 @@
+# test_contact_loader.py - Leitura em blocos de CSV/XLSX e contagem de linhas
+import pytest
+
+import contact_loader
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_iter_contacts_reads_first_column_across_chunks(tmp_path):
+    rows = "".join(f"55119{i:08d},nome {i}\n" for i in range(25))
+    file_path = write(tmp_path / "contatos.csv", "telefone,nome\n" + rows)
+
+    contacts = list(contact_loader.iter_contacts(file_path, chunksize=7))
+
+    assert contacts == [f"55119{i:08d}" for i in range(25)]
+
+
+def test_iter_contacts_keeps_numbers_as_text_and_skips_blanks(tmp_path):
+    file_path = write(tmp_path / "contatos.csv", "telefone\n0011 2222\n\n   \n 5511999990000 \n")
+
+    assert list(contact_loader.iter_contacts(file_path)) == ["0011 2222", "5511999990000"]
+
+
+def test_phone_column_by_name_and_without_header(tmp_path):
+    file_path = write(tmp_path / "contatos.csv", "nome,telefone\nAna,111\nBia,222\n")
+    assert list(contact_loader.iter_contacts(file_path, phone_column="telefone")) == ["111", "222"]
+
+    no_header = write(tmp_path / "sem_cabecalho.csv", "111,Ana\n222,Bia\n")
+    assert list(contact_loader.iter_contacts(no_header, header=False)) == ["111", "222"]
+
+
+def test_unknown_column_and_file_type_are_rejected(tmp_path):
+    file_path = write(tmp_path / "contatos.csv", "nome,telefone\nAna,111\n")
+    with pytest.raises(ValueError):
+        list(contact_loader.iter_contacts(file_path, phone_column="celular"))
+    with pytest.raises(ValueError):
+        list(contact_loader.iter_contacts(write(tmp_path / "contatos.txt", "111\n")))
+
+
+def test_progress_reaches_one(tmp_path):
+    file_path = write(tmp_path / "contatos.csv", "telefone\n" + "".join(f"{i}\n" for i in range(100)))
+    progress = []
+
+    contact_loader.load_contacts(file_path, chunksize=10, on_progress=progress.append)
+
+    assert progress == sorted(progress)
+    assert progress[-1] == 1.0
+
+
+def test_xlsx_is_read_in_chunks(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["telefone", "nome"])
+    for i in range(5):
+        sheet.append([f"5511{i}", f"nome {i}"])
+    sheet.append([None, "sem telefone"])
+    file_path = str(tmp_path / "contatos.xlsx")
+    workbook.save(file_path)
+
+    assert contact_loader.load_contacts(file_path, chunksize=2) == [f"5511{i}" for i in range(5)]
+
+
+@pytest.mark.parametrize("text, header, expected", [
+    ("telefone\n1\n2\n3\n", True, 3),
+    ("telefone\n1\n2\n3", True, 3),   # Sem quebra de linha no final
+    ("1\n2\n", False, 2),
+    ("telefone\n", True, 0),
+    ("", True, 0),
+])
+def test_count_rows(tmp_path, text, header, expected):
+    file_path = write(tmp_path / "contatos.csv", text)
+    assert contact_loader.count_rows(file_path, header=header) == expected
@@ -0,0 +1,118 @@
+# test_pacing.py - TokenBucket com relógio simulado e controle AIMD
+import asyncio
+
+import pytest
+
+import pacing
+from pacing import AimdController, TokenBucket
+
+# Relógio substituído pelo fixture clock (tests/conftest.py)
+CLOCK_MODULE = pacing
+
+
+def acquire_times(bucket, clock, count):
+    """Instante (relativo ao início) em que cada um dos `count` tokens foi obtido."""
+    start = clock.now
+
+    async def run():
+        times = []
+        for _ in range(count):
+            assert await bucket.acquire()
+            times.append(round(clock.now - start, 6))
+        return times
+
+    return asyncio.run(run())
+
+
+def test_first_token_is_immediate_and_rest_follow_rate(clock):
+    bucket = TokenBucket(60)  # 1 por segundo
+    assert acquire_times(bucket, clock, 4) == [0, 1, 2, 3]
+
+
+def test_capacity_allows_burst(clock):
+    bucket = TokenBucket(60, capacity=3)
+    assert acquire_times(bucket, clock, 4) == [0, 0, 0, 1]
+
+
+def test_tokens_do_not_accumulate_beyond_capacity(clock):
+    bucket = TokenBucket(60, capacity=2)
+    clock.now += 3600
+    assert acquire_times(bucket, clock, 3) == [0, 0, 1]
+
+
+def test_set_rate_keeps_accumulated_tokens(clock):
+    bucket = TokenBucket(60)
+    acquire_times(bucket, clock, 1)
+    clock.now += 0.5  # Meio token acumulado
+    bucket.set_rate(30)  # Agora 1 token a cada 2 segundos
+    assert bucket.rate_per_minute == pytest.approx(30)
+    assert acquire_times(bucket, clock, 1) == [1]
+
+
+def test_jitter_delays_next_token(clock, monkeypatch):
+    monkeypatch.setattr(pacing.random, "uniform", lambda low, high: high)
+    bucket = TokenBucket(60, jitter=(1, 2))
+    assert acquire_times(bucket, clock, 2) == [0, 3]
+
+
+def test_acquire_gives_up_when_stopped(clock):
+    bucket = TokenBucket(60)
+    acquire_times(bucket, clock, 1)
+    assert asyncio.run(bucket.acquire(lambda: False)) is False
+
+
+def make_controller(**kwargs):
+    changes = []
+    kwargs.setdefault("window", 3)
+    controller = AimdController(TokenBucket(60), ceiling_per_minute=20, on_change=lambda rate, reason: changes.append(rate),
+                                **kwargs)
+    return controller, changes
+
+
+def test_aimd_starts_at_half_the_ceiling():
+    controller, changes = make_controller()
+    assert controller.rate_per_minute == pytest.approx(10)
+    assert changes == [10]
+
+
+def test_aimd_increases_after_healthy_window_up_to_ceiling():
+    controller, changes = make_controller(initial_per_minute=17)
+    for _ in range(9):
+        controller.observe(True, 1.0)
+    assert changes == [17, 19, 20, 20]
+    assert controller.reason == "No limite configurado"
+
+    # Já no teto, novas janelas saudáveis não geram ajustes repetidos
+    for _ in range(6):
+        controller.observe(True, 1.0)
+    assert changes == [17, 19, 20, 20]
+
+
+def test_aimd_failure_halves_rate_and_waits_a_window():
+    controller, changes = make_controller()
+    controller.observe(False)
+    assert controller.rate_per_minute == pytest.approx(5)
+
+    # Falhas de envios já em andamento durante a carência não reduzem de novo
+    for _ in range(3):
+        controller.observe(False)
+    assert controller.rate_per_minute == pytest.approx(5)
+
+    controller.observe(False)
+    assert changes == [10, 5, 2.5]
+
+
+def test_aimd_never_goes_below_floor():
+    controller, _ = make_controller(window=1, floor_per_minute=4)
+    for _ in range(10):
+        controller.observe(False)
+    assert controller.rate_per_minute == pytest.approx(4)
+
+
+def test_aimd_reduces_on_latency_spike():
+    controller, _ = make_controller()
+    controller.observe(True, 1.0)
+    controller.observe(True, 1.0)
+    controller.observe(True, 20.0)  # Média móvel vai a 4.8s, acima de 2x a referência
+    assert controller.rate_per_minute == pytest.approx(5)
+    assert controller.reason.startswith("Reduzindo: Latência em alta")
@@ -0,0 +1,122 @@
+# test_phone_numbers.py - Normalização local igual à do servidor (formatPhoneNumber e /api/analyze-batch)
+import random
+import re
+
+import numpy as np
+import pytest
+
+import phone_numbers
+
+
+def js_format(number):
+    """Reimplementação direta do formatPhoneNumber do server.js."""
+    cleaned = re.sub(r"\D", "", number)
+    # for...in do JavaScript: chaves numéricas em ordem crescente
+    for code in sorted(phone_numbers.COUNTRY_CODES, key=int):
+        if cleaned.startswith(code):
+            return cleaned
+    if len(cleaned) <= 9:
+        return "5511" + cleaned
+    if len(cleaned) <= 11:
+        return "55" + cleaned
+    return cleaned
+
+
+# Respostas de /api/analyze-batch do server.js para estes números:
+# (original, cleaned, code, country, formattedNumber)
+SERVER_RESULTS = [
+    ("99999-0000", "999990000", None, "Desconhecido", "5511999990000"),
+    ("(21) 99999-0000", "21999990000", None, "Desconhecido", "5521999990000"),
+    ("2133334444", "2133334444", None, "Desconhecido", "552133334444"),
+    ("+1 (415) 555-0100", "14155550100", "1", "EUA/Canadá", "14155550100"),
+    ("11 99999-0000", "11999990000", "1", "EUA/Canadá", "11999990000"),
+    ("+44 20 7946 0958", "442079460958", "44", "Reino Unido", "442079460958"),
+    ("+351 912 345 678", "351912345678", "351", "Portugal", "351912345678"),
+    ("+55 21 99999-0000", "5521999990000", "55", "Brasil", "5521999990000"),
+    ("+61 4 1234 5678", "61412345678", "61", "Austrália", "61412345678"),
+    ("+81 90-1234-5678", "819012345678", "81", "Japão", "819012345678"),
+    ("2345678901234", "2345678901234", None, "Desconhecido", "2345678901234"),
+    ("sem número", "", None, "Desconhecido", "5511"),
+    ("٩١١٢٣٤٥٦٧٨٩", "", None, "Desconhecido", "5511"),  # /\D/ do JavaScript só aceita dígitos ASCII
+]
+
+
+def test_analyze_batch_matches_server():
+    results, stats = phone_numbers.analyze_batch([row[0] for row in SERVER_RESULTS])
+
+    assert list(results.itertuples(index=False, name=None)) == [
+        (original, cleaned, code, country, code is not None, formatted)
+        for original, cleaned, code, country, formatted in SERVER_RESULTS
+    ]
+    assert stats == {
+        "total": 13,
+        "formatted": 7,
+        "byCountry": {"Desconhecido": 6, "EUA/Canadá": 2, "Reino Unido": 1, "Portugal": 1,
+                      "Brasil": 1, "Austrália": 1, "Japão": 1},
+    }
+
+
+@pytest.mark.parametrize("original, cleaned, code, country, formatted", SERVER_RESULTS)
+def test_analyze_number_and_format_match_server(original, cleaned, code, country, formatted):
+    assert phone_numbers.analyze_number(original) == {
+        "original": original,
+        "cleaned": cleaned,
+        "countryInfo": {"code": code, "country": country, "isFormatted": code is not None},
+        "formattedNumber": formatted,
+    }
+    assert phone_numbers.format_phone_number(original) == formatted
+
+
+def test_format_phone_numbers_keeps_order():
+    numbers = [row[0] for row in SERVER_RESULTS]
+    assert phone_numbers.format_phone_numbers(numbers) == [row[4] for row in SERVER_RESULTS]
+
+
+def generated_numbers(count=2000, seed=7):
+    rng = random.Random(seed)
+    numbers = []
+    for _ in range(count):
+        digits = "".join(rng.choice("0123456789") for _ in range(rng.randint(1, 18)))
+        # Pontuação variada, como nas planilhas reais
+        numbers.append(rng.choice(("", "+", "(")) + digits[:2] + rng.choice(("", " ", ") ", "-")) + digits[2:])
+    return numbers
+
+
+@pytest.mark.parametrize("number, expected", [
+    ("999990000", 5511999990000),       # Sem DDD
+    ("(21) 99999-0000", 5521999990000),  # Com DDD
+    ("+1 415 555 0100", 14155550100),   # EUA: '1' vem antes de todos
+    ("+44 20 7946 0958", 442079460958),
+    ("351912345678", 351912345678),     # '351' só é testado depois de '1', '44', '55', '61' e '81'
+    ("5511999990000", 5511999990000),
+    ("2345678901234", 2345678901234),   # Longo sem código: mantém
+])
+def test_phone_keys_known_numbers(number, expected):
+    assert phone_numbers.phone_keys([number])[0] == expected
+
+
+def test_phone_keys_match_js_order():
+    numbers = generated_numbers()
+
+    keys = phone_numbers.phone_keys(numbers, chunk_size=300)
+
+    assert keys.tolist() == [int(js_format(n)) for n in numbers]
+
+
+def test_phone_keys_match_format_phone_number():
+    numbers = generated_numbers(seed=11)
+
+    expected = [int(phone_numbers.format_phone_number(n)) for n in numbers]
+
+    assert phone_numbers.phone_keys(numbers).tolist() == expected
+
+
+def test_phone_keys_invalid_numbers():
+    keys = phone_numbers.phone_keys(["", "sem número", "1" * 19, "234"])
+
+    assert keys.dtype == np.int64
+    assert keys.tolist() == [-1, -1, -1, 5511234]
+
+
+def test_phone_keys_accepts_non_string_values():
+    assert phone_numbers.phone_keys([5511999990000, 21999990000]).tolist() == [5511999990000, 5521999990000]
@@ -0,0 +1,58 @@
+# test_retry_policy.py - Classificação de falhas e espera entre tentativas
+import pytest
+
+import retry_policy
+from retry_policy import NOT_READY, PERMANENT, TRANSIENT, RetryPolicy, classify
+
+
+@pytest.mark.parametrize("status, error, expected", [
+    (None, "Cannot connect to host localhost:3000", TRANSIENT),
+    (None, "", TRANSIENT),
+    (500, "Erro interno", TRANSIENT),
+    (503, None, TRANSIENT),
+    (408, "", TRANSIENT),
+    (429, "Fila de envios cheia", TRANSIENT),
+    (400, "Número e mensagem são obrigatórios", PERMANENT),
+    (404, "", PERMANENT),
+    (500, "Error: wid error: invalid wid", PERMANENT),
+    (500, "Número não registrado no WhatsApp", PERMANENT),
+    # O servidor responde 400 quando não está pronto: a mensagem tem prioridade sobre o status
+    (400, "Cliente WhatsApp não está pronto", NOT_READY),
+    (500, "Protocol error: Session closed. Most likely the page has been closed.", NOT_READY),
+    (None, "Target closed", NOT_READY),
+])
+def test_classify(status, error, expected):
+    assert classify(status, error) == expected
+
+
+def test_should_retry_respects_category_and_attempts():
+    policy = RetryPolicy(max_attempts=3)
+
+    assert policy.should_retry(TRANSIENT, 1)
+    assert policy.should_retry(NOT_READY, 2)
+    assert not policy.should_retry(TRANSIENT, 3)
+    assert not policy.should_retry(PERMANENT, 1)
+    assert not RetryPolicy(max_attempts=0).should_retry(TRANSIENT, 1)
+
+
+@pytest.mark.parametrize("attempt, low, high", [
+    (1, 1.0, 2.0),
+    (2, 2.0, 4.0),
+    (3, 4.0, 8.0),
+    (10, 5.0, 10.0),  # Limitado por max_delay
+])
+def test_delay_grows_exponentially_with_half_jitter(monkeypatch, attempt, low, high):
+    policy = RetryPolicy(base_delay=2.0, max_delay=10.0)
+
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda a, b: a)
+    assert policy.delay(TRANSIENT, attempt) == pytest.approx(low)
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda a, b: b)
+    assert policy.delay(TRANSIENT, attempt) == pytest.approx(high)
+
+
+def test_delay_waits_longer_when_not_ready(monkeypatch):
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda a, b: b)
+    policy = RetryPolicy(base_delay=2.0, max_delay=60.0, not_ready_delay=15.0)
+
+    assert policy.delay(NOT_READY, 1) == pytest.approx(15.0)
+    assert policy.delay(NOT_READY, 5) == pytest.approx(32.0)
@@ -0,0 +1,85 @@
+# test_send_stats.py - Histograma de latência, janela de erros e vazão da campanha
+import pytest
+
+import send_stats
+from send_stats import FILE, TEXT, ErrorWindow, LatencyHistogram, SendStats
+
+# Relógio substituído pelo fixture clock (tests/conftest.py)
+CLOCK_MODULE = send_stats
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = LatencyHistogram()
+    values = [i / 100 for i in range(1, 1001)]  # 0.01s a 10s
+    for value in values:
+        histogram.record(value)
+
+    for p in (50, 95, 99):
+        exact = values[int(len(values) * p / 100) - 1]
+        assert histogram.percentile(p) == pytest.approx(exact, rel=0.05)
+    assert histogram.count == 1000
+    assert histogram.mean == pytest.approx(sum(values) / 1000)
+    assert histogram.percentile(100) <= histogram.max == 10.0
+
+
+def test_histogram_edges():
+    histogram = LatencyHistogram(max_value=1.0)
+    assert histogram.percentile(50) is None and histogram.mean is None
+
+    histogram.record(0.0)
+    assert histogram.percentile(50) == 0.0  # Nunca maior que o maior valor visto
+
+    histogram.record(50.0)  # Acima de max_value: último balde
+    assert histogram.percentile(100) <= 50.0
+
+
+def test_error_window_forgets_old_seconds():
+    window = ErrorWindow(60)
+    assert window.rate(now=0) is None
+
+    window.record(False, now=100)
+    window.record(True, now=100)
+    window.record(True, now=130)
+    assert window.rate(now=130) == pytest.approx(1 / 3)
+
+    # O segundo 100 saiu da janela; o 130 continua
+    assert window.rate(now=165) == 0.0
+    # O mesmo balde reaproveitado 60 segundos depois começa zerado
+    window.record(True, now=160)
+    assert window.rate(now=160) == 0.0
+
+
+def test_throughput_and_eta(clock):
+    stats = SendStats(total=10, alpha=0.5)
+    assert stats.throughput is None and stats.eta() is None
+
+    clock.now += 2
+    stats.record_result(True)
+    assert stats.throughput == pytest.approx(30)
+    assert stats.eta() == pytest.approx(9 * 2)
+
+    clock.now += 4
+    stats.record_result(False)
+    # Média móvel: 2 + 0.5 * (4 - 2) = 3 segundos por contato
+    assert stats.throughput == pytest.approx(20)
+    assert stats.eta() == pytest.approx(8 * 3)
+
+
+def test_snapshot(clock):
+    stats = SendStats(total=4)
+    stats.skipped = 1
+    stats.record_step(TEXT, 0.5)
+    stats.record_step(FILE, 2.0)
+    for success in (True, True, False):
+        clock.now += 1
+        stats.record_result(success)
+
+    snapshot = stats.snapshot()
+
+    assert (snapshot["done"], snapshot["successful"], snapshot["failed"], snapshot["skipped"]) == (4, 2, 1, 1)
+    assert snapshot["success_rate"] == pytest.approx(2 / 3)
+    assert snapshot["error_rate_1m"] == snapshot["error_rate_5m"] == pytest.approx(1 / 3)
+    assert snapshot["throughput_per_minute"] == pytest.approx(60)
+    assert snapshot["eta_seconds"] == 0
+    assert snapshot["latency"][TEXT]["count"] == 1
+    assert snapshot["latency"][FILE]["p50"] == pytest.approx(2.0, rel=0.05)
@@ -0,0 +1,81 @@
+# test_suppression.py - Remoção de descadastrados, contatados recentes e duplicados
+import time
+
+import pytest
+
+from suppression import SuppressionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SuppressionStore(str(tmp_path / "suppression.db"))
+
+
+def test_filter_without_history_removes_only_duplicates(store):
+    contacts = ["21999990001", "+55 21 99999-0001", "21999990002", "", ""]
+
+    kept, stats = store.filter(contacts)
+
+    # Mesmo número em formatos diferentes é duplicado; números vazios seguem para o envio
+    assert kept == ["21999990001", "21999990002", "", ""]
+    assert stats == {"total": 5, "kept": 4, "opted_out": 0, "recent": 0, "duplicates": 1}
+
+
+def test_filter_removes_opted_out(store):
+    assert store.opt_out(["5521999990001", "5521999990003"]) == 2
+
+    kept, stats = store.filter(["21999990001", "21999990002", "(21) 99999-0003", "21999990001"])
+
+    assert kept == ["21999990002"]
+    # Repetições de um descadastrado contam como descadastro, não como duplicado
+    assert stats == {"total": 4, "kept": 1, "opted_out": 3, "recent": 0, "duplicates": 0}
+
+
+def test_opt_out_can_be_undone(store):
+    store.opt_out(["5521999990001"])
+    store.opt_out(["5521999990001"], opted_out=False)
+
+    kept, stats = store.filter(["21999990001"])
+
+    assert kept == ["21999990001"] and stats["opted_out"] == 0
+
+
+def test_filter_skips_recently_contacted(store):
+    now = time.time()
+    store.record_contacted(["5521999990001"], when=now - 2 * 86400)
+    store.record_contacted(["5521999990002"], when=now - 10 * 86400)
+    contacts = ["21999990001", "21999990002", "21999990003"]
+
+    assert store.filter(contacts)[0] == contacts  # 0 desativa o filtro de recentes
+
+    kept, stats = store.filter(contacts, skip_contacted_days=7)
+
+    assert kept == ["21999990002", "21999990003"]
+    assert stats == {"total": 3, "kept": 2, "opted_out": 0, "recent": 1, "duplicates": 0}
+
+
+def test_opted_out_takes_precedence_over_recent(store):
+    store.record_contacted(["5521999990001"])
+    store.opt_out(["5521999990001"])
+
+    kept, stats = store.filter(["21999990001"], skip_contacted_days=30)
+
+    assert kept == []
+    assert (stats["opted_out"], stats["recent"]) == (1, 0)
+
+
+def test_record_contacted_updates_date_and_ignores_invalid(store):
+    old = time.time() - 30 * 86400
+    assert store.record_contacted(["5521999990001", "5521999990001", "sem número"], when=old) == 1
+    assert store.filter(["21999990001"], skip_contacted_days=7)[1]["recent"] == 0
+
+    store.record_contacted(["21999990001"])
+
+    assert store.filter(["21999990001"], skip_contacted_days=7)[1]["recent"] == 1
+
+
+def test_store_is_persistent(tmp_path):
+    path = str(tmp_path / "suppression.db")
+    SuppressionStore(path).opt_out(["5521999990001"])
+
+    assert SuppressionStore(path).filter(["21999990001"])[0] == []
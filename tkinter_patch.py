@@ -1,26 +1,31 @@
 # tkinter_patch.py
 import sys
 import importlib
+import importlib.util
 
 def patch_tkinter():
     # Registra uma função de importação personalizada para tkinter
     class TkinterFinder:
         def find_spec(self, fullname, path, target=None):
-            if fullname.startswith('tkinter:'):
-                # Converte tkinter:xxxx para tkinter.xxxx
-                corrected = fullname.replace(':', '.')
-                try:
-                    # Carrega o módulo correto
-                    module = importlib.import_module(corrected)
-                    # Registra no sys.modules com o nome incorreto para facilitar a importação
-                    sys.modules[fullname] = module
-                    return importlib.util.find_spec(corrected)
-                except ImportError:
-                    pass
-            return None
+            # Comparação barata primeiro: o finder é consultado para todo módulo
+            # que os finders padrão não encontraram
+            if fullname[:8] != 'tkinter:':
+                return None
+            # Converte tkinter:xxxx para tkinter.xxxx
+            corrected = fullname.replace(':', '.')
+            try:
+                # Carrega o módulo correto
+                module = importlib.import_module(corrected)
+                # Registra no sys.modules com o nome incorreto para facilitar a importação
+                sys.modules[fullname] = module
+                return importlib.util.find_spec(corrected)
+            except ImportError:
+                return None
 
-    # Adiciona o finder personalizado ao início da lista de finders
-    sys.meta_path.insert(0, TkinterFinder())
+    # Nenhum finder padrão resolve nomes com ':', então o finder personalizado vai
+    # para o fim da lista: importações normais nunca passam por ele
+    if not any(type(finder).__name__ == 'TkinterFinder' for finder in sys.meta_path):
+        sys.meta_path.append(TkinterFinder())
 
 # Aplica o patch imediatamente
-patch_tkinter()
\ No newline at end of file
+patch_tkinter()